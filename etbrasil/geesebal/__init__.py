@@ -1,5 +1,6 @@
 from .image import Image
 from .collection import Collection
 from .timeseries import TimeSeries
+from .region import Region
 
 __version__ = "0.1.1"
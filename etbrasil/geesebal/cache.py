@@ -0,0 +1,96 @@
+#----------------------------------------------------------------------------------------#
+#---------------------------------------//GEESEBAL//-------------------------------------#
+#GEESEBAL - GOOGLE EARTH ENGINE APP FOR SURFACE ENERGY BALANCE ALGORITHM FOR LAND (SEBAL)
+#CREATE BY: LEONARDO LAIPELT, RAFAEL KAYSER, ANDERSON RUHOFF AND AYAN FLEISCHMANN
+#PROJECT - ET BRASIL https://etbrasil.org/
+#LAB - HIDROLOGIA DE GRANDE ESCALA [HGE] website: https://www.ufrgs.br/hge/author/hge/
+#UNIVERSITY - UNIVERSIDADE FEDERAL DO RIO GRANDE DO SUL - UFRGS
+#RIO GRANDE DO SUL, BRAZIL
+
+#DOI
+#VERSION 0.1.1
+#CONTACT US: leonardo.laipelt@ufrgs.br
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+
+#PYTHON PACKAGES
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import closing
+
+#DEFAULT CACHE FILE
+CACHE_PATH=os.path.join(os.path.expanduser('~'), '.geesebal', 'endmembers.sqlite')
+
+#PERSISTENT CACHE OF THE ENDMEMBER CALIBRATION OF EACH SCENE
+#KEY: LANDSAT_ID AND ENDMEMBER PARAMETERS (NDVI_cold, Ts_cold, NDVI_hot, Ts_hot)
+#VALUES: COLD PIXEL AND HOT PIXEL DICTIONARIES (temp, x, y, Rn, G, ndvi, sum)
+#AND THE dT COEFFICIENTS OF THE HOT PIXEL ITERATION (FOR EACH n_iter_max AND n_dif_min)
+#THE LEAST RECENTLY USED SCENES ARE REMOVED WHEN THERE ARE MORE THAN max_entries
+class EndmemberCache():
+
+    def __init__(self, path=CACHE_PATH, max_entries=10000):
+        self.path=path
+        self.max_entries=max_entries
+        self._lock=threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock, closing(sqlite3.connect(self.path)) as connection, connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS endmembers ('
+                               'key TEXT PRIMARY KEY, LANDSAT_ID TEXT, value TEXT, last_used REAL)')
+
+    #KEY OF A SCENE
+    @staticmethod
+    def fexp_key(LANDSAT_ID, parameters):
+        return LANDSAT_ID + '|' + json.dumps(parameters, sort_keys=True)
+
+    #KEY OF THE dT COEFFICIENTS
+    @staticmethod
+    def fexp_coefficients_key(n_iter_max, n_dif_min):
+        return '{}|{}'.format(n_iter_max, n_dif_min)
+
+    #CACHED VALUES OF A SCENE (EMPTY dict IF NOT CACHED)
+    #{'cold': dict, 'hot': dict, 'coefficients': {coefficients key: dict}}
+    def get(self, LANDSAT_ID, parameters):
+        key=self.fexp_key(LANDSAT_ID, parameters)
+        with self._lock, closing(sqlite3.connect(self.path)) as connection, connection:
+            row=connection.execute('SELECT value FROM endmembers WHERE key=?', (key,)).fetchone()
+            if row is None:
+                return {}
+            connection.execute('UPDATE endmembers SET last_used=? WHERE key=?', (time.time(), key))
+        return json.loads(row[0])
+
+    #ADD VALUES OF A SCENE (cold, hot OR coefficients)
+    def put(self, LANDSAT_ID, parameters, cold=None, hot=None, coefficients=None):
+        key=self.fexp_key(LANDSAT_ID, parameters)
+        with self._lock, closing(sqlite3.connect(self.path)) as connection, connection:
+            row=connection.execute('SELECT value FROM endmembers WHERE key=?', (key,)).fetchone()
+            value=json.loads(row[0]) if row is not None else {}
+            if cold is not None:
+                value['cold']=cold
+            if hot is not None:
+                value['hot']=hot
+            if coefficients is not None:
+                value.setdefault('coefficients', {}).update(coefficients)
+            connection.execute('INSERT OR REPLACE INTO endmembers VALUES (?,?,?,?)',
+                               (key, LANDSAT_ID, json.dumps(value), time.time()))
+
+            #LRU EVICTION
+            connection.execute('DELETE FROM endmembers WHERE key NOT IN '
+                               '(SELECT key FROM endmembers ORDER BY last_used DESC LIMIT ?)', (self.max_entries,))
+
+    #REMOVE ALL SCENES (OR ONE LANDSAT_ID)
+    def clear(self, LANDSAT_ID=None):
+        with self._lock, closing(sqlite3.connect(self.path)) as connection, connection:
+            if LANDSAT_ID is None:
+                connection.execute('DELETE FROM endmembers')
+            else:
+                connection.execute('DELETE FROM endmembers WHERE LANDSAT_ID=?', (LANDSAT_ID,))
+
+    def __len__(self):
+        with self._lock, closing(sqlite3.connect(self.path)) as connection:
+            return connection.execute('SELECT COUNT(*) FROM endmembers').fetchone()[0]
@@ -18,16 +18,16 @@
 #PYTHON PACKAGES
 #Call EE
 import ee
+import asyncio
 from datetime import date
 
 #FOLDERS
-from .landsatcollection import fexp_landsat_5PathRow,fexp_landsat_7PathRow, fexp_landsat_8PathRow
-from .masks import (f_cloudMaskL457_SR,f_cloudMaskL8_SR,f_albedoL5L7,f_albedoL8)
-from .meteorology import get_meteorology
-from .tools import (fexp_spec_ind, fexp_lst_export,fexp_radlong_up, LST_DEM_correction,
-fexp_radshort_down, fexp_radlong_down, fexp_radbalance, fexp_soil_heat,fexp_sensible_heat_flux)
-from .endmembers import fexp_cold_pixel, fexp_hot_pixel
-from .evapotranspiration import fexp_et
+from .landsatcollection import (fexp_landsat_5PathRow,fexp_landsat_7PathRow, fexp_landsat_8PathRow,
+fexp_landsat_scenes, fexp_landsat_image)
+from .masks import (f_cloudMaskL457_SR,f_cloudMaskL8_SR,f_albedoL5L7,f_albedoL8, CLOUD_MASKS, fexp_clear_fraction)
+from .image import Image
+from .sebal import fexp_sebal
+from .scheduler import fexp_run_scenes, fexp_run_scenes_async
 
 #COLLECTION FUNCTION
 class Collection():
@@ -47,7 +47,22 @@ class Collection():
                  NDVI_cold=5,
                  Ts_cold=20,
                  NDVI_hot=10,
-                 Ts_hot=20):
+                 Ts_hot=20,
+                 solver='client',
+                 n_iter_max=15,
+                 n_dif_min=0.1,
+                 percentile_scale=None,
+                 selection='ranked',
+                 seed=0,
+                 coarse_scale=None,
+                 server_side=False,
+                 max_workers=1,
+                 compute=True,
+                 cache=None,
+                 index=None,
+                 aoi=None,
+                 min_clear_fraction=0.5,
+                 calibration_buffer=None):
 
         #INFORMATIONS
         self.path=path
@@ -55,194 +70,153 @@ class Collection():
         self.cloud_cover=cloud_cover
         self.start_date = ee.Date.fromYMD(year_i,month_i,day_i)
         self.i_date=date(year_i,month_i,day_i)
+        self.e_date=date(year_e,month_e,day_e)
         self.end_date=date(year_e,month_e,day_e)
         self.n_search_days=self.end_date - self.i_date
         self.n_search_days=self.n_search_days.days
         self.end_date = self.start_date.advance(self.n_search_days, 'day')
+        self.max_workers=max_workers
+
+        #AOI CLEAR-FRACTION SCREENING (masks.fexp_clear_fraction)
+        #SCENES WITH LESS THAN min_clear_fraction OF CLEAR pixel_qa INSIDE THE AOI ARE SKIPPED
+        #(ONE BATCHED REDUCTION OVER THE COLLECTION). aoi=None: ONLY CLOUD_COVER IS USED
+        #THE AOI IS ALSO THE PROCESSING DOMAIN OF EACH SCENE (Image(aoi=..., calibration_buffer=...))
+        self.aoi=aoi
+        self.min_clear_fraction=min_clear_fraction
+        self.n_cloudy=0
+
+        #LOCAL SCENE INDEX (sceneindex.SceneIndex)
+        #SCENE LISTS ARE QUERIED LOCALLY (NO aggregate_array REQUESTS)
+        self.index=index
+
+        #SEBAL PARAMETERS
+        self.parameters=dict(NDVI_cold=NDVI_cold, Ts_cold=Ts_cold, NDVI_hot=NDVI_hot, Ts_hot=Ts_hot,
+                             solver=solver, n_iter_max=n_iter_max, n_dif_min=n_dif_min, cache=cache,
+                             percentile_scale=percentile_scale, selection=selection, seed=seed,
+                             coarse_scale=coarse_scale, aoi=aoi, calibration_buffer=calibration_buffer)
 
         #COLLECTIONS
         self.collection_l5=fexp_landsat_5PathRow(self.start_date, self.end_date, self.path, self.row, self.cloud_cover)
         self.collection_l7=fexp_landsat_7PathRow(self.start_date, self.end_date, self.path, self.row, self.cloud_cover)
         self.collection_l8=fexp_landsat_8PathRow(self.start_date, self.end_date, self.path, self.row, self.cloud_cover)
-
-        #LIST OF IMAGES
-        self.sceneListL5 = self.collection_l5.aggregate_array('system:index').getInfo()
-        self.sceneListL7 = self.collection_l7.aggregate_array('system:index').getInfo()
-        self.sceneListL8 = self.collection_l8.aggregate_array('system:index').getInfo()
+        self.n_scenes=self.collection_l5.merge(self.collection_l7).merge(self.collection_l8).size()
+
+        #CLEAR-FRACTION SCREENING
+        if self.aoi is not None:
+            def clear(collection, cloud_mask):
+                return (collection.map(lambda image: fexp_clear_fraction(image, cloud_mask, self.aoi))
+                        .filter(ee.Filter.gte('clear_fraction', self.min_clear_fraction)))
+            self.collection_l5=clear(self.collection_l5, f_cloudMaskL457_SR)
+            self.collection_l7=clear(self.collection_l7, f_cloudMaskL457_SR)
+            self.collection_l8=clear(self.collection_l8, f_cloudMaskL8_SR)
+
+        #SERVER-SIDE PROCESSING
+        #THE SEBAL CHAIN IS MAPPED OVER THE COLLECTION (NO getInfo)
+        #RESULT: ImageCollection OF ET_24h IMAGES (ET_collection)
+        #THE HOT PIXEL ITERATION RUNS ON THE SERVER (solver IS NOT USED)
+        if server_side:
+            self.collection = (self.collection_l5.map(f_cloudMaskL457_SR).map(f_albedoL5L7)
+                               .merge(self.collection_l7.map(f_cloudMaskL457_SR).map(f_albedoL5L7))
+                               .merge(self.collection_l8.map(f_cloudMaskL8_SR).map(f_albedoL8))
+                               .sort("system:time_start"))
+            self.ET_collection = self.collection.map(
+                lambda image: fexp_sebal(image, NDVI_cold, Ts_cold, NDVI_hot, Ts_hot, n_iter_max, n_dif_min,
+                                         percentile_scale, selection, seed, coarse_scale, aoi,
+                                         calibration_buffer))
+            return
+
+        #compute=False ONLY PREPARES THE COLLECTIONS
+        #USE process() OR await compute()
+        if compute:
+            self.process()
+
+    #SEBAL PROCESS FOR ALL SCENES
+    def process(self):
+        self.fexp_scene_list()
+        self.images, self.errors = fexp_run_scenes(self._fexp_scene, self.CollectionList, self.max_workers)
+        self.fexp_collection_et()
+        return self
+
+    #AWAITABLE COMPUTE
+    #THE BLOCKING getInfo CALLS RUN ON AN EXECUTOR (DEFAULT: LOOP THREAD POOL)
+    #AT MOST max_workers SCENES ARE RUNNING AT THE SAME TIME
+    async def compute(self, executor=None):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, self.fexp_scene_list)
+        self.images, self.errors = await fexp_run_scenes_async(self._fexp_scene, self.CollectionList,
+                                                               self.max_workers, executor)
+        self.fexp_collection_et()
+        return self
+
+    #LIST OF SCENES
+    def fexp_scene_list(self):
 
         self.collection = self.collection_l5.merge(self.collection_l7).merge(self.collection_l8)
-        self.CollectionList=self.collection.sort("system:time_start").aggregate_array('system:index').getInfo()
-        self.CollectionList_image = self.collection.aggregate_array('system:index').getInfo()
-        self.count = self.collection.size().getInfo()
+
+        #LIST OF IMAGES FROM THE LOCAL INDEX
+        if self.index is not None:
+            scenes=fexp_landsat_scenes(self.index, self.i_date, self.e_date, self.cloud_cover,
+                                       n_path=self.path, n_row=self.row)
+
+            #CLEAR-FRACTION SCREENING (ONE REQUEST)
+            if self.aoi is not None and scenes:
+                clear_fraction=ee.List([fexp_clear_fraction(fexp_landsat_image(scene), CLOUD_MASKS[scene['sensor']],
+                                                            self.aoi).get('clear_fraction') for scene in scenes]).getInfo()
+                self.n_cloudy=sum(1 for f in clear_fraction if f is None or f < self.min_clear_fraction)
+                scenes=[scene for scene, f in zip(scenes, clear_fraction)
+                        if f is not None and f >= self.min_clear_fraction]
+            self.scenes={scene['scene_id']: scene for scene in scenes}
+            self.sceneListL5 = [key for key, scene in self.scenes.items() if scene['sensor'] == 'LANDSAT_5']
+            self.sceneListL7 = [key for key, scene in self.scenes.items() if scene['sensor'] == 'LANDSAT_7']
+            self.sceneListL8 = [key for key, scene in self.scenes.items() if scene['sensor'] == 'LANDSAT_8']
+            self.CollectionList = list(self.scenes)
+            self.CollectionList_image = self.CollectionList
+            self.count = len(self.CollectionList)
+            print("Number of scenes: ", self.count)
+            if self.aoi is not None:
+                print("Cloudy scenes over the AOI (skipped): ", self.n_cloudy)
+            return
+
+        #LIST OF IMAGES (ONE REQUEST)
+        (self.sceneListL5, self.sceneListL7, self.sceneListL8, self.CollectionList, self.CollectionList_image,
+         self.count, n_scenes) = ee.List([
+            self.collection_l5.aggregate_array('system:index'),
+            self.collection_l7.aggregate_array('system:index'),
+            self.collection_l8.aggregate_array('system:index'),
+            self.collection.sort("system:time_start").aggregate_array('system:index'),
+            self.collection.aggregate_array('system:index'),
+            self.collection.size(),
+            self.n_scenes]).getInfo()
+        self.n_cloudy = n_scenes - self.count
 
         #PRINT NUMBER OF SCENES
         print("Number of scenes: ", self.count)
-
-        n =0
-        k=0
-
-        #====== ITERATIVE PROCESS ======#
-        #FOR EACH IMAGE ON THE LIST
-        #ESTIMATE ET DAILY IMAGE
-        while n < self.count:
-            #GET IMAGE
-            self.image= self.collection.filterMetadata('system:index','equals',self.CollectionList[n]).first()
-            self.image=ee.Image(self.image)
-
-            #PRINT ID
-            print(self.image.get('LANDSAT_ID').getInfo())
-
-            #GET INFORMATIONS FROM IMAGE
-            self._index=self.image.get('system:index')
-            self.cloud_cover=self.image.get('CLOUD_COVER')
-            self.LANDSAT_ID=self.image.get('LANDSAT_ID').getInfo()
-            self.landsat_version=self.image.get('SATELLITE').getInfo()
-            self.zenith_angle=self.image.get("SOLAR_ZENITH_ANGLE").getInfo()
-            self.azimuth_angle=self.image.get('SOLAR_AZIMUTH_ANGLE')
-            self.time_start=self.image.get('system:time_start')
-            self._date=ee.Date(self.time_start)
-            self._year=ee.Number(self._date.get('year'))
-            self._month=ee.Number(self._date.get('month'))
-            self._day=ee.Number(self._date.get('month'))
-            self._hour=ee.Number(self._date.get('hour'))
-            self._minuts = ee.Number(self._date.get('minutes'))
-            self.crs = self.image.projection().crs()
-            self.transform = ee.List(ee.Dictionary(ee.Algorithms.Describe(self.image.projection())).get('transform'))
-            self.date_string=self._date.format('YYYY-MM-dd').getInfo()
-
-            #ENDMEMBERS
-            self.p_top_NDVI=ee.Number(NDVI_cold)
-            self.p_coldest_Ts=ee.Number(Ts_cold)
-            self.p_lowest_NDVI=ee.Number(NDVI_hot)
-            self.p_hottest_Ts=ee.Number(Ts_hot)
-
-
-            #MAKS
-            if self.landsat_version == 'LANDSAT_5':
-                 #self.image=self.image .select([0,1,2,3,4,5,6,9], ["B","GR","R","NIR","SWIR_1","BRT","SWIR_2", "pixel_qa"])
-                 self.image_toa=ee.Image('LANDSAT/LT05/C01/T1/'+ self._index.getInfo())
-
-                 #GET CALIBRATED RADIANCE
-                 self.col_rad = ee.Algorithms.Landsat.calibratedRadiance(self.image_toa);
-                 self.col_rad = self.image.addBands(self.col_rad.select([5],["T_RAD"]))
-
-                 #CLOUD REMOTION
-                 self.image=ee.ImageCollection(self.image).map(f_cloudMaskL457_SR)
-
-                 #ALBEDO TASUMI ET AL. (2008)
-                 self.image=self.image.map(f_albedoL5L7)
-
-            elif self.landsat_version == 'LANDSAT_7':
-                #self.image=self.image .select([0,1,2,3,4,5,6,9], ["B","GR","R","NIR","SWIR_1","BRT","SWIR_2", "pixel_qa"])
-                 self.image_toa=ee.Image('LANDSAT/LE07/C01/T1/'+ self.CollectionList[n][4:])
-
-                 #GET CALIBRATED RADIANCE
-                 self.col_rad = ee.Algorithms.Landsat.calibratedRadiance(self.image_toa);
-                 self.col_rad = self.image.addBands(self.col_rad.select([5],["T_RAD"]))
-
-                 #CLOUD REMOTION
-                 self.image=ee.ImageCollection(self.image).map(f_cloudMaskL457_SR)
-
-                 #ALBEDO TASUMI ET AL. (2008)
-                 self.image=self.image.map(f_albedoL5L7)
-
-            else:
-                #self.image = self.select([0,1,2,3,4,5,6,7,10],["UB","B","GR","R","NIR","SWIR_1","SWIR_2","BRT","pixel_qa"])
-                self.image_toa=ee.Image('LANDSAT/LC08/C01/T1/'+self._index.getInfo())
-
-                #GET CALIBRATED RADIANCE
-                self.col_rad = ee.Algorithms.Landsat.calibratedRadiance(self.image_toa)
-                self.col_rad = self.image.addBands(self.col_rad.select([9],["T_RAD"]))
-
-                #CLOUD REMOTION
-                self.image=ee.ImageCollection(self.image).map(f_cloudMaskL8_SR)
-
-                #ALBEDO TASUMI ET AL. (2008) METHOD WITH KE ET AL. (2016) COEFFICIENTS
-                self.image=self.image.map(f_albedoL8)
-
-            #GEOMETRY
-            self.geometryReducer=self.image.geometry().bounds().getInfo()
-            self.geometry_download=self.geometryReducer['coordinates']
-            self.camada_clip=self.image.select('BRT').first()
-            self.sun_elevation=ee.Number(90).subtract(self.zenith_angle)
-
-            #METEOROLOGY PARAMETERS
-            col_meteorology= get_meteorology(self.image,self.time_start)
-
-            #AIR TEMPERATURE [C]
-            self.T_air = col_meteorology.select('AirT_G')
-
-            #WIND SPEED [M S-1]
-            self.ux= col_meteorology.select('ux_G')
-
-            #RELATIVE HUMIDITY (%)
-            self.UR = col_meteorology.select('RH_G')
-
-            #NET RADIATION 24H [W M-2]
-            self.Rn24hobs = col_meteorology.select('Rn24h_G')
-
-            #SRTM DATA ELEVATION
-            SRTM_ELEVATION ='USGS/SRTMGL1_003' # SRTM Data Elevation
-            self.srtm = ee.Image(SRTM_ELEVATION).clip(self.geometryReducer)
-            self.z_alt = self.srtm.select('elevation')
-
-            #TO AVOID ERRORS DURING THE PROCESS
-            try:
-                #GET IMAGE
-                self.image=self.image.first()
-
-                #SPECTRAL IMAGES (NDVI, EVI, SAVI, LAI, T_LST, e_0, e_NB, long, lat)
-                self.image=fexp_spec_ind(self.image)
-
-                #LAND SURFACE TEMPERATURE
-                #self.image =fexp_lst_export(self.image,self.col_rad,self.landsat_version,self.geometryReducer)
-                self.image=LST_DEM_correction(self.image, self.z_alt, self.T_air, self.UR,self.sun_elevation,self._hour,self._minuts)
-
-                #COLD PIXEL
-                self.d_cold_pixel=fexp_cold_pixel(self.image, self.geometryReducer, self.p_top_NDVI, self.p_coldest_Ts)
-
-                #COLD PIXEL NUMBER
-                self.n_Ts_cold = ee.Number(self.d_cold_pixel.get('temp').getInfo())
-
-                #INSTANTANEOUS OUTGOING LONG-WAVE RADIATION [W M-2]
-                self.image=fexp_radlong_up(self.image)
-
-                #INSTANTANEOUS INCOMING SHORT-WAVE RADIATION [W M-2]
-                self.image=fexp_radshort_down(self.image,self.z_alt,self.T_air,self.UR, self.sun_elevation)
-
-                #INSTANTANEOUS INCOMING LONGWAVE RADIATION [W M-2]
-                self.image=fexp_radlong_down(self.image, self.n_Ts_cold)
-
-                #INSTANTANEOUS NET RADIATON BALANCE [W M-2]
-                self.image=fexp_radbalance(self.image)
-
-                #SOIL HEAT FLUX (G) [W M-2]
-                self.image=fexp_soil_heat(self.image)
-
-                #HOT PIXEL
-                self.d_hot_pixel=fexp_hot_pixel(self.image, self.geometryReducer,self.p_lowest_NDVI, self.p_hottest_Ts)
-                #SENSIBLE HEAT FLUX (H) [W M-2]
-                self.image=fexp_sensible_heat_flux(self.image, self.ux, self.UR,self.Rn24hobs,self.n_Ts_cold,
-                                                   self.d_hot_pixel, self.date_string,self.geometryReducer)
-
-                #DAILY EVAPOTRANSPIRATION (ET_24H) [MM DAY-1]
-                self.image=fexp_et(self.image,self.Rn24hobs)
-
-
-                self.NAME_FINAL=self.LANDSAT_ID[:5]+self.LANDSAT_ID[10:17]+self.LANDSAT_ID[17:25]
-                self.ET_daily=self.image.select(['ET_24h'],[self.NAME_FINAL])
-
-                if k ==0:
-                    self.Collection_ET=self.ET_daily
-                else:
-                    self.Collection_ET=self.Collection_ET.addBands(self.ET_daily)
-                k=k+1
-            except:
-                # ERRORS CAN OCCUR WHEN:
-                # - THERE IS NO METEOROLOGICAL INFORMATION.
-                # - ET RETURN NULL IF AT THE POINT WAS APPLIED MASK CLOUD.
-                # - CONEECTION ISSUES.
-                # - SEBAL DOESN'T FIND A REASONABLE LINEAR RELATIONSHIP (dT).
-
-                print('Error.')
-            n=n+1
+        if self.aoi is not None:
+            print("Cloudy scenes over the AOI (skipped): ", self.n_cloudy)
+
+    #====== ET DAILY IMAGES OF THE PROCESSED SCENES ======#
+    #FAILED SCENES ARE SKIPPED (SEE self.errors)
+    def fexp_collection_et(self):
+
+        #NUMBER OF ITERATIONS OF THE SENSIBLE HEAT FLUX FOR EACH SCENE
+        sebals=[sebal for sebal in self.images if sebal is not None]
+        self.List_iterations=[sebal.n_iterations for sebal in sebals]
+
+        #ONE ET_24h BAND PER SCENE (AN IMAGE WITHOUT BANDS IF ALL SCENES FAILED)
+        ET_daily=[sebal.image.select(['ET_24h'],[sebal.NAME_FINAL]) for sebal in sebals]
+        self.ET_daily=ET_daily[-1] if ET_daily else None
+        self.Collection_ET=ee.Image.cat(ET_daily) if ET_daily else ee.Image().select([])
+
+    #SEBAL FOR ONE SCENE OF THE COLLECTION
+    def _fexp_scene(self, scene_index):
+
+        #GET IMAGE
+        if self.index is not None:
+            image=fexp_landsat_image(self.scenes[scene_index])
+        else:
+            image=ee.Image(self.collection.filterMetadata('system:index','equals',scene_index).first())
+        sebal=Image(image, **self.parameters)
+
+        #PRINT ID
+        print(sebal.LANDSAT_ID)
+        return sebal
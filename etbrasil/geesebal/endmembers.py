@@ -30,31 +30,200 @@ import ee
 #NDVI HOT = 10%
 #TS HOT = 20%
 
-#SELECT COLD PIXEL
-def fexp_cold_pixel(image, refpoly, p_top_NDVI, p_coldest_Ts):
+#APPROXIMATE PERCENTILES (percentile_scale)
+#HISTOGRAM PERCENTILE REDUCER WITH FIXED BUCKET WIDTHS (SAME AS etbrasil.localsebal.sketch)
+#THE PARTIAL HISTOGRAMS OF THE EE TILES ARE MERGED BY THE REDUCER: ERROR <= ONE BUCKET WIDTH
+#AT percentile_scale > 30 THE BANDS ARE COMPUTED ON A COARSER GRID (FEWER PIXELS TO REDUCE)
+NDVI_BUCKET_WIDTH = 0.001
+LST_BUCKET_WIDTH = 0.1
+
+def fexp_percentile_reducer(p, bucket_width, percentile_scale=None, name=None):
+  names = [name] if name is not None else None
+  if percentile_scale is None:
+    return ee.Reducer.percentile([p], names), 30
+  return ee.Reducer.percentile([p], names, 2**14, bucket_width), percentile_scale
+
+#ENDMEMBER THRESHOLDS OF BOTH ENDMEMBERS IN TWO SCENE SCANS
+#SCAN 1: NDVI PERCENTILES (NDVI_neg FOR THE COLD PIXEL, pos_NDVI FOR THE HOT PIXEL)
+#SCAN 2: LST PERCENTILES INSIDE EACH NDVI GROUP AND THE SIZE OF THE GROUPS
+#THE REDUCERS ARE COMBINED WITHOUT SHARED INPUTS: ONE BAND PER ENDMEMBER
+#A MISSING PAIR OF PERCENTILES (None) SKIPS THAT ENDMEMBER
+#RETURNS ee.Dictionary: ndvi_cold, lst_cold, count_cold, ndvi_hot, lst_hot, count_hot
+def fexp_endmember_thresholds(image, refpoly, p_top_NDVI=None, p_coldest_Ts=None,
+                              p_lowest_NDVI=None, p_hottest_Ts=None, percentile_scale=None):
+
+  endmembers = fexp_endmember_bands(p_top_NDVI, p_coldest_Ts, p_lowest_NDVI, p_hottest_Ts)
+  d_ndvi = fexp_ndvi_thresholds(image, refpoly, endmembers, percentile_scale)
+  d_lst = fexp_lst_thresholds(image, refpoly, endmembers, d_ndvi, percentile_scale)
+  return d_ndvi.combine(d_lst)
 
-  #IDENTIFY THE TOP % NDVI PIXELS
-  d_perc_top_NDVI=image.select('NDVI_neg').reduceRegion(
-      reducer=ee.Reducer.percentile([p_top_NDVI]),
-      geometry= refpoly,
-      scale= 30,
+#NAME, NDVI BAND, LST BAND AND PERCENTILES OF EACH ENDMEMBER
+def fexp_endmember_bands(p_top_NDVI=None, p_coldest_Ts=None, p_lowest_NDVI=None, p_hottest_Ts=None):
+  endmembers = []
+  if p_top_NDVI is not None:
+    endmembers.append(('cold', 'NDVI_neg', 'LST_NW', p_top_NDVI, p_coldest_Ts))
+  if p_lowest_NDVI is not None:
+    endmembers.append(('hot', 'pos_NDVI', 'LST_neg', p_lowest_NDVI, p_hottest_Ts))
+  return endmembers
+
+#SCAN 1: NDVI
+def fexp_ndvi_thresholds(image, refpoly, endmembers, percentile_scale=None):
+  reducer, scale = None, 30
+  for name, ndvi_band, lst_band, p_ndvi, p_lst in endmembers:
+    r_ndvi, scale = fexp_percentile_reducer(p_ndvi, NDVI_BUCKET_WIDTH, percentile_scale, 'ndvi_' + name)
+    reducer = r_ndvi if reducer is None else reducer.combine(r_ndvi, None, False)
+  d_ndvi = image.select([ndvi_band for _, ndvi_band, _, _, _ in endmembers]).reduceRegion(
+      reducer=reducer,
+      geometry=refpoly,
+      scale=scale,
+      maxPixels=9e14)
+  return ee.Dictionary(d_ndvi)
+
+#SCAN 2: LST OF THE NDVI GROUPS
+#regions: {name: ee.Geometry} (fexp_coarse_to_fine): EACH GROUP IS ONLY SCANNED INSIDE ITS REGION
+def fexp_lst_thresholds(image, refpoly, endmembers, d_ndvi, percentile_scale=None, regions=None):
+  reducer, i_lst = None, None
+  for name, ndvi_band, lst_band, p_ndvi, p_lst in endmembers:
+    r_lst, scale = fexp_percentile_reducer(p_lst, LST_BUCKET_WIDTH, percentile_scale, 'lst_' + name)
+    r_lst = r_lst.combine(ee.Reducer.count().setOutputs(['count_' + name]), None, True)
+    reducer = r_lst if reducer is None else reducer.combine(r_lst, None, False)
+    i_group = (image.select(lst_band)
+               .updateMask(image.select(ndvi_band).lte(ee.Number(d_ndvi.get('ndvi_' + name))))
+               .rename(name))
+    if regions is not None:
+      i_group = i_group.clip(regions[name])
+    i_lst = i_group if i_lst is None else i_lst.addBands(i_group)
+  if regions is not None:
+    refpoly = None
+    for name, _, _, _, _ in endmembers:
+      refpoly = regions[name] if refpoly is None else refpoly.union(regions[name], 1)
+  d_lst = i_lst.reduceRegion(
+      reducer=reducer,
+      geometry=refpoly,
+      scale=scale,
       maxPixels=9e14)
+  return ee.Dictionary(d_lst)
 
-  #GET VALUE
-  n_perc_top_NDVI= ee.Number(d_perc_top_NDVI.get('NDVI_neg'))
+#COARSE-TO-FINE SEARCH (coarse_scale)
+#1. NDVI THRESHOLDS OF THE SCENE (SCAN 1: ONLY THE NDVI BANDS)
+#2. QUALIFYING COARSE CELLS (120 - 240 M): LOWEST NDVI_neg / pos_NDVI OF THE CELL (reduceResolution)
+#   BEYOND THE NDVI THRESHOLD. EVERY PIXEL OF EACH NDVI GROUP IS INSIDE ITS REGION
+#3. LST PERCENTILES, GROUP SIZE AND SELECTION AT 30 M ONLY INSIDE THE REGIONS (LST, Rn AND G ARE NOT
+#   COMPUTED OUTSIDE THEM). THE NDVI GROUPS ARE THE SAME AS IN THE FULL RESOLUTION SEARCH
+#RETURNS A DICTIONARY: cold_region, hot_region (ee.Geometry) AND thresholds (ee.Dictionary)
+#fexp_endmember_report COMPARES THE RESULT WITH THE FULL RESOLUTION SEARCH
+def fexp_coarse_to_fine(image, refpoly, p_top_NDVI, p_coldest_Ts, p_lowest_NDVI, p_hottest_Ts,
+                        coarse_scale=240, percentile_scale=None):
 
-  #UPDATE MASK WITH NDVI VALUES
-  i_top_NDVI=image.updateMask(image.select('NDVI_neg').lte(n_perc_top_NDVI));
+  endmembers = fexp_endmember_bands(p_top_NDVI, p_coldest_Ts, p_lowest_NDVI, p_hottest_Ts)
+  d_ndvi = fexp_ndvi_thresholds(image, refpoly, endmembers, percentile_scale)
+
+  #COARSE GRID OF THE SCENE: LOWEST VALUE OF THE 30 M PIXELS OF EACH CELL
+  projection = image.select('NDVI').projection()
+  coarse = (image.select(['NDVI_neg', 'pos_NDVI'])
+            .reduceResolution(reducer=ee.Reducer.min(), maxPixels=1024)
+            .reproject(projection.atScale(coarse_scale)))
+
+  #QUALIFYING CELLS
+  i_cells = (coarse.select('NDVI_neg').lte(ee.Number(d_ndvi.get('ndvi_cold'))).rename('cold')
+             .addBands(coarse.select('pos_NDVI').lte(ee.Number(d_ndvi.get('ndvi_hot'))).rename('hot')))
+
+  def region(name):
+    return i_cells.select(name).selfMask().reduceToVectors(
+        geometry=refpoly,
+        crs=projection,
+        scale=coarse_scale,
+        geometryType='polygon',
+        eightConnected=True,
+        maxPixels=9e14).geometry()
+  regions = {'cold': region('cold'), 'hot': region('hot')}
+
+  #30 M LST THRESHOLDS INSIDE THE REGIONS
+  d_lst = fexp_lst_thresholds(image, refpoly, endmembers, d_ndvi, percentile_scale, regions)
+
+  return {'cold_region': regions['cold'], 'hot_region': regions['hot'], 'thresholds': d_ndvi.combine(d_lst)}
+
+#ACCURACY OF THE COARSE-TO-FINE SEARCH AGAINST THE FULL RESOLUTION SEARCH
+#(RUNS BOTH: FOR VALIDATION ONLY. THE IMAGE NEEDS THE Rn AND G BANDS FOR THE HOT PIXEL)
+#<threshold>_full, <threshold>_error: THRESHOLDS AND ABSOLUTE DIFFERENCES
+#coverage_cold/hot: FRACTION OF THE FULL RESOLUTION CANDIDATES INSIDE THE REGIONS
+#temp_cold/hot_full, temp_cold/hot_error: ENDMEMBER TEMPERATURES AND ABSOLUTE DIFFERENCES [K]
+def fexp_endmember_report(image, refpoly, p_top_NDVI, p_coldest_Ts, p_lowest_NDVI, p_hottest_Ts,
+                          coarse_scale=240, seed=0):
+
+  d_full = fexp_endmember_thresholds(image, refpoly, p_top_NDVI, p_coldest_Ts, p_lowest_NDVI, p_hottest_Ts)
+  d_search = fexp_coarse_to_fine(image, refpoly, p_top_NDVI, p_coldest_Ts, p_lowest_NDVI, p_hottest_Ts,
+                                 coarse_scale)
+  d_fine = ee.Dictionary(d_search['thresholds'])
+  names = ['ndvi_cold', 'lst_cold', 'ndvi_hot', 'lst_hot']
+  d_report = ee.Dictionary({})
+  for name in names:
+    d_report = (d_report.set(name + '_full', d_full.get(name))
+                .set(name + '_error', ee.Number(d_fine.get(name)).subtract(d_full.get(name)).abs()))
 
-  #SELECT THE COLDEST TS FROM PREVIOUS NDVI GROUP
-  d_perc_low_LST = i_top_NDVI.select('LST_NW').reduceRegion(
-    reducer= ee.Reducer.percentile([p_coldest_Ts]),
-    geometry=refpoly,
-    scale= 30,
-    maxPixels=9e14
-    )
-  #GET VALUE
-  n_perc_low_LST = ee.Number(d_perc_low_LST.get('LST_NW'))
+  #CANDIDATES OF THE FULL RESOLUTION SEARCH INSIDE THE REGIONS
+  i_cold = (image.select('NDVI_neg').lte(ee.Number(d_full.get('ndvi_cold')))
+            .And(image.select('LST_NW').lte(ee.Number(d_full.get('lst_cold')))).selfMask())
+  i_hot = (image.select('pos_NDVI').lte(ee.Number(d_full.get('ndvi_hot')))
+           .And(image.select('LST_neg').lte(ee.Number(d_full.get('lst_hot')))).selfMask())
+  i_candidates = (i_cold.rename('cold').addBands(i_hot.rename('hot'))
+                  .addBands(i_cold.clip(d_search['cold_region']).rename('cold_region'))
+                  .addBands(i_hot.clip(d_search['hot_region']).rename('hot_region')))
+  d_count = i_candidates.reduceRegion(
+      reducer=ee.Reducer.count(),
+      geometry=refpoly,
+      scale=30,
+      maxPixels=9e14)
+  for name in ['cold', 'hot']:
+    d_report = d_report.set('coverage_' + name,
+                            ee.Number(d_count.get(name + '_region')).divide(ee.Number(d_count.get(name)).max(1)))
+
+  #ENDMEMBER TEMPERATURES
+  d_cold_full = fexp_cold_pixel(image, refpoly, p_top_NDVI, p_coldest_Ts, None, d_full, 'ranked', seed)
+  d_cold_fine = fexp_cold_pixel(image, d_search['cold_region'], p_top_NDVI, p_coldest_Ts, None, d_fine, 'ranked', seed)
+  d_hot_full = fexp_hot_pixel(image, refpoly, p_lowest_NDVI, p_hottest_Ts, None, d_full, 'ranked', seed)
+  d_hot_fine = fexp_hot_pixel(image, d_search['hot_region'], p_lowest_NDVI, p_hottest_Ts, None, d_fine, 'ranked', seed)
+  for name, d_pixel_full, d_pixel_fine in [('cold', d_cold_full, d_cold_fine), ('hot', d_hot_full, d_hot_fine)]:
+    d_report = (d_report.set('temp_' + name + '_full', d_pixel_full.get('temp'))
+                .set('temp_' + name + '_error',
+                     ee.Number(d_pixel_fine.get('temp')).subtract(d_pixel_full.get('temp')).abs()))
+
+  return d_report
+
+#RANKED (DETERMINISTIC) SELECTION OF ONE CANDIDATE
+#THE CANDIDATE WITH THE LOWEST ee.Image.random(seed) VALUE (A SEEDED UNIFORM DRAW, THE SAME PIXEL ON EVERY RUN)
+#ITS BANDS AND THE NUMBER OF CANDIDATES ('sum') COME FROM ONE REDUCTION: ee.Reducer.min(n) + ee.Reducer.count
+#THE REDUCTION RUNS ON THE LANDSAT GRID (crs OF THE CANDIDATES), NOT ON THE DEFAULT GRID OF ee.Image.random
+#THE PIXEL DIFFERS FROM THE RANDOM DRAW OF selection='sample' (RESULTS CHANGE WITH THE DEFAULT 'ranked')
+def fexp_ranked_pixel(candidates, refpoly, bands, names, seed=0):
+  key = ee.Image.random(seed).rename('key').updateMask(candidates.select(bands[0]).mask())
+  reducer = (ee.Reducer.min(len(bands) + 1).setOutputs(['key'] + names)
+             .combine(ee.Reducer.count().setOutputs(['sum']), None, False))
+  d_pixel = key.addBands(candidates.select(bands)).addBands(candidates.select([bands[0]], ['count'])).reduceRegion(
+      reducer=reducer,
+      geometry=refpoly,
+      crs=candidates.select(bands[0]).projection(),
+      scale=30,
+      maxPixels=9e14)
+  return ee.Dictionary(d_pixel).select(names + ['sum'])
+
+#SELECT COLD PIXEL
+#thresholds: fexp_endmember_thresholds (ee.Dictionary OR CLIENT-SIDE dict) SHARED WITH THE HOT PIXEL
+#selection: 'ranked' (fexp_ranked_pixel WITH seed) OR 'sample' (stratifiedSample, RANDOM ON EACH RUN)
+#sum: NUMBER OF CANDIDATES
+def fexp_cold_pixel(image, refpoly, p_top_NDVI, p_coldest_Ts, percentile_scale=None, thresholds=None,
+                    selection='ranked', seed=0):
+
+  #THRESHOLDS (ONE SCAN FOR NDVI, ONE FOR LST)
+  if thresholds is None:
+    thresholds = fexp_endmember_thresholds(image, refpoly, p_top_NDVI, p_coldest_Ts,
+                                           percentile_scale=percentile_scale)
+  thresholds = ee.Dictionary(thresholds)
+
+  #TOP % NDVI PIXELS AND THE COLDEST TS FROM THIS NDVI GROUP
+  n_perc_top_NDVI = ee.Number(thresholds.get('ndvi_cold'))
+  n_perc_low_LST = ee.Number(thresholds.get('lst_cold'))
+  i_top_NDVI=image.updateMask(image.select('NDVI_neg').lte(n_perc_top_NDVI));
   i_cold_lst = i_top_NDVI.updateMask(i_top_NDVI.select('LST_NW').lte(n_perc_low_LST));
 
   #FILTERS
@@ -62,7 +231,13 @@ def fexp_cold_pixel(image, refpoly, p_top_NDVI, p_coldest_Ts):
   c_lst_cold20_int=c_lst_cold20.select('LST_NW').int().rename('int')
   c_lst_cold20=c_lst_cold20.addBands(c_lst_cold20_int)
 
-  #COUNT NUNMBER OF PIXELS
+  #SELECT COLD PIXEL BY RANK (ONE REDUCTION)
+  if selection == 'ranked':
+    return fexp_ranked_pixel(c_lst_cold20, refpoly, ['LST_NW', 'NDVI', 'longitude', 'latitude'],
+                             ['temp', 'ndvi', 'x', 'y'], seed)
+
+  #NUNMBER OF PIXELS
+  #(count_cold IS THE SIZE OF THE NDVI GROUP: THE CANDIDATES ARE COUNTED AFTER THE LST FILTERS)
   count_final_cold_pix = c_lst_cold20.select('int').reduceRegion(
         reducer=  ee.Reducer.count(),
         geometry= refpoly,
@@ -92,38 +267,34 @@ def fexp_cold_pixel(image, refpoly, p_top_NDVI, p_coldest_Ts):
   return d_cold_pixel
 
 #SELECT HOT PIXEL
-def fexp_hot_pixel(image, refpoly, p_lowest_NDVI, p_hottest_Ts):
-
-  #IDENTIFY THE DOWN % NDVI PIXELS
-  d_perc_down_ndvi=image.select('pos_NDVI').reduceRegion(
-      reducer=ee.Reducer.percentile([p_lowest_NDVI]),
-      geometry= refpoly,
-      scale= 30,
-      maxPixels=9e14
-       );
-  #GET VALUE
-  n_perc_low_NDVI= ee.Number(d_perc_down_ndvi.get('pos_NDVI'))
-
-  #UPDATE MASK WITH NDVI VALUES
-  i_low_NDVI = image.updateMask(image.select('pos_NDVI').lte(n_perc_low_NDVI));
+#thresholds: fexp_endmember_thresholds (ee.Dictionary OR CLIENT-SIDE dict) SHARED WITH THE COLD PIXEL
+#selection: 'ranked' (fexp_ranked_pixel WITH seed) OR 'sample' (stratifiedSample, RANDOM ON EACH RUN)
+#sum: NUMBER OF CANDIDATES
+def fexp_hot_pixel(image, refpoly, p_lowest_NDVI, p_hottest_Ts, percentile_scale=None, thresholds=None,
+                   selection='ranked', seed=0):
 
-  #SELECT THE HOTTEST TS FROM PREVIOUS NDVI GROUP
-  d_perc_top_lst = i_low_NDVI.select('LST_neg').reduceRegion(
-    reducer= ee.Reducer.percentile([p_hottest_Ts]),
-    geometry=refpoly,
-    scale= 30,
-    maxPixels=9e14
-    );
-
-  #GET VALUE
-  n_perc_top_lst = ee.Number(d_perc_top_lst.get('LST_neg'))
+  #THRESHOLDS (ONE SCAN FOR NDVI, ONE FOR LST)
+  if thresholds is None:
+    thresholds = fexp_endmember_thresholds(image, refpoly, p_lowest_NDVI=p_lowest_NDVI, p_hottest_Ts=p_hottest_Ts,
+                                           percentile_scale=percentile_scale)
+  thresholds = ee.Dictionary(thresholds)
 
+  #DOWN % NDVI PIXELS AND THE HOTTEST TS FROM THIS NDVI GROUP
+  n_perc_low_NDVI = ee.Number(thresholds.get('ndvi_hot'))
+  n_perc_top_lst = ee.Number(thresholds.get('lst_hot'))
+  i_low_NDVI = image.updateMask(image.select('pos_NDVI').lte(n_perc_low_NDVI));
   c_lst_hotpix = i_low_NDVI.updateMask(i_low_NDVI.select('LST_neg').lte(n_perc_top_lst))
 
   c_lst_hotpix_int=c_lst_hotpix.select('LST_NW').int().rename('int')
 
-  #COUNT NUNMBER OF PIXELS
-  count_final_hot_pix = c_lst_hotpix_int.select('int').reduceRegion(
+  #SELECT HOT PIXEL BY RANK (ONE REDUCTION)
+  if selection == 'ranked':
+    return fexp_ranked_pixel(c_lst_hotpix, refpoly, ['LST_NW', 'longitude', 'latitude', 'Rn', 'G', 'NDVI'],
+                             ['temp', 'x', 'y', 'Rn', 'G', 'ndvi'], seed)
+
+  #NUNMBER OF PIXELS
+  #(count_hot IS THE SIZE OF THE NDVI GROUP: THE CANDIDATES ARE COUNTED AFTER THE LST FILTER)
+  count_final_hot_pix = c_lst_hotpix_int.reduceRegion(
         reducer=  ee.Reducer.count(),
         geometry= refpoly,
         scale= 30,
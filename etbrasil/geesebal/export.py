@@ -0,0 +1,209 @@
+#----------------------------------------------------------------------------------------#
+#---------------------------------------//GEESEBAL//-------------------------------------#
+#GEESEBAL - GOOGLE EARTH ENGINE APP FOR SURFACE ENERGY BALANCE ALGORITHM FOR LAND (SEBAL)
+#CREATE BY: LEONARDO LAIPELT, RAFAEL KAYSER, ANDERSON RUHOFF AND AYAN FLEISCHMANN
+#PROJECT - ET BRASIL https://etbrasil.org/
+#LAB - HIDROLOGIA DE GRANDE ESCALA [HGE] website: https://www.ufrgs.br/hge/author/hge/
+#UNIVERSITY - UNIVERSIDADE FEDERAL DO RIO GRANDE DO SUL - UFRGS
+#RIO GRANDE DO SUL, BRAZIL
+
+#DOI
+#VERSION 0.1.1
+#CONTACT US: leonardo.laipelt@ufrgs.br
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+
+#PYTHON PACKAGES
+#Call EE
+import ee
+import os
+import time
+import sqlite3
+import threading
+from contextlib import closing
+
+#DEFAULT MANIFEST FILE
+MANIFEST_PATH=os.path.join(os.path.expanduser('~'), '.geesebal', 'exports.sqlite')
+
+#TASK STATES OF EARTH ENGINE
+ACTIVE_STATES=('UNSUBMITTED', 'READY', 'RUNNING', 'CANCEL_REQUESTED')
+FAILED_STATES=('FAILED', 'CANCELLED')
+
+#EXPORT JOBS: (name, image, region)
+#ONE JOB PER SCENE OF A Collection (ET_24h, FOOTPRINT OR AOI OF THE SCENE)
+def fexp_scene_jobs(collection):
+    return [(sebal.NAME_FINAL, sebal.image.select(['ET_24h'], [sebal.NAME_FINAL]),
+             ee.Geometry.Polygon(sebal.geometry_download))
+            for sebal in collection.images if sebal is not None]
+
+#ONE JOB PER DATE OF A Region (ET_24h MOSAIC CLIPPED TO THE GEOMETRY)
+def fexp_date_jobs(region, prefix='ET_24h_'):
+    return [(prefix + date_string.replace('-', ''), image, region.geometry)
+            for date_string, image in region.ET_mosaics.items()]
+
+#BATCHED EXPORT OF ET IMAGES
+#AT MOST max_in_flight TASKS OF THIS MANAGER ARE ACTIVE AT THE SAME TIME
+#THE TASKS OF THIS MANAGER ARE POLLED WITH EXPONENTIAL BACKOFF (poll_interval x 2 UNTIL max_poll_interval,
+#BACK TO poll_interval WHEN A TASK FINISHES). ONLY THEIR IDS ARE QUERIED, NOT THE TASK LIST OF THE ACCOUNT
+#THE MANIFEST (SQLITE) RECORDS THE TASK OF EACH OUTPUT: A RESTART SKIPS THE COMPLETED OUTPUTS
+#AND KEEPS POLLING THE TASKS STILL RUNNING. FAILED OR CANCELLED TASKS ARE SUBMITTED AGAIN UNTIL max_attempts
+#destination: 'drive' (folder), 'asset' (folder = ASSET FOLDER) OR 'cloud' (bucket, folder = PREFIX)
+class ExportManager():
+
+    def __init__(self,
+                 destination='drive',
+                 folder=None,
+                 bucket=None,
+                 scale=30,
+                 crs=None,
+                 max_in_flight=10,
+                 poll_interval=10,
+                 max_poll_interval=300,
+                 max_attempts=3,
+                 path=MANIFEST_PATH):
+
+        self.destination=destination
+        self.folder=folder
+        self.bucket=bucket
+        self.scale=scale
+        self.crs=crs
+        self.max_in_flight=max_in_flight
+        self.poll_interval=poll_interval
+        self.max_poll_interval=max_poll_interval
+        self.max_attempts=max_attempts
+        self.path=path
+        self._lock=threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock, closing(sqlite3.connect(self.path)) as connection, connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS tasks ('
+                               'name TEXT PRIMARY KEY, task_id TEXT, state TEXT, attempts INTEGER, '
+                               'error TEXT, updated REAL)')
+
+    #MANIFEST ENTRY OF AN OUTPUT (None IF NOT EXPORTED YET)
+    def get(self, name):
+        with self._lock, closing(sqlite3.connect(self.path)) as connection:
+            row=connection.execute('SELECT task_id, state, attempts, error FROM tasks WHERE name=?', (name,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('task_id', 'state', 'attempts', 'error'), row))
+
+    def put(self, name, task_id, state, attempts, error=None):
+        with self._lock, closing(sqlite3.connect(self.path)) as connection, connection:
+            connection.execute('INSERT OR REPLACE INTO tasks VALUES (?,?,?,?,?,?)',
+                               (name, task_id, state, attempts, error, time.time()))
+
+    #EXPORT TASK OF ONE JOB
+    def fexp_task(self, name, image, region):
+        parameters=dict(image=image, description=name, region=region, scale=self.scale, maxPixels=1e13)
+        if self.crs is not None:
+            parameters['crs']=self.crs
+        if self.destination == 'asset':
+            return ee.batch.Export.image.toAsset(assetId=self.folder + '/' + name, **parameters)
+        if self.destination == 'cloud':
+            prefix=self.folder + '/' + name if self.folder else name
+            return ee.batch.Export.image.toCloudStorage(bucket=self.bucket, fileNamePrefix=prefix, **parameters)
+        return ee.batch.Export.image.toDrive(folder=self.folder, fileNamePrefix=name, **parameters)
+
+    #STATE OF THE GIVEN TASKS
+    @staticmethod
+    def fexp_task_states(task_ids):
+        if not task_ids:
+            return {}
+        return {task['id']: task for task in ee.data.getTaskStatus(task_ids)}
+
+    #EXPORT ALL JOBS (BLOCKS UNTIL ALL TASKS FINISH)
+    #RETURNS THE NAMES OF THE COMPLETED OUTPUTS AND A DICTIONARY WITH THE ERROR OF EACH FAILED OUTPUT
+    def run(self, jobs):
+
+        #OUTPUTS ALREADY COMPLETED (MANIFEST) ARE SKIPPED
+        #TASKS STILL ACTIVE FROM A PREVIOUS RUN ARE POLLED AGAIN
+        pending=[]
+        running={}
+        for name, image, region in jobs:
+            entry=self.get(name)
+            if entry is not None and entry['state'] == 'COMPLETED':
+                continue
+            if entry is not None and entry['state'] in ACTIVE_STATES:
+                running[name]=(image, region)
+            else:
+                pending.append((name, image, region))
+        print("Exports: {} pending, {} running".format(len(pending), len(running)))
+
+        completed=[]
+        errors={}
+        interval=self.poll_interval
+        while pending or running:
+
+            #STATES OF THE RUNNING TASKS OF THIS MANAGER
+            entries={name: self.get(name) for name in running}
+            states=self.fexp_task_states([entry['task_id'] for entry in entries.values()])
+            finished=False
+
+            #UPDATE THE RUNNING TASKS
+            for name, entry in entries.items():
+                task=states.get(entry['task_id'], {})
+                state=task.get('state', 'UNKNOWN')
+
+                #ONLY COMPLETED, FAILED AND CANCELLED TASKS ARE FINISHED
+                #A TASK NOT LISTED (YET) IS KEPT AS ACTIVE: THE SAME OUTPUT IS NEVER EXPORTED TWICE
+                if state != 'COMPLETED' and state not in FAILED_STATES:
+                    continue
+                image, region=running.pop(name)
+                finished=True
+                if state == 'COMPLETED':
+                    self.put(name, entry['task_id'], state, entry['attempts'])
+                    completed.append(name)
+                    print('Export completed: {}'.format(name))
+                else:
+                    error=task.get('error_message', state)
+                    self.put(name, entry['task_id'], state, entry['attempts'], error)
+                    if entry['attempts'] < self.max_attempts:
+                        pending.append((name, image, region))
+                    else:
+                        errors[name]=error
+                        print('Export failed ({}): {}'.format(name, error))
+
+            #SUBMIT NEW TASKS WHILE THE QUEUE HAS ROOM
+            #A TASK THAT CANNOT START (QUOTA, REGION, ASSET ID) IS A FAILED ATTEMPT, RETRIED AT THE NEXT POLL
+            retry=[]
+            while pending and len(running) < self.max_in_flight:
+                name, image, region=pending.pop(0)
+                entry=self.get(name)
+                attempts=(entry['attempts'] if entry is not None else 0) + 1
+                try:
+                    task=self.fexp_task(name, image, region)
+                    task.start()
+                except Exception as error:
+                    self.put(name, None, 'FAILED', attempts, str(error))
+                    if attempts < self.max_attempts:
+                        retry.append((name, image, region))
+                    else:
+                        errors[name]=str(error)
+                        print('Export failed ({}): {}'.format(name, error))
+                    continue
+                self.put(name, task.id, 'READY', attempts)
+                running[name]=(image, region)
+                finished=True
+            pending.extend(retry)
+
+            #EXPONENTIAL BACKOFF WHILE NOTHING CHANGES
+            if pending or running:
+                interval=self.poll_interval if finished else min(interval*2, self.max_poll_interval)
+                time.sleep(interval)
+
+        return completed, errors
+
+    #REMOVE ALL OUTPUTS (OR ONE) FROM THE MANIFEST
+    def clear(self, name=None):
+        with self._lock, closing(sqlite3.connect(self.path)) as connection, connection:
+            if name is None:
+                connection.execute('DELETE FROM tasks')
+            else:
+                connection.execute('DELETE FROM tasks WHERE name=?', (name,))
+
+    def __len__(self):
+        with self._lock, closing(sqlite3.connect(self.path)) as connection:
+            return connection.execute('SELECT COUNT(*) FROM tasks').fetchone()[0]
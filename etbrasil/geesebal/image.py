@@ -19,6 +19,7 @@
 #Call EE
 import ee
 #ee.Initialize()
+import asyncio
 
 #FOLDERS
 from .masks import (
@@ -26,10 +27,54 @@ f_cloudMaskL457_SR,f_cloudMaskL8_SR,
  f_albedoL5L7,f_albedoL8)
 from .meteorology import get_meteorology
 from .tools import (fexp_spec_ind, fexp_lst_export,fexp_radlong_up, LST_DEM_correction,
-fexp_radshort_down, fexp_radlong_down, fexp_radbalance, fexp_soil_heat,fexp_sensible_heat_flux)
-from .endmembers import fexp_cold_pixel, fexp_hot_pixel
+fexp_radshort_down, fexp_radlong_down, fexp_radbalance, fexp_soil_heat,fexp_sensible_heat_flux,
+fexp_hot_pixel_coefficients, fexp_solar_context, fexp_atmosphere_context, fexp_check_iterations,
+fexp_check_solver)
+from .endmembers import (fexp_cold_pixel, fexp_hot_pixel, fexp_endmember_thresholds, fexp_coarse_to_fine,
+fexp_endmember_report)
 from .evapotranspiration import fexp_et
 
+#STAGES OF THE SEBAL PROCESS (IN ORDER)
+#EACH STAGE NEEDS ALL THE PREVIOUS ONES
+STAGES=['spectral','cold_pixel','radiation','hot_pixel','sensible_heat','et']
+
+#BANDS ADDED BY EACH STAGE
+#BANDS NOT LISTED HERE NEED THE WHOLE PROCESS
+STAGE_BANDS={
+    'spectral':['UB','B','GR','R','NIR','SWIR_1','SWIR_2','BRT','pixel_qa','ALFA',
+                'NDVI','EVI','SAVI','NDWI','LAI','e_0','e_NB','T_LST','longitude','latitude',
+                'NDVI_neg','pos_NDVI','int','sd_ndvi','BRT_R','T_LST_DEM','LST_neg','LST_NW'],
+    'radiation':['Rl_up','Rs_down','Tao_sw','ES','EA','Rl_down','Rn','G'],
+    'sensible_heat':['H','rah','dT','rah_first','zom','u_fr','ufric_star']}
+
+#STAGE NEEDED BY A LIST OF BANDS
+def fexp_band_stage(bands):
+    if not isinstance(bands, (list, tuple)):
+        bands=[bands]
+    n_stage=0
+    for band in bands:
+        stage=next((stage for stage, names in STAGE_BANDS.items() if band in names), 'et')
+        n_stage=max(n_stage, STAGES.index(stage))
+    return STAGES[n_stage]
+
+#LAZY ee.Image OF A SEBAL IMAGE
+#select() ONLY BUILDS THE STAGES NEEDED BY THE SELECTED BANDS
+#ANY OTHER METHOD BUILDS THE WHOLE PROCESS
+class LazyImage():
+
+    def __init__(self, sebal):
+        self._sebal=sebal
+
+    def select(self, *args, **kwargs):
+        if args and isinstance(args[0], (list, tuple)):
+            bands=list(args[0])
+        else:
+            bands=list(args) or kwargs.get('opt_selectors', kwargs.get('selectors', []))
+        return self._sebal.fexp_stage(fexp_band_stage(bands)).select(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._sebal.fexp_stage('et'), name)
+
 
 #IMAGE FUNCTION
 class Image():
@@ -41,84 +86,219 @@ class Image():
                  NDVI_cold=5,
                  Ts_cold=20,
                  NDVI_hot=10,
-                 Ts_hot=20):
+                 Ts_hot=20,
+                 solver='client',
+                 n_iter_max=15,
+                 n_dif_min=0.1,
+                 compute=True,
+                 cache=None,
+                 percentile_scale=None,
+                 selection='ranked',
+                 seed=0,
+                 coarse_scale=None,
+                 aoi=None,
+                 calibration_buffer=None):
+
+        #INPUTS
+        fexp_check_iterations(n_iter_max)
+        fexp_check_solver(solver)
+        self._image = ee.Image(image)
+        self.NDVI_cold=NDVI_cold
+        self.Ts_cold=Ts_cold
+        self.NDVI_hot=NDVI_hot
+        self.Ts_hot=Ts_hot
+        #SOLVER OF THE HOT PIXEL ITERATION (tools.fexp_sensible_heat_flux)
+        #'client' (DEFAULT): STOPS WHEN THE CHANGE IS BELOW n_dif_min. 'server': ALWAYS n_iter_max STEPS
+        self.solver=solver
+        self.n_iter_max=n_iter_max
+        self.n_dif_min=n_dif_min
+
+        #APPROXIMATE ENDMEMBER PERCENTILES (endmembers.fexp_percentile_reducer)
+        #None: EXACT PERCENTILES AT 30 M
+        self.percentile_scale=percentile_scale
+
+        #ENDMEMBER SELECTION: 'ranked' (SEEDED, SAME PIXEL ON EVERY RUN) OR 'sample' (stratifiedSample)
+        self.selection=selection
+        self.seed=seed
+
+        #COARSE-TO-FINE ENDMEMBER SEARCH (endmembers.fexp_coarse_to_fine)
+        #coarse_scale (120 - 240 M): 30 M LST SEARCH ONLY INSIDE THE COARSE CELLS OF THE NDVI GROUPS
+        #None: 30 M SEARCH OVER THE WHOLE SCENE
+        self.coarse_scale=coarse_scale
+        self.endmember_regions=None
+
+        #PROCESSING DOMAIN (aoi): THE OUTPUT BANDS ARE CLIPPED TO THE AOI
+        #CALIBRATION DOMAIN (ENDMEMBER SELECTION ONLY): AOI BOUNDS BUFFERED BY calibration_buffer [M]
+        #INSIDE THE SCENE. calibration_buffer=None: WHOLE SCENE (SAME ENDMEMBERS AS WITHOUT aoi)
+        self.aoi=ee.Geometry(aoi) if aoi is not None else None
+        self.calibration_buffer=calibration_buffer
+
+        #ENDMEMBER CACHE (cache.EndmemberCache)
+        #A CACHED SCENE SKIPS THE COLD AND HOT PIXEL SELECTION
+        self.cache=cache
+        self.endmember_parameters=dict(NDVI_cold=NDVI_cold, Ts_cold=Ts_cold, NDVI_hot=NDVI_hot, Ts_hot=Ts_hot)
+        if percentile_scale is not None:
+            self.endmember_parameters['percentile_scale']=percentile_scale
+        if selection != 'sample':
+            self.endmember_parameters.update(selection=selection, seed=seed)
+        if coarse_scale is not None:
+            self.endmember_parameters['coarse_scale']=coarse_scale
+
+        #NDVI/LST THRESHOLDS OF BOTH ENDMEMBERS (endmembers.fexp_endmember_thresholds)
+        self.thresholds=None
+
+        #NUMBER OF STAGES ALREADY BUILT
+        self._n_stage=0
+
+        #compute=False: STAGES ARE BUILT ON DEMAND
+        #(image.select(...), fexp_stage(...), process() OR await compute())
+        if compute:
+            self.process()
+
+    #SEBAL IMAGE
+    #LAZY (LazyImage) UNTIL THE WHOLE PROCESS IS BUILT
+    @property
+    def image(self):
+        if self._n_stage == len(STAGES):
+            return self._image
+        return LazyImage(self)
+
+    #BUILD THE STAGES UNTIL stage (INCLUDED)
+    #RETURNS THE IMAGE WITH THE BANDS OF THESE STAGES
+    def fexp_stage(self, stage):
+        while self._n_stage <= STAGES.index(stage):
+            getattr(self, '_fexp_' + STAGES[self._n_stage])()
+            self._n_stage=self._n_stage+1
+        return self._image
+
+    #SEBAL PROCESS
+    def process(self):
+        self.fexp_stage('et')
+        return self
+
+    #AWAITABLE COMPUTE
+    #THE BLOCKING getInfo CALLS RUN ON AN EXECUTOR (DEFAULT: LOOP THREAD POOL)
+    async def compute(self, executor=None):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, self.process)
+        return self
+
+    #MASKS, METEOROLOGY, SPECTRAL INDICES AND LAND SURFACE TEMPERATURE
+    def _fexp_spectral(self):
 
         #GET INFORMATIONS FROM IMAGE
-        self.image = ee.Image(image)
-        self._index=self.image.get('system:index')
-        self.cloud_cover=self.image.get('CLOUD_COVER')
-        self.LANDSAT_ID=self.image.get('LANDSAT_ID').getInfo()
-        self.landsat_version=self.image.get('SATELLITE').getInfo()
-        self.azimuth_angle=self.image.get('SOLAR_ZENITH_ANGLE')
-        self.time_start=self.image.get('system:time_start')
+        self._index=self._image.get('system:index')
+        self.cloud_cover=self._image.get('CLOUD_COVER')
+        self.azimuth_angle=self._image.get('SOLAR_ZENITH_ANGLE')
+        self.time_start=self._image.get('system:time_start')
         self._date=ee.Date(self.time_start)
         self._year=ee.Number(self._date.get('year'))
         self._month=ee.Number(self._date.get('month'))
         self._day=ee.Number(self._date.get('day'))
         self._hour=ee.Number(self._date.get('hour'))
         self._minuts = ee.Number(self._date.get('minutes'))
-        self.crs = self.image.projection().crs()
-        self.transform = ee.List(ee.Dictionary(ee.Algorithms.Describe(self.image.projection())).get('transform'))
-        self.date_string=self._date.format('YYYY-MM-dd').getInfo()
+        self.crs = self._image.projection().crs()
+        self.transform = ee.List(ee.Dictionary(ee.Algorithms.Describe(self._image.projection())).get('transform'))
+
+        #CLIENT-SIDE INFORMATIONS (ONE REQUEST)
+        info={
+            'LANDSAT_ID': self._image.get('LANDSAT_ID'),
+            'SATELLITE': self._image.get('SATELLITE'),
+            'system:index': self._index,
+            'system:time_start': self.time_start,
+            'date_string': self._date.format('YYYY-MM-dd'),
+            'geometry': self._image.geometry().bounds(),
+            'bands': self._image.bandNames()}
+        if self.aoi is not None:
+            info['aoi']=self.aoi.bounds()
+            if self.calibration_buffer is not None:
+                info['calibration']=(self.aoi.buffer(self.calibration_buffer).bounds()
+                                     .intersection(self._image.geometry().bounds(), 1))
+        self.info=ee.Dictionary(info).getInfo()
+        self.LANDSAT_ID=self.info['LANDSAT_ID']
+        self.landsat_version=self.info['SATELLITE']
+        self.date_string=self.info['date_string']
+        self.NAME_FINAL=self.LANDSAT_ID[:5]+self.LANDSAT_ID[10:17]+self.LANDSAT_ID[17:25]
+
+        #PROCESSING AND CALIBRATION DOMAINS
+        self.geometryReducer=self.info['geometry']
+        self.calibration_domain=self.info.get('calibration', self.geometryReducer)
+        if 'calibration' in self.info:
+            self.endmember_parameters['calibration_domain']=self.info['calibration']['coordinates']
+
+        #CACHED ENDMEMBERS OF THE SCENE
+        self.cached=self.cache.get(self.LANDSAT_ID, self.endmember_parameters) if self.cache is not None else {}
+
+        #SCENE INDEX WITHOUT MERGE PREFIXES (E.G. 1_2_LE07_222081_20010101)
+        self.scene_index='_'.join(self.info['system:index'].split('_')[-3:])
+
+        #SCENES FROM landsatcollection.py ALREADY HAVE RENAMED BANDS
+        self.renamed='BRT' in self.info['bands']
 
         #ENDMEMBERS
-        self.p_top_NDVI=ee.Number(NDVI_cold)
-        self.p_coldest_Ts=ee.Number(Ts_cold)
-        self.p_lowest_NDVI=ee.Number(NDVI_hot)
-        self.p_hottest_Ts=ee.Number(Ts_hot)
+        self.p_top_NDVI=ee.Number(self.NDVI_cold)
+        self.p_coldest_Ts=ee.Number(self.Ts_cold)
+        self.p_lowest_NDVI=ee.Number(self.NDVI_hot)
+        self.p_hottest_Ts=ee.Number(self.Ts_hot)
 
         #LANDSAT IMAGE
         if self.landsat_version == 'LANDSAT_5':
-             self.image=self.image.select([0,1,2,3,4,5,6,9], ["B","GR","R","NIR","SWIR_1","BRT","SWIR_2", "pixel_qa"])
-             self.image_toa=ee.Image('LANDSAT/LT05/C01/T1/'+ self._index.getInfo())
+             if not self.renamed:
+                 self._image=self._image.select([0,1,2,3,4,5,6,9], ["B","GR","R","NIR","SWIR_1","BRT","SWIR_2", "pixel_qa"])
+             self.image_toa=ee.Image('LANDSAT/LT05/C01/T1/'+ self.scene_index)
 
          #GET CALIBRATED RADIANCE
              self.col_rad = ee.Algorithms.Landsat.calibratedRadiance(self.image_toa);
-             self.col_rad = self.image.addBands(self.col_rad.select([5],["T_RAD"]))
+             self.col_rad = self._image.addBands(self.col_rad.select([5],["T_RAD"]))
 
          #CLOUD REMOTION
-             self.image=ee.ImageCollection(self.image).map(f_cloudMaskL457_SR)
+             self._image=ee.ImageCollection(self._image).map(f_cloudMaskL457_SR)
 
          #ALBEDO TASUMI ET AL. (2008)
-             self.image=self.image.map(f_albedoL5L7)
+             self._image=self._image.map(f_albedoL5L7)
 
         elif self.landsat_version == 'LANDSAT_7':
-             self.image=self.image.select([0,1,2,3,4,5,6,9], ["B","GR","R","NIR","SWIR_1","BRT","SWIR_2", "pixel_qa"])
-             self.image_toa=ee.Image('LANDSAT/LE07/C01/T1/'+ self._index.getInfo())
+             if not self.renamed:
+                 self._image=self._image.select([0,1,2,3,4,5,6,9], ["B","GR","R","NIR","SWIR_1","BRT","SWIR_2", "pixel_qa"])
+             self.image_toa=ee.Image('LANDSAT/LE07/C01/T1/'+ self.scene_index)
 
          #GET CALIBRATED RADIANCE
              self.col_rad = ee.Algorithms.Landsat.calibratedRadiance(self.image_toa);
-             self.col_rad = self.image.addBands(self.col_rad.select([5],["T_RAD"]))
+             self.col_rad = self._image.addBands(self.col_rad.select([5],["T_RAD"]))
 
          #CLOUD REMOVAL
-             self.image=ee.ImageCollection(self.image).map(f_cloudMaskL457_SR)
+             self._image=ee.ImageCollection(self._image).map(f_cloudMaskL457_SR)
 
          #ALBEDO TASUMI ET AL. (2008)
-             self.image=self.image.map(f_albedoL5L7)
+             self._image=self._image.map(f_albedoL5L7)
 
         else:
-            self.image = self.image.select([0,1,2,3,4,5,6,7,10],["UB","B","GR","R","NIR","SWIR_1","SWIR_2","BRT","pixel_qa"])
-            self.image_toa=ee.Image('LANDSAT/LC08/C01/T1/'+self._index.getInfo())
+            if not self.renamed:
+                self._image = self._image.select([0,1,2,3,4,5,6,7,10],["UB","B","GR","R","NIR","SWIR_1","SWIR_2","BRT","pixel_qa"])
+            self.image_toa=ee.Image('LANDSAT/LC08/C01/T1/'+self.scene_index)
 
          #GET CALIBRATED RADIANCE
             self.col_rad = ee.Algorithms.Landsat.calibratedRadiance(self.image_toa)
-            self.col_rad = self.image.addBands(self.col_rad.select([9],["T_RAD"]))
+            self.col_rad = self._image.addBands(self.col_rad.select([9],["T_RAD"]))
 
          #CLOUD REMOVAL
-            self.image=ee.ImageCollection(self.image).map(f_cloudMaskL8_SR)
+            self._image=ee.ImageCollection(self._image).map(f_cloudMaskL8_SR)
 
          #ALBEDO TASUMI ET AL. (2008) METHOD WITH KE ET AL. (2016) COEFFICIENTS
-            self.image=self.image.map(f_albedoL8)
+            self._image=self._image.map(f_albedoL8)
 
         #GEOMETRY
-        self.geometryReducer=self.image.geometry().bounds().getInfo()
-        self.geometry_download=self.geometryReducer['coordinates']
-        self.camada_clip=self.image.select('BRT').first()
+        self.geometry_download=self.info.get('aoi', self.geometryReducer)['coordinates']
+        self.camada_clip=self._image.select('BRT').first()
 
         self.sun_elevation=ee.Number(90).subtract(self.azimuth_angle)
 
+        #SOLAR CONTEXT (doy, dr, solar_dec, cos_theta)
+        self.context=fexp_solar_context(self._date, self.sun_elevation)
+
         #METEOROLOGY PARAMETERS
-        col_meteorology= get_meteorology(self.image,self.time_start);
+        #CLIENT-SIDE time_start: SHARED WITH THE OTHER SCENES OF THE SAME OVERPASS (meteorology.py CACHE)
+        col_meteorology= get_meteorology(self._image,self.info['system:time_start'],self.context);
 
         #AIR TEMPERATURE [C]
         self.T_air = col_meteorology.select('AirT_G');
@@ -138,44 +318,119 @@ class Image():
         self.z_alt = self.srtm.select('elevation');
 
         #GET IMAGE
-        self.image=self.image.first()
+        self._image=self._image.first()
+
+        #ATMOSPHERIC CONTEXT (pres, es, ea, W, tao_sw)
+        self.context=fexp_atmosphere_context(self.context, self._image, self.z_alt, self.T_air, self.UR)
 
         #SPECTRAL IMAGES (NDVI, EVI, SAVI, LAI, T_LST, e_0, e_NB, long, lat)
-        self.image=fexp_spec_ind(self.image)
+        self._image=fexp_spec_ind(self._image)
 
         #LAND SURFACE TEMPERATURE
-        self.image=LST_DEM_correction(self.image, self.z_alt, self.T_air, self.UR,self.sun_elevation,self._hour,self._minuts)
+        self._image=LST_DEM_correction(self._image, self.z_alt, self.T_air, self.UR,self.sun_elevation,self._hour,self._minuts,self.context)
 
-        #COLD PIXEL
-        self.d_cold_pixel=fexp_cold_pixel(self.image, self.geometryReducer, self.p_top_NDVI, self.p_coldest_Ts)
+    #COLD PIXEL
+    def _fexp_cold_pixel(self):
+        if 'cold' in self.cached:
+            self.d_cold_pixel=self.cached['cold']
+        else:
+            #THRESHOLDS OF BOTH ENDMEMBERS (TWO SCANS), FETCHED WITH THE COLD PIXEL (ONE REQUEST)
+            #THE HOT PIXEL REUSES THEM WITHOUT SCANNING THE SCENE AGAIN
+            refpoly=self.calibration_domain
+            if self.coarse_scale is not None:
+                self.endmember_regions=fexp_coarse_to_fine(self._image, self.calibration_domain, self.p_top_NDVI,
+                                                           self.p_coldest_Ts, self.p_lowest_NDVI, self.p_hottest_Ts,
+                                                           self.coarse_scale, self.percentile_scale)
+                thresholds=self.endmember_regions['thresholds']
+                refpoly=self.endmember_regions['cold_region']
+            elif 'hot' in self.cached:
+                thresholds=fexp_endmember_thresholds(self._image, self.calibration_domain, self.p_top_NDVI, self.p_coldest_Ts,
+                                                     percentile_scale=self.percentile_scale)
+            else:
+                thresholds=fexp_endmember_thresholds(self._image, self.calibration_domain, self.p_top_NDVI, self.p_coldest_Ts,
+                                                     self.p_lowest_NDVI, self.p_hottest_Ts, self.percentile_scale)
+            d_cold_pixel=fexp_cold_pixel(self._image, refpoly, self.p_top_NDVI, self.p_coldest_Ts,
+                                         self.percentile_scale, thresholds, self.selection, self.seed)
+            info=ee.Dictionary({'cold': d_cold_pixel, 'thresholds': thresholds}).getInfo()
+            self.d_cold_pixel=info['cold']
+            self.thresholds=info['thresholds']
+            if self.cache is not None and self.d_cold_pixel.get('temp') is not None:
+                self.cache.put(self.LANDSAT_ID, self.endmember_parameters, cold=self.d_cold_pixel)
 
         #COLD PIXEL NUMBER
-        self.n_Ts_cold = ee.Number(self.d_cold_pixel.get('temp').getInfo())
+        self.n_Ts_cold = ee.Number(self.d_cold_pixel['temp'])
+
+    #RADIATION BALANCE AND SOIL HEAT FLUX
+    def _fexp_radiation(self):
 
         #INSTANTANEOUS OUTGOING LONG-WAVE RADIATION [W M-2]
-        self.image=fexp_radlong_up(self.image)
+        self._image=fexp_radlong_up(self._image)
 
         #INSTANTANEOUS INCOMING SHORT-WAVE RADIATION [W M-2]
-        self.image=fexp_radshort_down(self.image,self.z_alt,self.T_air,self.UR, self.sun_elevation)
+        self._image=fexp_radshort_down(self._image,self.z_alt,self.T_air,self.UR, self.sun_elevation, self.context)
 
         #INSTANTANEOUS INCOMING LONGWAVE RADIATION [W M-2]
-        self.image=fexp_radlong_down(self.image, self.n_Ts_cold)
+        self._image=fexp_radlong_down(self._image, self.n_Ts_cold)
 
         #INSTANTANEOUS NET RADIATON BALANCE [W M-2]
-        self.image=fexp_radbalance(self.image)
+        self._image=fexp_radbalance(self._image)
 
         #SOIL HEAT FLUX (G) [W M-2]
-        self.image=fexp_soil_heat(self.image)
-
-        #HOT PIXEL
-        self.d_hot_pixel=fexp_hot_pixel(self.image, self.geometryReducer,self.p_lowest_NDVI, self.p_hottest_Ts)
+        self._image=fexp_soil_heat(self._image)
 
-        #SENSIBLE HEAT FLUX (H) [W M-2]
-        self.image=fexp_sensible_heat_flux(self.image, self.ux, self.UR,self.Rn24hobs,self.n_Ts_cold,
-                                           self.d_hot_pixel, self.date_string,self.geometryReducer)
-
-        #DAILY EVAPOTRANSPIRATION (ET_24H) [MM DAY-1]
-        self.image=fexp_et(self.image,self.Rn24hobs)
-
-        self.NAME_FINAL=self.LANDSAT_ID[:5]+self.LANDSAT_ID[10:17]+self.LANDSAT_ID[17:25]
-        self.image=self.image.addBands([self.image.select('ET_24h').rename(self.NAME_FINAL)])
+    #HOT PIXEL
+    def _fexp_hot_pixel(self):
+        if 'hot' in self.cached:
+            self.d_hot_pixel=self.cached['hot']
+        else:
+            if self.coarse_scale is not None and self.endmember_regions is None:
+                self.endmember_regions=fexp_coarse_to_fine(self._image, self.calibration_domain, self.p_top_NDVI,
+                                                           self.p_coldest_Ts, self.p_lowest_NDVI, self.p_hottest_Ts,
+                                                           self.coarse_scale, self.percentile_scale)
+            refpoly=self.calibration_domain if self.endmember_regions is None else self.endmember_regions['hot_region']
+            self.d_hot_pixel=fexp_hot_pixel(self._image, refpoly,self.p_lowest_NDVI, self.p_hottest_Ts,
+                                          self.percentile_scale, self.thresholds, self.selection, self.seed)
+            if self.cache is not None:
+                self.d_hot_pixel=self.d_hot_pixel.getInfo()
+                if self.d_hot_pixel.get('temp') is not None:
+                    self.cache.put(self.LANDSAT_ID, self.endmember_parameters, hot=self.d_hot_pixel)
+
+    #ACCURACY OF THE COARSE-TO-FINE SEARCH AGAINST THE FULL RESOLUTION SEARCH (ONE REQUEST)
+    #RUNS BOTH SEARCHES: FOR VALIDATION OF coarse_scale ONLY
+    def fexp_endmember_report(self, coarse_scale=None):
+        self.fexp_stage('hot_pixel')
+        coarse_scale=coarse_scale if coarse_scale is not None else (self.coarse_scale or 240)
+        return fexp_endmember_report(self._image, self.calibration_domain, self.p_top_NDVI, self.p_coldest_Ts,
+                                     self.p_lowest_NDVI, self.p_hottest_Ts, coarse_scale,
+                                     seed=self.seed).getInfo()
+
+    #SENSIBLE HEAT FLUX (H) [W M-2]
+    def _fexp_sensible_heat(self):
+
+        #dT COEFFICIENTS FROM THE CACHE (OR SOLVED ONCE WITH THE CLIENT SOLVER AND CACHED)
+        #ONLY FOR solver='client': THE SERVER AND DEFERRED SOLVERS ALWAYS RUN THEIR OWN ITERATION
+        self.d_iteration=None
+        if self.cache is not None and self.solver == 'client':
+            coefficients_key=self.cache.fexp_coefficients_key(self.n_iter_max, self.n_dif_min)
+            self.d_iteration=self.cached.get('coefficients', {}).get(coefficients_key)
+            if self.d_iteration is None:
+                self.d_iteration=fexp_hot_pixel_coefficients(self._image, self.ux, self.n_Ts_cold, self.d_hot_pixel,
+                                                             self.n_iter_max, self.n_dif_min)
+                self.cache.put(self.LANDSAT_ID, self.endmember_parameters, coefficients={coefficients_key: self.d_iteration})
+
+        self._image=fexp_sensible_heat_flux(self._image, self.ux, self.UR,self.Rn24hobs,self.n_Ts_cold,
+                                           self.d_hot_pixel, self.date_string,self.calibration_domain, self.solver,
+                                           self.n_iter_max, self.n_dif_min, self.d_iteration)
+
+        #PROCESSING DOMAIN: H AND ET ARE ONLY COMPUTED INSIDE THE AOI
+        #(AFTER THE HOT PIXEL ITERATION, WHICH NEEDS THE HOT PIXEL OF THE CALIBRATION DOMAIN)
+        if self.aoi is not None:
+            self._image=self._image.clip(self.aoi)
+
+        #NUMBER OF ITERATIONS OF THE SENSIBLE HEAT FLUX
+        self.n_iterations=self._image.get('n_iterations')
+
+    #DAILY EVAPOTRANSPIRATION (ET_24H) [MM DAY-1]
+    def _fexp_et(self):
+        self._image=fexp_et(self._image,self.Rn24hobs)
+        self._image=self._image.addBands([self._image.select('ET_24h').rename(self.NAME_FINAL)])
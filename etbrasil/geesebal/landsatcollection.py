@@ -86,3 +86,69 @@ def fexp_landsat_5Coordinate(start_date,end_date,coordinate,th_cloud_cover):
                         .filterMetadata('CLOUD_COVER', 'less_than', th_cloud_cover));
 
     return col_SR_L5;
+
+#SURFACE REFLECTANCE COLLECTION AND BANDS OF EACH SENSOR
+LANDSAT_COLLECTIONS={
+    'LANDSAT_5': ('LANDSAT/LT05/C01/T1_SR', [0,1,2,3,4,5,6,9], ["B","GR","R","NIR","SWIR_1","BRT","SWIR_2", "pixel_qa"]),
+    'LANDSAT_7': ('LANDSAT/LE07/C01/T1_SR', [0,1,2,3,4,5,6,9], ["B","GR","R","NIR","SWIR_1","BRT","SWIR_2", "pixel_qa"]),
+    'LANDSAT_8': ('LANDSAT/LC08/C01/T1_SR', [0,1,2,3,4,5,6,7,10], ["UB","B","GR","R","NIR","SWIR_1","SWIR_2","BRT","pixel_qa"])}
+
+#BOUNDING BOX [xmin, ymin, xmax, ymax] OF A GEOJSON GEOMETRY
+def fexp_geojson_bounds(geojson):
+    if geojson['type'] == 'GeometryCollection':
+        boxes=[fexp_geojson_bounds(part) for part in geojson['geometries']]
+    else:
+        positions=[geojson['coordinates']]
+        while isinstance(positions[0][0], (list, tuple)):
+            positions=[position for part in positions for position in part]
+        boxes=[position[:2]*2 for position in positions]
+    return [min(box[0] for box in boxes), min(box[1] for box in boxes),
+            max(box[2] for box in boxes), max(box[3] for box in boxes)]
+
+#TYPE AND BOUNDING BOX OF A GEOMETRY
+#CLIENT-SIDE GEOMETRIES ARE READ LOCALLY
+#COMPUTED GEOMETRIES (E.G. FeatureCollection.geometry(), bounds()) NEED ONE REQUEST
+def fexp_geometry_bounds(coordinate):
+    geometry=ee.Geometry(coordinate)
+    try:
+        geojson=geometry.toGeoJSON()
+    except ee.EEException:
+        d_geometry=ee.Dictionary({'type': geometry.type(), 'bounds': geometry.bounds()}).getInfo()
+        return d_geometry['type'], fexp_geojson_bounds(d_geometry['bounds'])
+    return geojson['type'], fexp_geojson_bounds(geojson)
+
+#GET LANDSAT 5, 7 AND 8 SCENES FROM A LOCAL INDEX (sceneindex.SceneIndex)
+#BY PATH ROW OR BY COORDINATE
+#THE INDEX IS ONLY REFRESHED FOR THE TIME WINDOWS NOT YET INDEXED
+#start_date AND end_date: datetime.date (end_date EXCLUDED)
+#RETURNS THE SCENES (dict) SORTED BY DATE
+def fexp_landsat_scenes(index, start_date, end_date, th_cloud_cover, n_path=None, n_row=None, coordinate=None):
+    point=None
+    bounds=None
+    if coordinate is not None:
+        geometry_type, bounds=fexp_geometry_bounds(coordinate)
+        if geometry_type == 'Point':
+            point=bounds[:2]
+            bounds=None
+            query='point={},{}'.format(*point)
+        else:
+            query='bounds={},{},{},{}'.format(*bounds)
+    else:
+        query='path={},row={}'.format(n_path, n_row)
+
+    for collection_id, bands, names in LANDSAT_COLLECTIONS.values():
+        collection=ee.ImageCollection(collection_id)
+        if coordinate is not None:
+            collection=collection.filterBounds(coordinate)
+        else:
+            collection=(collection.filterMetadata('WRS_PATH', 'equals', n_path)
+                        .filterMetadata('WRS_ROW', 'equals', n_row))
+        index.refresh(collection_id, collection, query, start_date, end_date)
+
+    return index.query(start_date, end_date, path=n_path, row=n_row, point=point, bounds=bounds,
+                       cloud_cover=th_cloud_cover)
+
+#IMAGE OF AN INDEXED SCENE (SAME BANDS AS THE COLLECTIONS ABOVE)
+def fexp_landsat_image(scene):
+    collection_id, bands, names = LANDSAT_COLLECTIONS[scene['sensor']]
+    return ee.Image(scene['asset_id']).select(bands, names)
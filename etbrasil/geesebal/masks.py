@@ -39,6 +39,31 @@ def f_cloudMaskL8_SR(image):
     mask = c01.Or(c02).Or(c03);
     return image.updateMask(mask);
 
+#CLOUD MASK OF EACH SENSOR
+CLOUD_MASKS={'LANDSAT_5': f_cloudMaskL457_SR, 'LANDSAT_7': f_cloudMaskL457_SR, 'LANDSAT_8': f_cloudMaskL8_SR}
+
+#NUMBER OF CLEAR PIXELS AT THE POINTS (PROPERTY n_clear)
+#ONLY THE pixel_qa BAND IS READ: CHEAP PREFILTER BEFORE THE SEBAL CHAIN
+def fexp_clear_points(image, cloud_mask, points):
+    image = ee.Image(image)
+    n_clear = cloud_mask(image.select('pixel_qa')).reduceRegion(
+        reducer=ee.Reducer.count(),
+        geometry=points,
+        scale=30,
+        maxPixels=1e14).get('pixel_qa')
+    return image.set('n_clear', n_clear)
+
+#CLEAR FRACTION OF THE AOI (PROPERTY clear_fraction)
+#AOI PIXELS OUTSIDE THE SCENE FOOTPRINT ARE NOT CLEAR
+def fexp_clear_fraction(image, cloud_mask, aoi, scale=30):
+    image = ee.Image(image)
+    clear_fraction = cloud_mask(image.select('pixel_qa')).mask().unmask(0).reduceRegion(
+        reducer=ee.Reducer.mean(),
+        geometry=aoi,
+        scale=scale,
+        maxPixels=1e14).get('pixel_qa')
+    return image.set('clear_fraction', clear_fraction)
+
 #ALBEDO
 #TASUMI ET AL(2008) FOR LANDSAT 5 AND 7
 def f_albedoL5L7(image):
@@ -14,24 +14,60 @@
 #----------------------------------------------------------------------------------------#
 #----------------------------------------------------------------------------------------#
 #----------------------------------------------------------------------------------------#
-
 #PYTHON PACKAGES
 #Call EE
 import ee
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
 
 #GLOBAL LAND DATA ASSIMILATION SYSTEM (GLDAS)
 #1984 TO 1999-12-31 - GLDAS 2.0
 #2000 TO PRESENT - GLDAS 2.1
 #3h, 6h, 9h, 12h, 15h, 18h, 21h, 00h
 
-def get_meteorology(image,time_start):
-
-    meteo_inst_source = 'ECMWF/ERA5_LAND/HOURLY'
+meteo_inst_source = 'ECMWF/ERA5_LAND/HOURLY'
+
+#ERA5-LAND TIME STEP [MS]
+ERA5_STEP = 60*60*1000
+
+#INTERPOLATION TIME ROUNDING FOR THE METEOROLOGY CACHE [MS]
+#SCENES OF THE SAME OVERPASS (ADJACENT ROWS) SHARE THE INTERPOLATED PRODUCTS
+TIME_STEP = 60*1000
+
+#METEOROLOGY CACHE (SHARED BY ALL SCENES OF THE PROCESS)
+#LEAST RECENTLY USED: AT MOST METEOROLOGY_CACHE_SIZE ENTRIES (ABOUT 4 PER OVERPASS)
+#SCENES ARE SCHEDULED BY DATE, SO A FEW OVERPASSES ARE ENOUGH
+#('bracket', HOUR): PREVIOUS AND NEXT ERA5 IMAGES
+#('inst', HOUR, TIME): AirT_G, RH_G AND ux_G (INTERPOLATED BETWEEN THE IMAGES OF THE BRACKET OF HOUR)
+#('sw', HOUR): 24H SHORT-WAVE RADIATION (SW_Down)
+#('ra', DATE): 24H EXTRATERRESTRIAL RADIATION (Ra_24h)
+METEOROLOGY_CACHE = OrderedDict()
+METEOROLOGY_CACHE_SIZE = 64
+_lock = threading.Lock()
+
+def get_cached(key, function):
+    with _lock:
+        if key in METEOROLOGY_CACHE:
+            METEOROLOGY_CACHE.move_to_end(key)
+            return METEOROLOGY_CACHE[key]
+    value = function()
+    with _lock:
+        value = METEOROLOGY_CACHE.setdefault(key, value)
+        METEOROLOGY_CACHE.move_to_end(key)
+        while len(METEOROLOGY_CACHE) > METEOROLOGY_CACHE_SIZE:
+            METEOROLOGY_CACHE.popitem(last=False)
+        return value
+
+def clear_meteorology_cache():
+    with _lock:
+        METEOROLOGY_CACHE.clear()
+
+#PREVIOUS AND NEXT ERA5 IMAGES FOR THE LINEAR INTERPOLATION
+def get_era5_bracket(TIME_START_NUM):
 
     DATASET = ee.ImageCollection(meteo_inst_source)
 
-    #LINEAR INTERPOLATION
-    TIME_START_NUM=ee.Number(time_start)
     PREVIOUS_TIME=TIME_START_NUM.subtract(3*60*60*1000)
     NEXT_TIME=TIME_START_NUM.add(3*60*60*1000)
 
@@ -42,34 +78,72 @@ def get_meteorology(image,time_start):
     NEXT_IMAGE=(DATASET.filter(ee.Filter.date(TIME_START_NUM,NEXT_TIME))
                           .limit(1, 'system:time_start', False).first())
 
+    return PREVIOUS_IMAGE, NEXT_IMAGE
+
+#AIR TEMPERATURE, RELATIVE HUMIDITY AND WIND SPEED AT TIME_START_NUM
+def get_instantaneous_meteorology(PREVIOUS_IMAGE, NEXT_IMAGE, TIME_START_NUM):
+
     IMAGE_PREVIOUS_TIME= ee.Number(PREVIOUS_IMAGE.get('system:time_start'))
 
     IMAGE_NEXT_TIME=ee.Number(NEXT_IMAGE.get('system:time_start'))
 
     DELTA_TIME=(TIME_START_NUM.subtract(IMAGE_PREVIOUS_TIME)).divide(IMAGE_NEXT_TIME.subtract(IMAGE_PREVIOUS_TIME))
 
-    #DAY OF THE YEAR
-    dateStr = ee.Date(time_start);
-    doy = dateStr.getRelative('day', 'year');
-    Pi=ee.Number(3.14);
+    # AIR TEMPERATURE [K]
+    tair_c = NEXT_IMAGE.select('temperature_2m')\
+        .subtract(PREVIOUS_IMAGE.select('temperature_2m'))\
+        .multiply(DELTA_TIME).add(PREVIOUS_IMAGE.select('temperature_2m'))\
+        .rename('AirT_G')
 
-    #INVERSE RELATIVE DISTANCE EARTH-SUN
-    #ALLEN ET AL.(1998)
-    d1 =  ee.Number(2).multiply(ee.Number(Pi)).divide(ee.Number(365));
-    d2 = d1.multiply(doy);
-    d3 = d2.cos();
-    dr = ee.Number(1).add(ee.Number(0.033).multiply(d3));
+    # WIND SPEED [M S-1]
+    wind_u = NEXT_IMAGE.select('u_component_of_wind_10m')\
+        .subtract(PREVIOUS_IMAGE.select('u_component_of_wind_10m'))\
+        .multiply(DELTA_TIME).add(PREVIOUS_IMAGE.select('u_component_of_wind_10m'))
 
-    #SOLAR DECLINATION [RADIANS]
-    #ASCE REPORT (2005)
-    e1 =  ee.Number(2).multiply(ee.Number(Pi)).multiply(doy);
-    e2 = e1.divide(ee.Number(365));
-    e3 = e2.subtract(ee.Number(1.39));
-    e4 = e3.sin();
-    solar_dec = ee.Number(0.409).multiply(e4);
+    wind_v = NEXT_IMAGE.select('v_component_of_wind_10m')\
+        .subtract(PREVIOUS_IMAGE.select('v_component_of_wind_10m'))\
+        .multiply(DELTA_TIME).add(PREVIOUS_IMAGE.select('v_component_of_wind_10m'))
+
+    # TODO: CGM check if the select calls are needed
+    wind_med = wind_u.expression(
+        'sqrt(ux_u ** 2 + ux_v ** 2)', {'ux_u': wind_u, 'ux_v': wind_v},
+    ).rename('ux_G')
+
+    wind_med = wind_med.expression(
+        'ux * (4.87) / log(67.8 * z - 5.42)', {'ux': wind_med, 'z': 10.0}).rename('ux_G')
+
+    # PRESSURE [PA] CONVERTED TO KPA
+    tdp = NEXT_IMAGE.select('dewpoint_temperature_2m')\
+        .subtract(PREVIOUS_IMAGE.select('dewpoint_temperature_2m'))\
+        .multiply(DELTA_TIME).add(PREVIOUS_IMAGE.select('dewpoint_temperature_2m'))\
+        .rename('tdp')
+
+    # ACTUAL VAPOR PRESSURE [KPA]
+    ea = tdp.expression(
+        '0.6108 * (exp((17.27 * T_air) / (T_air + 237.3)))',{
+        'T_air': tdp.subtract(273.15)})
+
+    # SATURATED VAPOR PRESSURE [KPA]
+    esat = tair_c.expression(
+        '0.6108 * (exp((17.27 * T_air) / (T_air + 237.3)))', {'T_air': tair_c.subtract(273.15)})
+
+    # RELATIVE HUMIDITY (%)
+    rh = ea.divide(esat).multiply(100).rename('RH_G')
+
+    # Resample
+    tair_c = tair_c.subtract(273.15).resample('bilinear')
+    wind_med = wind_med.resample('bilinear')
+    rh = rh.resample('bilinear')
+
+    return ee.Image.cat(tair_c, rh, wind_med)
+
+#EXTRATERRESTRIAL RADIATION 24H [W M-2]
+def get_ra_24h(dr, solar_dec):
+
+    Pi=ee.Number(3.14);
 
     #GET COORDINATES
-    i_Rn24_coord =DATASET.first().addBands([ee.Image.pixelLonLat()]);
+    i_Rn24_coord =ee.ImageCollection(meteo_inst_source).first().addBands([ee.Image.pixelLonLat()]);
 
     #SUNSET  HOUR ANGLE [RADIANS]
     #ASCE REPORT (2005)
@@ -95,12 +169,75 @@ def get_meteorology(image,time_start):
 
     i_Ra_24h=i_Ra_24h.select('Ra_24h').reduce(ee.Reducer.mean());
 
-    #INCOMING SHORT-WAVE RADIATION DAILY EAN [W M-2]
+    return i_Ra_24h
+
+#INCOMING SHORT-WAVE RADIATION DAILY MEAN [W M-2]
+def get_sw_24h(start, end):
     i_Rs_24h = ee.ImageCollection(meteo_inst_source)\
-                .filterDate(ee.Date(time_start).advance(-11,'hour'),ee.Date(time_start).advance(13,'hour'))\
+                .filterDate(start, end)\
                 .select("surface_solar_radiation_downwards_hourly")\
                 .sum()\
                 .divide(86400).rename('SW_Down')
+    return i_Rs_24h
+
+#time_start: CLIENT-SIDE NUMBER [MS] (MEMOIZED) OR ee.Number (E.G. INSIDE ImageCollection.map)
+#context: SOLAR CONTEXT OF THE SCENE (tools.fexp_solar_context) WITH dr AND solar_dec
+def get_meteorology(image,time_start,context=None):
+
+    #INVERSE RELATIVE DISTANCE EARTH-SUN AND SOLAR DECLINATION [RADIANS]
+    #FROM THE SOLAR CONTEXT OF THE SCENE
+    if context is not None:
+        dr = context['dr'];
+        solar_dec = context['solar_dec'];
+
+    else:
+        #DAY OF THE YEAR
+        dateStr = ee.Date(time_start);
+        doy = dateStr.getRelative('day', 'year');
+        Pi=ee.Number(3.14);
+
+        #INVERSE RELATIVE DISTANCE EARTH-SUN
+        #ALLEN ET AL.(1998)
+        d1 =  ee.Number(2).multiply(ee.Number(Pi)).divide(ee.Number(365));
+        d2 = d1.multiply(doy);
+        d3 = d2.cos();
+        dr = ee.Number(1).add(ee.Number(0.033).multiply(d3));
+
+        #SOLAR DECLINATION [RADIANS]
+        #ASCE REPORT (2005)
+        e1 =  ee.Number(2).multiply(ee.Number(Pi)).multiply(doy);
+        e2 = e1.divide(ee.Number(365));
+        e3 = e2.subtract(ee.Number(1.39));
+        e4 = e3.sin();
+        solar_dec = ee.Number(0.409).multiply(e4);
+
+    #CLIENT-SIDE TIME: PRODUCTS SHARED WITH THE OTHER SCENES
+    #OF THE SAME ERA5 HOUR (BRACKET, SW_Down), TIME (AirT_G, RH_G, ux_G) AND DATE (Ra_24h)
+    if isinstance(time_start, (int, float)):
+        HOUR = int(time_start) - int(time_start) % ERA5_STEP
+        TIME = int(round(time_start / TIME_STEP)) * TIME_STEP
+        DATE = datetime.fromtimestamp(time_start / 1000, timezone.utc).strftime('%Y-%m-%d')
+
+        #ANY TIME INSIDE THE ERA5 HOUR SELECTS THE SAME IMAGES
+        PREVIOUS_IMAGE, NEXT_IMAGE = get_cached(('bracket', HOUR),
+            lambda: get_era5_bracket(ee.Number(HOUR + ERA5_STEP // 2)))
+
+        i_meteorology = get_cached(('inst', HOUR, TIME),
+            lambda: get_instantaneous_meteorology(PREVIOUS_IMAGE, NEXT_IMAGE, ee.Number(TIME)))
+
+        #24H WINDOW (-10H, +14H FROM THE START OF THE ERA5 HOUR)
+        i_Rs_24h = get_cached(('sw', HOUR),
+            lambda: get_sw_24h(ee.Date(HOUR).advance(-10,'hour'), ee.Date(HOUR).advance(14,'hour')))
+
+        i_Ra_24h = get_cached(('ra', DATE), lambda: get_ra_24h(dr, solar_dec))
+
+    else:
+        #LINEAR INTERPOLATION
+        TIME_START_NUM=ee.Number(time_start)
+        PREVIOUS_IMAGE, NEXT_IMAGE = get_era5_bracket(TIME_START_NUM)
+        i_meteorology = get_instantaneous_meteorology(PREVIOUS_IMAGE, NEXT_IMAGE, TIME_START_NUM)
+        i_Rs_24h = get_sw_24h(ee.Date(time_start).advance(-11,'hour'),ee.Date(time_start).advance(13,'hour'))
+        i_Ra_24h = get_ra_24h(dr, solar_dec)
 
     # TASUMI
     i_albedo_ls =image.select('ALFA').first()
@@ -114,57 +251,14 @@ def get_meteorology(image,time_start):
            'Cs': ee.Number(110), #CONSTANT
            'i_Ra_24h': i_Ra_24h}).rename('Rn24h_G');
 
-    # AIR TEMPERATURE [K]
-    tair_c = NEXT_IMAGE.select('temperature_2m')\
-        .subtract(PREVIOUS_IMAGE.select('temperature_2m'))\
-        .multiply(DELTA_TIME).add(PREVIOUS_IMAGE.select('temperature_2m'))\
-        .rename('AirT_G')
-
-    # WIND SPEED [M S-1]
-    wind_u = NEXT_IMAGE.select('u_component_of_wind_10m')\
-        .subtract(PREVIOUS_IMAGE.select('u_component_of_wind_10m'))\
-        .multiply(DELTA_TIME).add(PREVIOUS_IMAGE.select('u_component_of_wind_10m'))
-
-    wind_v = NEXT_IMAGE.select('v_component_of_wind_10m')\
-        .subtract(PREVIOUS_IMAGE.select('v_component_of_wind_10m'))\
-        .multiply(DELTA_TIME).add(PREVIOUS_IMAGE.select('v_component_of_wind_10m'))
-
-    # TODO: CGM check if the select calls are needed
-    wind_med = wind_u.expression(
-        'sqrt(ux_u ** 2 + ux_v ** 2)', {'ux_u': wind_u, 'ux_v': wind_v},
-    ).rename('ux_G')
-
-    wind_med = wind_med.expression(
-        'ux * (4.87) / log(67.8 * z - 5.42)', {'ux': wind_med, 'z': 10.0}).rename('ux_G')
-
-    # PRESSURE [PA] CONVERTED TO KPA
-    tdp = NEXT_IMAGE.select('dewpoint_temperature_2m')\
-        .subtract(PREVIOUS_IMAGE.select('dewpoint_temperature_2m'))\
-        .multiply(DELTA_TIME).add(PREVIOUS_IMAGE.select('dewpoint_temperature_2m'))\
-        .rename('tdp')
-
-    # ACTUAL VAPOR PRESSURE [KPA]
-    ea = tdp.expression(
-        '0.6108 * (exp((17.27 * T_air) / (T_air + 237.3)))',{
-        'T_air': tdp.subtract(273.15)})
-
-    # SATURATED VAPOR PRESSURE [KPA]
-    esat = tair_c.expression(
-        '0.6108 * (exp((17.27 * T_air) / (T_air + 237.3)))', {'T_air': tair_c.subtract(273.15)})
-
-    # RELATIVE HUMIDITY (%)
-    rh = ea.divide(esat).multiply(100).rename('RH_G')
-
     # Resample
-    tair_c = tair_c.subtract(273.15).resample('bilinear')
-    wind_med = wind_med.resample('bilinear')
-    rh = rh.resample('bilinear')
     swdown24h = i_Rs_24h.resample('bilinear')
     rn24h = i_Rn_24h.resample('bilinear')
 
 
     #CONCATENATES IMAGES
-    col_meteorology = ee.Image.cat(rn24h, tair_c, rh, wind_med, swdown24h)
+    col_meteorology = ee.Image.cat(rn24h, i_meteorology.select('AirT_G'), i_meteorology.select('RH_G'),
+                                   i_meteorology.select('ux_G'), swdown24h)
 
     return col_meteorology
 
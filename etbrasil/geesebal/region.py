@@ -0,0 +1,182 @@
+#----------------------------------------------------------------------------------------#
+#---------------------------------------//GEESEBAL//-------------------------------------#
+#GEESEBAL - GOOGLE EARTH ENGINE APP FOR SURFACE ENERGY BALANCE ALGORITHM FOR LAND (SEBAL)
+#CREATE BY: LEONARDO LAIPELT, RAFAEL KAYSER, ANDERSON RUHOFF AND AYAN FLEISCHMANN
+#PROJECT - ET BRASIL https://etbrasil.org/
+#LAB - HIDROLOGIA DE GRANDE ESCALA [HGE] website: https://www.ufrgs.br/hge/author/hge/
+#UNIVERSITY - UNIVERSIDADE FEDERAL DO RIO GRANDE DO SUL - UFRGS
+#RIO GRANDE DO SUL, BRAZIL
+
+#DOI
+#VERSION 0.1.1
+#CONTACT US: leonardo.laipelt@ufrgs.br
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+
+#PYTHON PACKAGES
+#Call EE
+import ee
+import asyncio
+from datetime import date, datetime, timezone
+
+#FOLDERS
+from .landsatcollection import LANDSAT_COLLECTIONS, fexp_landsat_scenes, fexp_landsat_image
+from .image import Image
+from .scheduler import fexp_run_scenes, fexp_run_scenes_async
+
+#REGIONAL FUNCTION
+#ALL WRS PATH/ROWS INTERSECTING geometry (tiles) AND THEIR DATES (dates)
+#THE SCENES OF ALL TILES SHARE ONE SCHEDULER: max_workers IS THE GLOBAL CONCURRENCY CAP
+#SCENES ARE SCHEDULED BY DATE: THE TILES OF ONE DATE SHARE THE METEOROLOGY (meteorology.py CACHE)
+#EACH SCENE IS ONLY PROCESSED INSIDE geometry (Image(aoi=geometry))
+#RESULT: ONE ET_24h MOSAIC PER DATE (ET_mosaics, ET_collection). OVERLAPPING TILES ARE AVERAGED
+class Region():
+
+    #ENDMEMBERS DEFAULT
+    #ALLEN ET AL. (2013)
+    def __init__(self,
+                 year_i,
+                 month_i,
+                 day_i,
+                 year_e,
+                 month_e,
+                 day_e,
+                 cloud_cover,
+                 geometry,
+                 NDVI_cold=5,
+                 Ts_cold=20,
+                 NDVI_hot=10,
+                 Ts_hot=20,
+                 solver='client',
+                 n_iter_max=15,
+                 n_dif_min=0.1,
+                 percentile_scale=None,
+                 selection='ranked',
+                 seed=0,
+                 coarse_scale=None,
+                 calibration_buffer=None,
+                 max_workers=4,
+                 compute=True,
+                 cache=None,
+                 index=None):
+
+        #INFORMATIONS
+        self.geometry=ee.Geometry(geometry)
+        self.cloud_cover=cloud_cover
+        self.i_date=date(year_i,month_i,day_i)
+        self.e_date=date(year_e,month_e,day_e)
+        self.start_date=ee.Date(self.i_date.isoformat())
+        self.end_date=ee.Date(self.e_date.isoformat())
+        self.max_workers=max_workers
+
+        #LOCAL SCENE INDEX (sceneindex.SceneIndex)
+        #SCENE LISTS ARE QUERIED LOCALLY (NO reduceColumns REQUEST)
+        self.index=index
+
+        #SEBAL PARAMETERS
+        self.parameters=dict(NDVI_cold=NDVI_cold, Ts_cold=Ts_cold, NDVI_hot=NDVI_hot, Ts_hot=Ts_hot,
+                             solver=solver, n_iter_max=n_iter_max, n_dif_min=n_dif_min, cache=cache,
+                             percentile_scale=percentile_scale, selection=selection, seed=seed,
+                             coarse_scale=coarse_scale, aoi=self.geometry, calibration_buffer=calibration_buffer)
+
+        #compute=False ONLY STORES THE INPUTS
+        #USE process() OR await compute()
+        if compute:
+            self.process()
+
+    #SEBAL PROCESS FOR ALL SCENES OF ALL TILES
+    def process(self):
+        self.fexp_scene_list()
+        self.images, self.errors = fexp_run_scenes(self._fexp_scene, self.CollectionList, self.max_workers)
+        self.fexp_mosaics()
+        return self
+
+    #AWAITABLE COMPUTE
+    #THE BLOCKING getInfo CALLS RUN ON AN EXECUTOR (DEFAULT: LOOP THREAD POOL)
+    #AT MOST max_workers SCENES (OF ALL TILES) ARE RUNNING AT THE SAME TIME
+    async def compute(self, executor=None):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, self.fexp_scene_list)
+        self.images, self.errors = await fexp_run_scenes_async(self._fexp_scene, self.CollectionList,
+                                                               self.max_workers, executor)
+        self.fexp_mosaics()
+        return self
+
+    #SCENES, TILES AND DATES OF THE REGION
+    def fexp_scene_list(self):
+
+        #SCENES FROM THE LOCAL INDEX
+        if self.index is not None:
+            scenes=fexp_landsat_scenes(self.index, self.i_date, self.e_date, self.cloud_cover,
+                                       coordinate=self.geometry)
+
+            #THE INDEX IS QUERIED BY THE BOUNDING BOX OF THE GEOMETRY
+            #SCENES OUTSIDE THE GEOMETRY ARE DROPPED, AS filterBounds DOES (ONE REQUEST)
+            if scenes:
+                inside=ee.List([ee.Geometry(scene['footprint']).intersects(self.geometry, 1)
+                                for scene in scenes]).getInfo()
+                scenes=[scene for scene, flag in zip(scenes, inside) if flag]
+
+        #SCENES OF THE THREE SENSORS (ONE REQUEST)
+        else:
+            d_scenes={}
+            for sensor, (collection_id, bands, names) in LANDSAT_COLLECTIONS.items():
+                collection=(ee.ImageCollection(collection_id)
+                            .filterDate(self.start_date, self.end_date)
+                            .filterBounds(self.geometry)
+                            .filterMetadata('CLOUD_COVER', 'less_than', self.cloud_cover))
+                d_scenes[sensor]=collection.reduceColumns(
+                    ee.Reducer.toList(4), ['system:index', 'WRS_PATH', 'WRS_ROW', 'system:time_start']).get('list')
+            d_scenes=ee.Dictionary(d_scenes).getInfo()
+            scenes=[{'scene_id': scene_id,
+                     'asset_id': LANDSAT_COLLECTIONS[sensor][0]+'/'+scene_id,
+                     'sensor': sensor,
+                     'path': path,
+                     'row': row,
+                     'time_start': time_start,
+                     'date': datetime.fromtimestamp(time_start/1000, timezone.utc).strftime('%Y-%m-%d')}
+                    for sensor, rows in d_scenes.items() for scene_id, path, row, time_start in rows]
+
+        #SORTED BY TIME: SCENES OF THE SAME DATE RUN TOGETHER
+        scenes.sort(key=lambda scene: scene['time_start'])
+        self.scenes={scene['scene_id']: scene for scene in scenes}
+        self.tiles=sorted({(scene['path'], scene['row']) for scene in scenes})
+        self.dates={}
+        for scene in scenes:
+            self.dates.setdefault(scene['date'], []).append(scene['scene_id'])
+        self.CollectionList=list(self.scenes)
+        self.count=len(self.CollectionList)
+
+        #PRINT NUMBER OF TILES, DATES AND SCENES
+        print("Number of tiles: ", len(self.tiles))
+        print("Number of dates: ", len(self.dates))
+        print("Number of scenes: ", self.count)
+
+    #SEBAL FOR ONE SCENE OF THE REGION
+    def _fexp_scene(self, scene_id):
+        sebal=Image(fexp_landsat_image(self.scenes[scene_id]), **self.parameters)
+
+        #PRINT ID
+        print(sebal.LANDSAT_ID)
+        return sebal
+
+    #====== ET DAILY MOSAIC OF EACH DATE ======#
+    #FAILED SCENES ARE SKIPPED (SEE self.errors)
+    def fexp_mosaics(self):
+
+        #NUMBER OF ITERATIONS OF THE SENSIBLE HEAT FLUX FOR EACH SCENE
+        self.sebal={scene_id: sebal for scene_id, sebal in zip(self.CollectionList, self.images) if sebal is not None}
+        self.List_iterations={scene_id: sebal.n_iterations for scene_id, sebal in self.sebal.items()}
+
+        self.ET_mosaics={}
+        for date_string, scene_ids in self.dates.items():
+            images=[self.sebal[scene_id].image.select('ET_24h') for scene_id in scene_ids if scene_id in self.sebal]
+            if not images:
+                continue
+            self.ET_mosaics[date_string]=(ee.ImageCollection(images).mean().clip(self.geometry)
+                                          .set({'date_string': date_string,
+                                                'system:time_start': ee.Date(date_string).millis(),
+                                                'n_scenes': len(images)}))
+        self.ET_collection=ee.ImageCollection(list(self.ET_mosaics.values()))
@@ -0,0 +1,181 @@
+#----------------------------------------------------------------------------------------#
+#---------------------------------------//GEESEBAL//-------------------------------------#
+#GEESEBAL - GOOGLE EARTH ENGINE APP FOR SURFACE ENERGY BALANCE ALGORITHM FOR LAND (SEBAL)
+#CREATE BY: LEONARDO LAIPELT, RAFAEL KAYSER, ANDERSON RUHOFF AND AYAN FLEISCHMANN
+#PROJECT - ET BRASIL https://etbrasil.org/
+#LAB - HIDROLOGIA DE GRANDE ESCALA [HGE] website: https://www.ufrgs.br/hge/author/hge/
+#UNIVERSITY - UNIVERSIDADE FEDERAL DO RIO GRANDE DO SUL - UFRGS
+#RIO GRANDE DO SUL, BRAZIL
+
+#DOI
+#VERSION 0.1.1
+#CONTACT US: leonardo.laipelt@ufrgs.br
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+
+#PYTHON PACKAGES
+#Call EE
+import ee
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timezone
+
+#DEFAULT INDEX FILE
+INDEX_PATH=os.path.join(os.path.expanduser('~'), '.geesebal', 'scenes.sqlite')
+
+#LENGTH OF EACH REQUEST WINDOW [MS] (ONE YEAR)
+#KEEPS EACH getInfo BELOW THE 5000 ELEMENTS LIMIT
+WINDOW=365*24*3600*1000
+
+#DATE (datetime.date OR 'YYYY-MM-DD') TO MILLISECONDS
+def fexp_time_ms(date):
+    if isinstance(date, str):
+        date=datetime.strptime(date, '%Y-%m-%d')
+    return int(datetime(date.year, date.month, date.day, tzinfo=timezone.utc).timestamp()*1000)
+
+#POINT IN POLYGON (RAY CASTING) FOR GeoJSON Polygon AND MultiPolygon
+def fexp_point_in_footprint(x, y, footprint):
+    if footprint['type'] == 'Polygon':
+        polygons=[footprint['coordinates']]
+    elif footprint['type'] == 'MultiPolygon':
+        polygons=footprint['coordinates']
+    else:
+        return False
+    for polygon in polygons:
+        ring=polygon[0]
+        inside=False
+        for (x1, y1), (x2, y2) in zip(ring, ring[1:]+ring[:1]):
+            if (y1 > y) != (y2 > y) and x < (x2-x1)*(y-y1)/(y2-y1)+x1:
+                inside=not inside
+        if inside:
+            return True
+    return False
+
+#LOCAL INDEX OF LANDSAT SCENE METADATA
+#(SCENE ID, ASSET ID, SENSOR, PATH, ROW, DATE, CLOUD COVER, FOOTPRINT)
+#refresh() ONLY REQUESTS THE TIME WINDOWS NOT YET INDEXED FOR A QUERY
+#(ONE getInfo PER WINDOW). query() RUNS LOCALLY.
+class SceneIndex():
+
+    def __init__(self, path=INDEX_PATH):
+        self.path=path
+        self._lock=threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock, closing(sqlite3.connect(self.path)) as connection, connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS scenes ('
+                               'scene_id TEXT PRIMARY KEY, asset_id TEXT, collection TEXT, sensor TEXT, '
+                               'LANDSAT_ID TEXT, path INTEGER, row INTEGER, time_start INTEGER, date TEXT, '
+                               'cloud_cover REAL, footprint TEXT, xmin REAL, ymin REAL, xmax REAL, ymax REAL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS scenes_time ON scenes (time_start)')
+            connection.execute('CREATE INDEX IF NOT EXISTS scenes_path_row ON scenes (path, row)')
+            connection.execute('CREATE TABLE IF NOT EXISTS coverage ('
+                               'collection TEXT, query TEXT, start INTEGER, end INTEGER)')
+
+    #TIME WINDOWS [start, end) NOT YET INDEXED FOR A QUERY
+    def fexp_missing(self, collection, query, start, end):
+        with self._lock, closing(sqlite3.connect(self.path)) as connection:
+            covered=connection.execute('SELECT start, end FROM coverage WHERE collection=? AND query=? '
+                                       'AND end>? AND start<? ORDER BY start',
+                                       (collection, query, start, end)).fetchall()
+        missing=[]
+        for c_start, c_end in covered:
+            if c_start > start:
+                missing.append((start, min(c_start, end)))
+            start=max(start, c_end)
+        if start < end:
+            missing.append((start, end))
+        return missing
+
+    #ADD THE SCENES OF A COLLECTION TO THE INDEX
+    #collection: ee.ImageCollection ALREADY FILTERED BY PATH/ROW OR BOUNDS (NO CLOUD COVER FILTER)
+    #query: NAME OF THE FILTER (E.G. 'path=222,row=81')
+    def refresh(self, collection_id, collection, query, start_date, end_date):
+        start=fexp_time_ms(start_date)
+        end=fexp_time_ms(end_date)
+
+        #SCENES ACQUIRED AFTER NOW CAN STILL BE ADDED LATER
+        end_covered=min(end, int(time.time()*1000))
+
+        for w_start, w_end in self.fexp_missing(collection_id, query, start, end):
+            while w_start < w_end:
+                w_stop=min(w_start+WINDOW, w_end)
+                features=collection.filterDate(w_start, w_stop).map(lambda image: ee.Feature(image.geometry(), {
+                    'scene_id': image.get('system:index'),
+                    'LANDSAT_ID': image.get('LANDSAT_ID'),
+                    'SATELLITE': image.get('SATELLITE'),
+                    'WRS_PATH': image.get('WRS_PATH'),
+                    'WRS_ROW': image.get('WRS_ROW'),
+                    'CLOUD_COVER': image.get('CLOUD_COVER'),
+                    'system:time_start': image.get('system:time_start')})).getInfo()['features']
+                self.fexp_insert(collection_id, features)
+                if w_start < end_covered:
+                    with self._lock, closing(sqlite3.connect(self.path)) as connection, connection:
+                        connection.execute('INSERT INTO coverage VALUES (?,?,?,?)',
+                                           (collection_id, query, w_start, min(w_stop, end_covered)))
+                w_start=w_stop
+
+    #INSERT SCENES (GeoJSON FEATURES)
+    def fexp_insert(self, collection_id, features):
+        rows=[]
+        for feature in features:
+            properties=feature['properties']
+            footprint=feature['geometry']
+            coordinates=[point for polygon in (footprint['coordinates'] if footprint['type'] == 'MultiPolygon'
+                                               else [footprint['coordinates']]) for point in polygon[0]]
+            xs=[point[0] for point in coordinates]
+            ys=[point[1] for point in coordinates]
+            time_start=properties['system:time_start']
+            rows.append((properties['scene_id'], collection_id+'/'+properties['scene_id'], collection_id,
+                         properties['SATELLITE'], properties['LANDSAT_ID'], properties['WRS_PATH'],
+                         properties['WRS_ROW'], time_start,
+                         datetime.fromtimestamp(time_start/1000, timezone.utc).strftime('%Y-%m-%d'),
+                         properties['CLOUD_COVER'], json.dumps(footprint), min(xs), min(ys), max(xs), max(ys)))
+        with self._lock, closing(sqlite3.connect(self.path)) as connection, connection:
+            connection.executemany('INSERT OR REPLACE INTO scenes VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)', rows)
+
+    #LOCAL QUERY
+    #SCENES BETWEEN start_date (INCLUDED) AND end_date (EXCLUDED), SORTED BY DATE
+    #FILTERS: sensors (E.G. ['LANDSAT_8']), path/row, bounds [xmin, ymin, xmax, ymax],
+    #point [x, y] (INSIDE THE FOOTPRINT) AND cloud_cover (LESS THAN)
+    def query(self, start_date, end_date, sensors=None, path=None, row=None, bounds=None, point=None,
+              cloud_cover=None):
+        sql='SELECT * FROM scenes WHERE time_start>=? AND time_start<?'
+        arguments=[fexp_time_ms(start_date), fexp_time_ms(end_date)]
+        if sensors is not None:
+            sql+=' AND sensor IN ({})'.format(','.join('?'*len(sensors)))
+            arguments+=list(sensors)
+        if path is not None:
+            sql+=' AND path=?'
+            arguments.append(path)
+        if row is not None:
+            sql+=' AND row=?'
+            arguments.append(row)
+        if point is not None:
+            bounds=[point[0], point[1], point[0], point[1]]
+        if bounds is not None:
+            sql+=' AND xmax>=? AND xmin<=? AND ymax>=? AND ymin<=?'
+            arguments+=[bounds[0], bounds[2], bounds[1], bounds[3]]
+        if cloud_cover is not None:
+            sql+=' AND cloud_cover<?'
+            arguments.append(cloud_cover)
+        sql+=' ORDER BY time_start'
+
+        with self._lock, closing(sqlite3.connect(self.path)) as connection:
+            connection.row_factory=sqlite3.Row
+            scenes=[dict(scene) for scene in connection.execute(sql, arguments)]
+        for scene in scenes:
+            scene['footprint']=json.loads(scene['footprint'])
+        if point is not None:
+            scenes=[scene for scene in scenes if fexp_point_in_footprint(point[0], point[1], scene['footprint'])]
+        return scenes
+
+    def __len__(self):
+        with self._lock, closing(sqlite3.connect(self.path)) as connection:
+            return connection.execute('SELECT COUNT(*) FROM scenes').fetchone()[0]
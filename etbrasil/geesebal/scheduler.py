@@ -0,0 +1,74 @@
+#----------------------------------------------------------------------------------------#
+#---------------------------------------//GEESEBAL//-------------------------------------#
+#GEESEBAL - GOOGLE EARTH ENGINE APP FOR SURFACE ENERGY BALANCE ALGORITHM FOR LAND (SEBAL)
+#CREATE BY: LEONARDO LAIPELT, RAFAEL KAYSER, ANDERSON RUHOFF AND AYAN FLEISCHMANN
+#PROJECT - ET BRASIL https://etbrasil.org/
+#LAB - HIDROLOGIA DE GRANDE ESCALA [HGE] website: https://www.ufrgs.br/hge/author/hge/
+#UNIVERSITY - UNIVERSIDADE FEDERAL DO RIO GRANDE DO SUL - UFRGS
+#RIO GRANDE DO SUL, BRAZIL
+
+#DOI
+#VERSION 0.1.1
+#CONTACT US: leonardo.laipelt@ufrgs.br
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+
+#PYTHON PACKAGES
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+#ERROR MESSAGE OF A FAILED SCENE
+# ERRORS CAN OCCUR WHEN:
+# - THERE IS NO METEOROLOGICAL INFORMATION.
+# - ET RETURN NULL IF AT THE POINT WAS APPLIED MASK CLOUD.
+# - CONEECTION ISSUES.
+# - SEBAL DOESN'T FIND A REASONABLE LINEAR RELATIONSHIP (dT).
+def fexp_scene_error(scene, error):
+    print('Error ({}): {}'.format(scene, error))
+    return None, error
+
+#RUN A FUNCTION FOR EACH SCENE
+#SCENES ARE PROCESSED CONCURRENTLY WITH max_workers THREADS
+#(EACH SCENE SPENDS MOST OF ITS TIME WAITING FOR getInfo)
+#RETURNS THE RESULTS IN THE ORDER OF THE SCENES (None IF AN ERROR OCCURRED)
+#AND A DICTIONARY WITH THE ERROR OF EACH FAILED SCENE
+def fexp_run_scenes(function, scenes, max_workers=1):
+
+    def run(scene):
+        try:
+            return function(scene), None
+        except Exception as error:
+            return fexp_scene_error(scene, error)
+
+    if max_workers is None or max_workers <= 1:
+        outputs = [run(scene) for scene in scenes]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            outputs = list(executor.map(run, scenes))
+
+    return fexp_split_outputs(scenes, outputs)
+
+#ASYNCIO VERSION OF fexp_run_scenes
+#THE FUNCTION RUNS ON executor (DEFAULT: LOOP THREAD POOL)
+#AT MOST max_workers SCENES ARE RUNNING AT THE SAME TIME
+async def fexp_run_scenes_async(function, scenes, max_workers=1, executor=None):
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max(1, max_workers or 1))
+
+    async def run(scene):
+        async with semaphore:
+            try:
+                return await loop.run_in_executor(executor, function, scene), None
+            except Exception as error:
+                return fexp_scene_error(scene, error)
+
+    outputs = await asyncio.gather(*[run(scene) for scene in scenes])
+    return fexp_split_outputs(scenes, outputs)
+
+#RESULTS (IN THE ORDER OF THE SCENES) AND ERRORS
+def fexp_split_outputs(scenes, outputs):
+    results = [result for result, error in outputs]
+    errors = {scene: error for scene, (result, error) in zip(scenes, outputs) if error is not None}
+    return results, errors
@@ -0,0 +1,119 @@
+#----------------------------------------------------------------------------------------#
+#---------------------------------------//GEESEBAL//-------------------------------------#
+#GEESEBAL - GOOGLE EARTH ENGINE APP FOR SURFACE ENERGY BALANCE ALGORITHM FOR LAND (SEBAL)
+#CREATE BY: LEONARDO LAIPELT, RAFAEL KAYSER, ANDERSON RUHOFF AND AYAN FLEISCHMANN
+#PROJECT - ET BRASIL https://etbrasil.org/
+#LAB - HIDROLOGIA DE GRANDE ESCALA [HGE] website: https://www.ufrgs.br/hge/author/hge/
+#UNIVERSITY - UNIVERSIDADE FEDERAL DO RIO GRANDE DO SUL - UFRGS
+#RIO GRANDE DO SUL, BRAZIL
+
+#DOI
+#VERSION 0.1.1
+#CONTACT US: leonardo.laipelt@ufrgs.br
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+
+#PYTHON PACKAGES
+#Call EE
+import ee
+
+#FOLDERS
+from .meteorology import get_meteorology
+from .tools import (fexp_spec_ind, fexp_radlong_up, LST_DEM_correction,
+fexp_radshort_down, fexp_radlong_down, fexp_radbalance, fexp_soil_heat,fexp_sensible_heat_flux,
+fexp_solar_context, fexp_atmosphere_context, fexp_check_iterations)
+from .endmembers import fexp_cold_pixel, fexp_hot_pixel, fexp_endmember_thresholds, fexp_coarse_to_fine
+from .evapotranspiration import fexp_et
+
+#SEBAL CHAIN FOR ONE IMAGE WITHOUT CLIENT-SIDE CALLS (NO getInfo)
+#CAN BE USED WITH ImageCollection.map
+#THE IMAGE MUST HAVE RENAMED BANDS (landsatcollection.py), CLOUD MASK AND ALBEDO (masks.py)
+#RETURNS AN IMAGE WITH THE ET_24h BAND
+def fexp_sebal(image, NDVI_cold=5, Ts_cold=20, NDVI_hot=10, Ts_hot=20, n_iter_max=15, n_dif_min=0.1,
+               percentile_scale=None, selection='ranked', seed=0, coarse_scale=None, aoi=None,
+               calibration_buffer=None):
+
+    #GET INFORMATIONS FROM IMAGE
+    fexp_check_iterations(n_iter_max)
+    image=ee.Image(image)
+    time_start=image.get('system:time_start')
+    _date=ee.Date(time_start)
+    _hour=ee.Number(_date.get('hour'))
+    _minuts=ee.Number(_date.get('minutes'))
+    date_string=_date.format('YYYY-MM-dd')
+    sun_elevation=ee.Number(90).subtract(image.get('SOLAR_ZENITH_ANGLE'))
+
+    #GEOMETRY
+    geometryReducer=image.geometry().bounds()
+
+    #CALIBRATION DOMAIN (ENDMEMBERS): AOI BOUNDS BUFFERED BY calibration_buffer [M] OR THE WHOLE SCENE
+    calibration_domain=geometryReducer
+    if aoi is not None and calibration_buffer is not None:
+        calibration_domain=ee.Geometry(aoi).buffer(calibration_buffer).bounds().intersection(geometryReducer, 1)
+
+    #SOLAR CONTEXT (doy, dr, solar_dec, cos_theta)
+    context=fexp_solar_context(_date, sun_elevation)
+
+    #METEOROLOGY PARAMETERS
+    col_meteorology=get_meteorology(ee.ImageCollection([image]),time_start,context)
+    T_air=col_meteorology.select('AirT_G')
+    ux=col_meteorology.select('ux_G')
+    UR=col_meteorology.select('RH_G')
+    Rn24hobs=col_meteorology.select('Rn24h_G')
+
+    #SRTM DATA ELEVATION
+    z_alt=ee.Image('USGS/SRTMGL1_003').clip(geometryReducer).select('elevation')
+
+    #ATMOSPHERIC CONTEXT (pres, es, ea, W, tao_sw)
+    context=fexp_atmosphere_context(context, image, z_alt, T_air, UR)
+
+    #SPECTRAL IMAGES (NDVI, EVI, SAVI, LAI, T_LST, e_0, e_NB, long, lat)
+    image=fexp_spec_ind(image)
+
+    #LAND SURFACE TEMPERATURE
+    image=LST_DEM_correction(image, z_alt, T_air, UR, sun_elevation, _hour, _minuts, context)
+
+    #NDVI/LST THRESHOLDS OF BOTH ENDMEMBERS (TWO SCANS)
+    #coarse_scale: 30 M LST SEARCH ONLY INSIDE THE QUALIFYING COARSE CELLS (fexp_coarse_to_fine)
+    cold_region, hot_region = calibration_domain, calibration_domain
+    if coarse_scale is not None:
+        d_search=fexp_coarse_to_fine(image, calibration_domain, ee.Number(NDVI_cold), ee.Number(Ts_cold),
+                                     ee.Number(NDVI_hot), ee.Number(Ts_hot), coarse_scale, percentile_scale)
+        thresholds=d_search['thresholds']
+        cold_region, hot_region = d_search['cold_region'], d_search['hot_region']
+    else:
+        thresholds=fexp_endmember_thresholds(image, calibration_domain, ee.Number(NDVI_cold), ee.Number(Ts_cold),
+                                             ee.Number(NDVI_hot), ee.Number(Ts_hot), percentile_scale)
+
+    #COLD PIXEL
+    d_cold_pixel=fexp_cold_pixel(image, cold_region, ee.Number(NDVI_cold), ee.Number(Ts_cold), percentile_scale,
+                                 thresholds, selection, seed)
+    n_Ts_cold=ee.Number(d_cold_pixel.get('temp'))
+
+    #RADIATION BALANCE AND SOIL HEAT FLUX [W M-2]
+    image=fexp_radlong_up(image)
+    image=fexp_radshort_down(image, z_alt, T_air, UR, sun_elevation, context)
+    image=fexp_radlong_down(image, n_Ts_cold)
+    image=fexp_radbalance(image)
+    image=fexp_soil_heat(image)
+
+    #HOT PIXEL
+    d_hot_pixel=fexp_hot_pixel(image, hot_region, ee.Number(NDVI_hot), ee.Number(Ts_hot), percentile_scale,
+                               thresholds, selection, seed)
+
+    #SENSIBLE HEAT FLUX (H) [W M-2]
+    image=fexp_sensible_heat_flux(image, ux, UR, Rn24hobs, n_Ts_cold, d_hot_pixel, date_string, calibration_domain,
+                                  'deferred', n_iter_max, n_dif_min)
+
+    #PROCESSING DOMAIN
+    if aoi is not None:
+        image=image.clip(aoi)
+
+    #DAILY EVAPOTRANSPIRATION (ET_24H) [MM DAY-1]
+    image=fexp_et(image, Rn24hobs)
+
+    LANDSAT_ID=ee.String(image.get('LANDSAT_ID'))
+    NAME_FINAL=LANDSAT_ID.slice(0,5).cat(LANDSAT_ID.slice(10,17)).cat(LANDSAT_ID.slice(17,25))
+    return image.select(['ET_24h']).set({'NAME_FINAL': NAME_FINAL, 'date_string': date_string})
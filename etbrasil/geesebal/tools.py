@@ -18,6 +18,7 @@
 #PYTHON PACKAGES
 #Call EE
 import ee
+import math
 
 #SPECTRAL INDICES MODULE
 def fexp_spec_ind(image):
@@ -196,17 +197,12 @@ def fexp_lst_export(img_main,img_main_RAD,landsat_version,refpoly):
     return img_main
 
 #LAND SURFACE TEMPERATURE WITH DEM CORRECTION AND ASPECT/SLOPE
-#JAAFAR AND AHMAD (2020)
-#PYSEBAL (BASTIAANSSEN) Reference?
-
-def LST_DEM_correction(image, z_alt, T_air, UR,SUN_ELEVATION,hour,minuts):
-
-    #SOLAR CONSTANT [W M-2]
-    gsc = ee.Number(1367)
+#SOLAR CONTEXT OF THE SCENE
+#COMPUTED ONCE AND SHARED BY get_meteorology, LST_DEM_correction AND fexp_radshort_down
+def fexp_solar_context(date, SUN_ELEVATION):
 
     #DAY OF YEAR
-    dateStr = image.date()
-    doy = dateStr.getRelative('day', 'year')
+    doy = ee.Date(date).getRelative('day', 'year')
     Pi=ee.Number(3.14)
 
     #INVERSE RELATIVE  DISTANCE EARTH-SUN
@@ -215,6 +211,25 @@ def LST_DEM_correction(image, z_alt, T_air, UR,SUN_ELEVATION,hour,minuts):
     d3 = d2.cos()
     dr = ee.Number(1).add(ee.Number(0.033).multiply(d3))
 
+    #SOLAR DECLINATION [RADIANS]
+    #ASCE REPORT (2005)
+    e1 =  ee.Number(2).multiply(ee.Number(Pi)).multiply(doy)
+    e2 = e1.divide(ee.Number(365))
+    e3 = e2.subtract(ee.Number(1.39))
+    e4 = e3.sin()
+    solar_dec = ee.Number(0.409).multiply(e4)
+
+    #SOLAR ZENITH ANGLE OVER A HORZONTAL SURFACE
+    solar_zenith = ee.Number(90).subtract(SUN_ELEVATION)
+    degree2radian = 0.01745
+    solar_zenith_radians = solar_zenith.multiply(degree2radian)
+    cos_theta = solar_zenith_radians.cos()
+
+    return {'doy': doy, 'dr': dr, 'solar_dec': solar_dec, 'cos_theta': cos_theta}
+
+#ATMOSPHERIC CONTEXT OF THE SCENE (ADDED TO THE SOLAR CONTEXT)
+def fexp_atmosphere_context(context, image, z_alt, T_air, UR):
+
     #ATMOSPHERIC PRESSURE [KPA]
     #SHUTTLEWORTH (2012)
     pres = image.expression(
@@ -236,12 +251,6 @@ def LST_DEM_correction(image, z_alt, T_air, UR,SUN_ELEVATION,hour,minuts):
        'PATM' : pres,
        'EA' : ea}).rename('W_ATM')
 
-    #SOLAR ZENITH ANGLE OVER A HORZONTAL SURFACE
-    solar_zenith = ee.Number(90).subtract(SUN_ELEVATION)
-    degree2radian = 0.01745
-    solar_zenith_radians = solar_zenith.multiply(degree2radian)
-    cos_theta = solar_zenith_radians.cos()
-
     #BROAD-BAND ATMOSPHERIC TRANSMISSIVITY (tao_sw)
     #ASCE-EWRI (2005)
     tao_sw = image.expression(
@@ -249,7 +258,33 @@ def LST_DEM_correction(image, z_alt, T_air, UR,SUN_ELEVATION,hour,minuts):
        'P' : pres,
        'W': W,
        'Kt' : ee.Number(1),
-       'cos_theta' : cos_theta}).rename('Tao_sw')
+       'cos_theta' : context['cos_theta']}).rename('Tao_sw')
+
+    context = dict(context)
+    context.update({'pres': pres, 'es': es, 'ea': ea, 'W': W, 'tao_sw': tao_sw})
+    return context
+
+#SOLAR AND ATMOSPHERIC CONTEXT OF THE SCENE
+def fexp_context(image, z_alt, T_air, UR, SUN_ELEVATION):
+    return fexp_atmosphere_context(fexp_solar_context(image.date(), SUN_ELEVATION), image, z_alt, T_air, UR)
+
+#JAAFAR AND AHMAD (2020)
+#PYSEBAL (BASTIAANSSEN) Reference?
+
+def LST_DEM_correction(image, z_alt, T_air, UR,SUN_ELEVATION,hour,minuts, context=None):
+
+    #SOLAR CONSTANT [W M-2]
+    gsc = ee.Number(1367)
+
+    #SOLAR AND ATMOSPHERIC CONTEXT (doy, dr, pres, tao_sw, cos_theta)
+    if context is None:
+        context = fexp_context(image, z_alt, T_air, UR, SUN_ELEVATION)
+    doy = context['doy']
+    dr = context['dr']
+    pres = context['pres']
+    cos_theta = context['cos_theta']
+    tao_sw = context['tao_sw']
+    degree2radian = 0.01745
 
     #AIR DENSITY [KG M-3]
     air_dens = image.expression(
@@ -347,57 +382,19 @@ def fexp_radlong_up(image):
    return image
 
 #INSTANTANEOUS INCOMING SHORT-WAVE RADIATION (Rs_down) [W M-2]
-def fexp_radshort_down(image, z_alt, T_air, UR,SUN_ELEVATION):
+def fexp_radshort_down(image, z_alt, T_air, UR,SUN_ELEVATION, context=None):
 
     #SOLAR CONSTANT
     gsc = ee.Number(1367) #[W M-2]
 
-    #DAY OF THE YEAR
-    dateStr = image.date()
-    doy = dateStr.getRelative('day', 'year')
-    Pi=ee.Number(3.14)
-
-    #INVERSE RELATIVE  DISTANCE EARTH-SUN
-    d1 =  ee.Number(2).multiply(Pi).divide(ee.Number(365));
-    d2 = d1.multiply(doy);
-    d3 = d2.cos();
-    dr = ee.Number(1).add(ee.Number(0.033).multiply(d3));
-
-    #ATMOSPHERIC PRESSURE [KPA]
-    #SHUTTLEWORTH (2012)
-    pres = image.expression(
-       '101.3 * ((293 - (0.0065 * Z))/ 293) ** 5.26 ', {
-       'Z' : z_alt}).rename('P_ATM')
-
-    #SATURATION VAPOR PRESSURE (es) [KPA]
-    es = image.expression(
-       ' 0.6108 *(exp( (17.27 * T_air) / (T_air + 237.3)))', {
-       'T_air': T_air}).rename('ES')
-
-    #ACTUAL VAPOR PRESSURE (ea) [KPA]
-    ea = es.multiply(UR).divide(100).rename('EA')
-
-    #WATER IN THE ATMOSPHERE [mm]
-    #GARRISON AND ADLER (1990)
-    W = image.expression(
-       '(0.14 * EA * PATM) + 2.1', {
-       'PATM' : pres,
-       'EA' : ea, }).rename('W_ATM')
-
-    #SOLAR ZENITH ANGLE OVER A HORIZONTAL SURFACE
-    solar_zenith = ee.Number(90).subtract(SUN_ELEVATION)
-    degree2radian = 0.01745
-    solar_zenith_radians = solar_zenith.multiply(degree2radian)
-    cos_theta = solar_zenith_radians.cos()
-
-    #BROAD-BAND ATMOSPHERIC TRANSMISSIVITY (tao_sw)
-    #ASCE-EWRI (2005)
-    tao_sw = image.expression(
-       '0.35 + 0.627 * exp(((-0.00146 * P)/(Kt * cos_theta)) - (0.075 * (W / cos_theta)**0.4))', {
-       'P' : pres,
-       'W': W,
-       'Kt' : ee.Number(1),
-       'cos_theta' : cos_theta}).rename('Tao_sw')
+    #SOLAR AND ATMOSPHERIC CONTEXT (dr, es, ea, tao_sw, cos_theta)
+    if context is None:
+        context = fexp_context(image, z_alt, T_air, UR, SUN_ELEVATION)
+    dr = context['dr']
+    es = context['es']
+    ea = context['ea']
+    cos_theta = context['cos_theta']
+    tao_sw = context['tao_sw']
 
     #INSTANTANEOUS SHORT-WAVE RADIATION (Rs_down) [W M-2]
     Rs_down = image.expression(
@@ -456,8 +453,32 @@ def fexp_soil_heat(image):
     image = image.addBands([G]);
     return image
 
+#NUMBER OF STEPS OF THE HOT PIXEL ITERATION (AT LEAST ONE)
+def fexp_check_iterations(n_iter_max):
+    if n_iter_max is None or n_iter_max < 1:
+        raise ValueError('n_iter_max must be at least 1 (got {})'.format(n_iter_max))
+
+#SOLVERS OF THE HOT PIXEL ITERATION
+SOLVERS=('server', 'client', 'deferred')
+
+def fexp_check_solver(solver):
+    if solver not in SOLVERS:
+        raise ValueError('solver must be one of {} (got {!r})'.format(', '.join(SOLVERS), solver))
+
     #SENSIBLE HEAT FLUX (H) [W M-2]
-def fexp_sensible_heat_flux(image, ux, UR, Rn24hobs, n_Ts_cold, d_hot_pixel, date_string, refpoly):
+    #SOLVER 'server': HOT PIXEL ITERATION WITH reduceRegion AT EACH STEP
+    #SOLVER 'client': HOT PIXEL INPUTS ARE READ ONCE AND THE ITERATION IS SOLVED
+    #ON SCALARS (fexp_hot_pixel_iteration). THE IMAGE IS BUILT FROM THE COEFFICIENTS.
+    #SOLVER 'deferred': SAME AS 'server' WITHOUT getInfo (FOR ImageCollection.map)
+    #THE ITERATION STOPS WHEN THE dT/rah CHANGE AT THE HOT PIXEL IS BELOW n_dif_min
+    #(CLIENT SOLVER) OR AFTER n_iter_max STEPS. THE NUMBER OF STEPS NEEDED IS
+    #REPORTED IN THE 'n_iterations' PROPERTY (THE SERVER SOLVER ALWAYS RUNS n_iter_max STEPS).
+    #d_hot_pixel CAN BE A CLIENT-SIDE dict (E.G. FROM THE ENDMEMBER CACHE): NO REQUEST IS NEEDED.
+    #d_iteration: dT COEFFICIENTS ALREADY SOLVED (fexp_hot_pixel_coefficients), USED AS IN THE CLIENT SOLVER.
+def fexp_sensible_heat_flux(image, ux, UR, Rn24hobs, n_Ts_cold, d_hot_pixel, date_string, refpoly, solver='server',
+                            n_iter_max=15, n_dif_min=0.1, d_iteration=None):
+    fexp_check_iterations(n_iter_max)
+    fexp_check_solver(solver)
 
     #VEGETATION HEIGHTS  [M]
     n_veg_hight = ee.Number(3)
@@ -476,15 +497,25 @@ def fexp_sensible_heat_flux(image, ux, UR, Rn24hobs, n_Ts_cold, d_hot_pixel, dat
 
     #TS COLD PIXEL
     n_Ts_cold = ee.Number(n_Ts_cold)
+    #HOT PIXEL VALUES (ONE REQUEST)
+    d_hot_pixel_info = d_hot_pixel if isinstance(d_hot_pixel, dict) else None
+    d_hot_pixel = ee.Dictionary(d_hot_pixel)
+    if solver == 'client' and d_iteration is None:
+        d_iteration = fexp_hot_pixel_coefficients(image, ux, n_Ts_cold, d_hot_pixel, n_iter_max, n_dif_min)
+    if solver == 'deferred' or d_iteration is not None:
+        d_hot_pixel_info = {key: d_hot_pixel.get(key) for key in ['G', 'Rn', 'x', 'y']}
+    elif d_hot_pixel_info is None:
+        d_hot_pixel_info = d_hot_pixel.select(['G', 'Rn', 'x', 'y']).getInfo()
+
     #TS HOT PIXEL
     n_Ts_hot = ee.Number(d_hot_pixel.get('temp'))
     #G HOT PIXEL
-    n_G_hot = ee.Number(d_hot_pixel.get('G').getInfo())
+    n_G_hot = ee.Number(d_hot_pixel_info['G'])
     #RN HOT PIXEL
-    n_Rn_hot = ee.Number(d_hot_pixel.get('Rn').getInfo())
+    n_Rn_hot = ee.Number(d_hot_pixel_info['Rn'])
     #LAT AND LON HOT PIXEL
-    n_long_hot = ee.Number(d_hot_pixel.get('x').getInfo())
-    n_lat_hot = ee.Number(d_hot_pixel.get('y').getInfo())
+    n_long_hot = ee.Number(d_hot_pixel_info['x'])
+    n_lat_hot = ee.Number(d_hot_pixel_info['y'])
     #POINT GEOMETRY
     p_hot_pix =  ee.Geometry.Point([n_long_hot, n_lat_hot])
 
@@ -550,49 +581,13 @@ def fexp_sensible_heat_flux(image, ux, UR, Rn24hobs, n_Ts_cold, d_hot_pixel, dat
     #SENSIBLE HEAT FLUX AT THE HOT PIXEL (H_hot)
     n_H_hot = ee.Number(n_Rn_hot).subtract(ee.Number(n_G_hot))
 
-    #ITERATIVE VARIABLES
-    n= ee.Number(1)
-    n_dif= ee.Number(1)
-    n_dif_min = ee.Number(0.1)
-    list_dif = ee.List([])
-    list_dT_hot = ee.List([])
-    list_rah_hot = ee.List([])
-    list_coef_a = ee.List([])
-    list_coef_b = ee.List([])
-
-    #NUMBER OF ITERATIVE STEPS: 15
-    #CAN BE CHANGED, BUT BE AWARE THAT
-    #A MINIMUM NUMBER OF ITERATIVE PROCESSES
-    #IS NECESSARY TO ACHIEVE RAH AND H ESTIMATIONS
-
-    #========INIT ITERATION========#
-    for n in range(15):
-
-    #AERODYNAMIC RESISTANCE TO HEAT TRANSPORT
-    #IN HOT PIXEL
-        d_rah_hot = i_rah.reduceRegion(
-            reducer= ee.Reducer.first(),
-            geometry= p_hot_pix,
-            scale= 30,
-            maxPixels=9000000000)
-
-        n_rah_hot =   ee.Number(d_rah_hot.get('rah'))
-
-    #NEAR SURFACE TEMPERATURE DIFFERENCE IN HOT PIXEL (dT= Tz1-Tz2)  [K]
-    # dThot= Hhot*rah/(ρCp)
-        n_dT_hot = (n_H_hot.multiply(n_rah_hot)).divide(n_ro_hot.multiply(n_Cp))
-
-    #NEAR SURFACE TEMPERATURE DIFFERENCE IN COLD PIXEL (dT= tZ1-tZ2)
-        n_dT_cold = ee.Number(0)
-    # dT =  aTs + b
-    #ANGULAR COEFFICIENT
-        n_coef_a = (n_dT_cold.subtract(n_dT_hot)).divide(n_Ts_cold.subtract(n_Ts_hot))
-
-    #LINEAR COEFFICIENT
-        n_coef_b = n_dT_hot.subtract(n_coef_a.multiply(n_Ts_hot))
-
+    #ONE STEP OF THE STABILITY CORRECTION FOR EACH PIXEL
+    #FROM THE dT COEFFICIENTS (a, b) AND THE rah/ufric OF THE PREVIOUS STEP
+    i_lst_med = image.select('T_LST_DEM')
+    def fexp_stability_step(n_coef_a, n_coef_b, i_rah, i_ufric):
     #dT FOR EACH PIXEL [K]
-        i_lst_med = image.select('T_LST_DEM')
+        n_coef_a = ee.Number(n_coef_a)
+        n_coef_b = ee.Number(n_coef_b)
         i_dT_int = ee.Image(0).clip(refpoly).expression(
             '(n_coef_a * i_lst_med) + n_coef_b', {
             'n_coef_a' : n_coef_a,
@@ -617,13 +612,6 @@ def fexp_sensible_heat_flux(image, ux, UR, Rn24hobs, n_Ts_cold, d_hot_pixel, dat
               'n_Cp': n_Cp,
               'i_dT_int':i_dT_int,
               'i_rah':i_rah }).rename('H')
-    #GET VALUE
-        d_H_int = i_H_int.reduceRegion(
-            reducer= ee.Reducer.first(),
-           geometry= p_hot_pix,
-            scale= 30,
-            maxPixels=9000000000)
-        n_H_int =   ee.Number(d_H_int.get('H'))
 
     #MONIN-OBUKHOV LENGTH (L)
     #FOR STABILITY CONDITIONS OF THE ATMOSPHERE IN THE ITERATIVE PROCESS
@@ -678,15 +666,6 @@ def fexp_sensible_heat_flux(image, ux, UR, Rn24hobs, n_Ts_cold, d_hot_pixel, dat
         i_psih_2 = i_psih_2.where(i_L_int.eq(0), 0);
         i_psih_01 = i_psih_01.where(i_L_int.eq(0), 0)
 
-        if n==1:
-            i_psim_200_exp = i_psim_200
-            i_psih_2_exp = i_psih_2
-            i_psih_01_exp = i_psih_01
-            i_L_int_exp = i_L_int
-            i_H_int_exp = i_H_int
-            i_dT_int_exp = i_dT_int
-            i_rah_exp = i_rah
-
     #CORRECTED VALUE FOR THE FRICTION VELOCITY (i_ufric) [M S-1]
         i_ufric = i_ufric.expression(
                 '(u200*0.41)/(log(hight/i_zom)-i_psim_200)',{
@@ -699,26 +678,93 @@ def fexp_sensible_heat_flux(image, ux, UR, Rn24hobs, n_Ts_cold, d_hot_pixel, dat
         i_rah = i_rah.expression(
                 '(log(z2/z1)-psi_h2+psi_h01)/(i_ufric*0.41)',
                 {'z2' : z2,'z1': z1, 'i_ufric':i_ufric, 'psi_h2':i_psih_2, 'psi_h01':i_psih_01}).rename('rah')
-        if n==1:
-            n_dT_hot_old = n_dT_hot
-            n_rah_hot_old = n_rah_hot
-            n_dif = ee.Number(1)
+        return i_dT_int, i_ro, i_H_int, i_ufric, i_rah
 
-        if n > 1:
-            n_dT_hot_abs = n_dT_hot.abs()
-            n_dT_hot_old_abs = n_dT_hot_old.abs()
-            n_rah_hot_abs = n_rah_hot.abs()
-            n_rah_hot_old_abs = n_rah_hot_old.abs()
-            n_dif=(n_dT_hot_abs.subtract(n_dT_hot_old_abs).add(n_rah_hot_abs).subtract(n_rah_hot_old_abs)).abs()
-            n_dT_hot_old = n_dT_hot
-            n_rah_hot_old = n_rah_hot
+    #HOT PIXEL ITERATION SOLVED ON SCALARS
+    #ONE SERVER-SIDE LOOP (ee.List.iterate) OVER THE dT COEFFICIENTS:
+    #THE GRAPH HOLDS ONE COPY OF THE STEP INSTEAD OF ONE PER ITERATION
+    if d_iteration is not None:
+        n_iter = len(d_iteration['coef_a'])
+        l_coef = ee.List([[n_coef_a, n_coef_b] for n_coef_a, n_coef_b in zip(d_iteration['coef_a'], d_iteration['coef_b'])])
+
+        def fexp_iteration(l_step_coef, i_state):
+            l_step_coef = ee.List(l_step_coef)
+            i_state = ee.Image(i_state)
+            i_step = fexp_stability_step(l_step_coef.get(0), l_step_coef.get(1),
+                                         i_state.select('rah'), i_state.select('ufric_star'))
+            return i_step[4].addBands(i_step[3])
 
-        #INSERT EACH ITERATION VALUE INTO A LIST
-        list_dif = list_dif.add(n_dif);
-        list_coef_a = list_coef_a.add(n_coef_a)
-        list_coef_b = list_coef_b.add(n_coef_b)
-        list_dT_hot = list_dT_hot.add(n_dT_hot)
-        list_rah_hot = list_rah_hot.add(n_rah_hot)
+        i_state = ee.Image(l_coef.slice(0, -1).iterate(fexp_iteration, i_rah.addBands(i_ufric.rename('ufric_star'))))
+
+    #LAST STEP GIVES THE FINAL dT, ro AND H
+        i_dT_int, i_ro, i_H_int, i_ufric, i_rah = fexp_stability_step(
+            d_iteration['coef_a'][-1], d_iteration['coef_b'][-1], i_state.select('rah'), i_state.select('ufric_star'))
+
+    else:
+        n_iter = n_iter_max
+
+    #ITERATIVE VARIABLES
+        n= ee.Number(1)
+        n_dif= ee.Number(1)
+        n_dif_min = ee.Number(n_dif_min)
+        list_dif = ee.List([])
+        list_dT_hot = ee.List([])
+        list_rah_hot = ee.List([])
+        list_coef_a = ee.List([])
+        list_coef_b = ee.List([])
+
+    #NUMBER OF ITERATIVE STEPS: 15 (n_iter_max)
+    #CAN BE CHANGED, BUT BE AWARE THAT
+    #A MINIMUM NUMBER OF ITERATIVE PROCESSES
+    #IS NECESSARY TO ACHIEVE RAH AND H ESTIMATIONS
+
+    #========INIT ITERATION========#
+        for n in range(n_iter):
+    #AERODYNAMIC RESISTANCE TO HEAT TRANSPORT
+    #IN HOT PIXEL
+            d_rah_hot = i_rah.reduceRegion(
+                reducer= ee.Reducer.first(),
+                geometry= p_hot_pix,
+                scale= 30,
+                maxPixels=9000000000)
+
+            n_rah_hot =   ee.Number(d_rah_hot.get('rah'))
+
+    #NEAR SURFACE TEMPERATURE DIFFERENCE IN HOT PIXEL (dT= Tz1-Tz2)  [K]
+    # dThot= Hhot*rah/(ρCp)
+            n_dT_hot = (n_H_hot.multiply(n_rah_hot)).divide(n_ro_hot.multiply(n_Cp))
+
+    #NEAR SURFACE TEMPERATURE DIFFERENCE IN COLD PIXEL (dT= tZ1-tZ2)
+            n_dT_cold = ee.Number(0)
+    # dT =  aTs + b
+    #ANGULAR COEFFICIENT
+            n_coef_a = (n_dT_cold.subtract(n_dT_hot)).divide(n_Ts_cold.subtract(n_Ts_hot))
+
+    #LINEAR COEFFICIENT
+            n_coef_b = n_dT_hot.subtract(n_coef_a.multiply(n_Ts_hot))
+
+            i_dT_int, i_ro, i_H_int, i_ufric, i_rah = fexp_stability_step(n_coef_a, n_coef_b, i_rah, i_ufric)
+
+            if n==1:
+                n_dT_hot_old = n_dT_hot
+                n_rah_hot_old = n_rah_hot
+                n_dif = ee.Number(1)
+
+            if n > 1:
+                n_dT_hot_abs = n_dT_hot.abs()
+                n_dT_hot_old_abs = n_dT_hot_old.abs()
+                n_rah_hot_abs = n_rah_hot.abs()
+                n_rah_hot_old_abs = n_rah_hot_old.abs()
+                n_dif=(n_dT_hot_abs.subtract(n_dT_hot_old_abs).add(n_rah_hot_abs).subtract(n_rah_hot_old_abs)).abs()
+                n_dT_hot_old = n_dT_hot
+                n_rah_hot_old = n_rah_hot
+
+            #INSERT EACH ITERATION VALUE INTO A LIST
+            list_dif = list_dif.add(n_dif);
+            list_coef_a = list_coef_a.add(n_coef_a)
+            list_coef_b = list_coef_b.add(n_coef_b)
+            list_dT_hot = list_dT_hot.add(n_dT_hot)
+            list_rah_hot = list_rah_hot.add(n_rah_hot)
 
     #=========END ITERATION =========#
 
@@ -732,7 +778,122 @@ def fexp_sensible_heat_flux(image, ux, UR, Rn24hobs, n_Ts_cold, d_hot_pixel, dat
              'i_dT_int':i_dT_final,
              'i_rah':i_rah_final }).rename('H')
 
+    #NUMBER OF ITERATIONS UNTIL CONVERGENCE
+    if d_iteration is not None:
+        n_iterations = n_iter
+    else:
+        #THE FIRST TWO STEPS HAVE NO dT/rah CHANGE YET (n_dif=1), AS IN THE CLIENT SOLVER
+        n_converged = list_dif.slice(2).map(lambda n_dif: ee.Number(n_dif).lt(n_dif_min)).indexOf(1)
+        n_iterations = ee.Number(ee.Algorithms.If(ee.Number(n_converged).gte(0), ee.Number(n_converged).add(3), n_iter_max))
+    image = image.set('n_iterations', n_iterations)
+
     #ADD BANDS
     image = image.addBands([i_H_final, i_rah_final, i_dT_final,
                             i_rah_first,image.select('zom'),image.select('u_fr'),i_ufric])
     return image
+
+#dT COEFFICIENTS OF THE CLIENT SOLVER
+#HOT PIXEL INPUTS ARE READ IN ONE REQUEST AND THE ITERATION IS SOLVED ON SCALARS
+def fexp_hot_pixel_coefficients(image, ux, n_Ts_cold, d_hot_pixel, n_iter_max=15, n_dif_min=0.1):
+    fexp_check_iterations(n_iter_max)
+    d_hot_pixel = ee.Dictionary(d_hot_pixel)
+    d_hot_pixel_info = (d_hot_pixel.select(['temp', 'G', 'Rn', 'x', 'y'])
+        .set('Ts_cold', ee.Number(n_Ts_cold))
+        .combine(image.select(['SAVI', 'T_LST_DEM']).addBands(ee.Image(ux).rename('ux')).reduceRegion(
+            reducer= ee.Reducer.first(),
+            geometry= ee.Geometry.Point([d_hot_pixel.get('x'), d_hot_pixel.get('y')]),
+            scale= 30,
+            maxPixels=9000000000))).getInfo()
+
+    return fexp_hot_pixel_iteration(
+        d_hot_pixel_info['Ts_cold'], d_hot_pixel_info['temp'], d_hot_pixel_info['Rn'], d_hot_pixel_info['G'],
+        d_hot_pixel_info['SAVI'], d_hot_pixel_info['T_LST_DEM'], d_hot_pixel_info['ux'],
+        n_iter_max, n_dif_min)
+
+#HOT PIXEL ITERATION ON SCALARS
+#SAME EQUATIONS AS fexp_sensible_heat_flux AT THE HOT PIXEL
+#RETURNS THE dT COEFFICIENTS (a, b) OF EACH STEP
+#STOPS EARLY WHEN THE dT/rah CHANGE IS BELOW n_dif_min
+def fexp_hot_pixel_iteration(n_Ts_cold, n_Ts_hot, n_Rn_hot, n_G_hot, n_savi_hot, n_lst_hot, n_ux_hot,
+                             n_iter=15, n_dif_min=None):
+
+    #CONSTANTS
+    n_zx = 2
+    n_hight = 200
+    n_Cp = 1004
+    n_K = 0.41
+    z1 = 0.1
+    z2 = 2
+
+    #MOMENTUM ROUGHNESS LENGHT (ZOM) AT THE WEATHER STATION [M]
+    n_zom = 3 * 0.12
+
+    #WIND SPEED AT BLENDING HEIGHT [M S-1]
+    n_ufric_ws = (n_K * n_ux_hot) / math.log(n_zx / n_zom)
+    n_u200 = n_ufric_ws * (math.log(n_hight / n_zom) / n_K)
+
+    #ZOM, FRICTION VELOCITY AND RAH AT THE HOT PIXEL
+    n_zom_hot = math.exp((5.62 * n_savi_hot) - 5.809)
+    n_ufric = (n_K * n_u200) / math.log(n_hight / n_zom)
+    n_rah_hot = math.log(z2 / z1) / (n_ufric * 0.41)
+
+    #AIR DENSITY AND H AT THE HOT PIXEL
+    n_ro_hot = (-0.0046 * n_Ts_hot) + 2.5538
+    n_H_hot = n_Rn_hot - n_G_hot
+
+    d_iteration = {'coef_a': [], 'coef_b': [], 'dT_hot': [], 'rah_hot': [], 'dif': []}
+    n_dif = 1
+    for n in range(n_iter):
+        n_dT_hot = (n_H_hot * n_rah_hot) / (n_ro_hot * n_Cp)
+        n_coef_a = (0 - n_dT_hot) / (n_Ts_cold - n_Ts_hot)
+        n_coef_b = n_dT_hot - (n_coef_a * n_Ts_hot)
+
+        #dT, AIR DENSITY AND H AT THE HOT PIXEL
+        n_dT = (n_coef_a * n_lst_hot) + n_coef_b
+        n_ro = (-0.0046 * (n_lst_hot - n_dT)) + 2.5538
+        n_H = (n_ro * n_Cp * n_dT) / n_rah_hot
+
+        #MONIN-OBUKHOV LENGTH (L)
+        n_L = -(n_ro * n_Cp * (n_ufric ** 3) * n_lst_hot) / (0.41 * 9.81 * n_H) if n_H != 0 else 0
+        n_psim_200, n_psih_2, n_psih_01 = fexp_stability_corrections_scalar(n_L)
+
+        #CORRECTED FRICTION VELOCITY AND RAH
+        n_ufric = (n_u200 * 0.41) / (math.log(n_hight / n_zom_hot) - n_psim_200)
+        n_rah_new = (math.log(z2 / z1) - n_psih_2 + n_psih_01) / (n_ufric * 0.41)
+
+        if n == 1:
+            n_dT_hot_old = n_dT_hot
+            n_rah_hot_old = n_rah_hot
+        if n > 1:
+            n_dif = abs(abs(n_dT_hot) - abs(n_dT_hot_old) + abs(n_rah_hot) - abs(n_rah_hot_old))
+            n_dT_hot_old = n_dT_hot
+            n_rah_hot_old = n_rah_hot
+
+        d_iteration['coef_a'].append(n_coef_a)
+        d_iteration['coef_b'].append(n_coef_b)
+        d_iteration['dT_hot'].append(n_dT_hot)
+        d_iteration['rah_hot'].append(n_rah_hot)
+        d_iteration['dif'].append(n_dif)
+        n_rah_hot = n_rah_new
+
+        #CONVERGENCE
+        if n > 1 and n_dif_min is not None and n_dif < n_dif_min:
+            break
+
+    return d_iteration
+
+#STABILITY CORRECTIONS ON SCALARS
+#PAULSON (1970)
+#WEBB (1970)
+def fexp_stability_corrections_scalar(n_L):
+    if n_L == 0:
+        return 0, 0, 0
+    if n_L > 0:
+        return -5 * (200 / n_L), -5 * (2 / n_L), -5 * (0.1 / n_L)
+    n_x200 = (1 - (16 * (200 / n_L))) ** 0.25
+    n_x2 = (1 - (16 * (2 / n_L))) ** 0.25
+    n_x01 = (1 - (16 * (0.1 / n_L))) ** 0.25
+    n_psim_200 = 2 * math.log((1 + n_x200) / 2) + math.log((1 + n_x200 ** 2) / 2) - 2 * math.atan(n_x200) + 0.5 * 3.14159265
+    n_psih_2 = 2 * math.log((1 + n_x2 ** 2) / 2)
+    n_psih_01 = 2 * math.log((1 + n_x01 ** 2) / 2)
+    return n_psim_200, n_psih_2, n_psih_01
@@ -0,0 +1,103 @@
+#----------------------------------------------------------------------------------------#
+#---------------------------------------//GEESEBAL//-------------------------------------#
+#GEESEBAL - GOOGLE EARTH ENGINE APP FOR SURFACE ENERGY BALANCE ALGORITHM FOR LAND (SEBAL)
+#CREATE BY: LEONARDO LAIPELT, RAFAEL KAYSER, ANDERSON RUHOFF AND AYAN FLEISCHMANN
+#PROJECT - ET BRASIL https://etbrasil.org/
+#LAB - HIDROLOGIA DE GRANDE ESCALA [HGE] website: https://www.ufrgs.br/hge/author/hge/
+#UNIVERSITY - UNIVERSIDADE FEDERAL DO RIO GRANDE DO SUL - UFRGS
+#RIO GRANDE DO SUL, BRAZIL
+
+#DOI
+#VERSION 0.1.1
+#CONTACT US: leonardo.laipelt@ufrgs.br
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+
+#PYTHON PACKAGES
+import numpy as np
+
+#A SIMPLIFIED VERSION OF
+#CALIBRATION USING INVERSE MODELING AT EXTREME CONDITIONS (CIMEC)
+#FROM ALLEN ET AL. (2013) FOR METRIC
+#SEE MORE: LAIPELT ET AL. (2020)
+
+#DEFAULT PARAMETERS
+#NDVI COLD = 5%
+#TS COLD = 20%
+#NDVI HOT = 10%
+#TS HOT = 20%
+
+#REFPOLY (OPTIONAL) IS A BOOLEAN ARRAY WITH THE REDUCTION REGION
+
+def _band(image, name, refpoly):
+    band = np.asarray(image[name], dtype=np.float64)
+    if refpoly is not None:
+        band = np.where(refpoly, band, np.nan)
+    return band
+
+#PSEUDO-RANDOM KEY OF EACH PIXEL (SPLITMIX64 OF THE POSITION)
+#THE ENDMEMBER IS THE CANDIDATE WITH THE LOWEST KEY: THE SAME PIXEL FOR ANY TILE SIZE (tiles.TiledImage)
+def fexp_pixel_key(rows, cols, n_cols, seed=0):
+    z = (rows.astype(np.uint64) * np.uint64(n_cols) + cols.astype(np.uint64)
+         + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15))
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+#SELECT ONE PIXEL BY RANK (FROM PREVIOUS SELECTION)
+#THE CANDIDATE WITH THE LOWEST fexp_pixel_key (A SEEDED UNIFORM DRAW)
+def _fexp_select_pixel(image, candidates, bands, seed):
+    rows, cols = np.nonzero(candidates)
+    if rows.size == 0:
+        raise ValueError('No candidate pixels found.')
+    k = np.argmin(fexp_pixel_key(rows, cols, candidates.shape[1], seed))
+    row, col = int(rows[k]), int(cols[k])
+    d_pixel = {name: float(np.asarray(image[band])[row, col]) for name, band in bands.items()}
+    d_pixel.update({'row': row, 'col': col, 'sum': int(candidates.sum())})
+    return d_pixel
+
+#SELECT COLD PIXEL
+def fexp_cold_pixel(image, refpoly, p_top_NDVI, p_coldest_Ts, seed=0):
+
+  #IDENTIFY THE TOP % NDVI PIXELS
+  ndvi_neg = _band(image, 'NDVI_neg', refpoly)
+  n_perc_top_NDVI = np.nanpercentile(ndvi_neg, p_top_NDVI)
+
+  #UPDATE MASK WITH NDVI VALUES
+  i_top_NDVI = ndvi_neg <= n_perc_top_NDVI
+
+  #SELECT THE COLDEST TS FROM PREVIOUS NDVI GROUP
+  lst_nw = _band(image, 'LST_NW', refpoly)
+  n_perc_low_LST = np.nanpercentile(lst_nw[i_top_NDVI], p_coldest_Ts)
+  i_cold_lst = i_top_NDVI & (lst_nw <= n_perc_low_LST)
+
+  #FILTERS
+  c_lst_cold20 = i_cold_lst & (lst_nw >= 200)
+
+  #CREATE A DICTIONARY WITH THOSE RESULTS
+  return _fexp_select_pixel(image, c_lst_cold20,
+                            {'temp': 'LST_NW', 'ndvi': 'NDVI', 'x': 'longitude', 'y': 'latitude'}, seed)
+
+#SELECT HOT PIXEL
+def fexp_hot_pixel(image, refpoly, p_lowest_NDVI, p_hottest_Ts, seed=0):
+
+  #IDENTIFY THE DOWN % NDVI PIXELS
+  pos_ndvi = _band(image, 'pos_NDVI', refpoly)
+  n_perc_low_NDVI = np.nanpercentile(pos_ndvi, p_lowest_NDVI)
+
+  #UPDATE MASK WITH NDVI VALUES
+  i_low_NDVI = pos_ndvi <= n_perc_low_NDVI
+
+  #SELECT THE HOTTEST TS FROM PREVIOUS NDVI GROUP
+  lst_neg = _band(image, 'LST_neg', refpoly)
+  n_perc_top_lst = np.nanpercentile(lst_neg[i_low_NDVI], p_hottest_Ts)
+
+  #PIXELS WITHOUT LST_NW ARE NOT COUNTED
+  c_lst_hotpix = i_low_NDVI & (lst_neg <= n_perc_top_lst) & np.isfinite(_band(image, 'LST_NW', refpoly))
+
+  #CREATE A DICTIONARY WITH THOSE RESULTS
+  return _fexp_select_pixel(image, c_lst_hotpix,
+                            {'temp': 'LST_NW', 'x': 'longitude', 'y': 'latitude',
+                             'Rn': 'Rn', 'G': 'G', 'ndvi': 'NDVI'}, seed)
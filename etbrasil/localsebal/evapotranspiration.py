@@ -0,0 +1,57 @@
+#----------------------------------------------------------------------------------------#
+#---------------------------------------//GEESEBAL//-------------------------------------#
+#GEESEBAL - GOOGLE EARTH ENGINE APP FOR SURFACE ENERGY BALANCE ALGORITHM FOR LAND (SEBAL)
+#CREATE BY: LEONARDO LAIPELT, RAFAEL KAYSER, ANDERSON RUHOFF AND AYAN FLEISCHMANN
+#PROJECT - ET BRASIL https://etbrasil.org/
+#LAB - HIDROLOGIA DE GRANDE ESCALA [HGE] website: https://www.ufrgs.br/hge/author/hge/
+#UNIVERSITY - UNIVERSIDADE FEDERAL DO RIO GRANDE DO SUL - UFRGS
+#RIO GRANDE DO SUL, BRAZIL
+
+#DOI
+#VERSION 0.1.1
+#CONTACT US: leonardo.laipelt@ufrgs.br
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+
+#PYTHON PACKAGES
+import numpy as np
+
+def fexp_et(image, Rn24hobs):
+    #NET DAILY RADIATION (Rn24h) [W M-2]
+    #BRUIN (1982)
+    Rn24hobs = np.asarray(Rn24hobs, dtype=np.float64)
+
+    #GET ENERGY FLUXES VARIABLES AND LST
+    i_Rn = np.asarray(image['Rn'], dtype=np.float64)
+    i_G = np.asarray(image['G'], dtype=np.float64)
+    i_lst = np.asarray(image['T_LST_DEM'], dtype=np.float64)
+    i_H_final = np.asarray(image['H'], dtype=np.float64)
+
+    #FILTER VALUES
+    i_H_final = np.where(i_H_final < 0, 0, i_H_final)
+
+    # INSTANTANEOUS LATENT HEAT FLUX (LE) [W M-2]
+    #BASTIAANSSEN ET AL. (1998)
+    i_lambda_ET = i_Rn - i_G - i_H_final
+
+    #LATENT HEAT OF VAPORIZATION (LAMBDA) [J KG-1]
+    #BISHT ET AL.(2005)
+    #LAGOUARDE AND BURNET (1983)
+    i_lambda = 2.501 - 0.002361 * (i_lst - 273.15)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        #INSTANTANEOUS ET (ET_inst) [MM H-1]
+        i_ET_inst = 0.0036 * (i_lambda_ET / i_lambda)
+
+        #EVAPORATIVE FRACTION (EF)
+        #CRAGO (1996)
+        i_EF = i_lambda_ET / (i_Rn - i_G)
+
+        #DAILY EVAPOTRANSPIRATION (ET_24h) [MM DAY-1]
+        i_ET24h_calc = (0.0864 * i_EF * Rn24hobs) / (i_lambda)
+
+    #ADD BANDS
+    image.update({'ET_inst': i_ET_inst, 'ET_24h': i_ET24h_calc, 'LE': i_lambda_ET, 'EF': i_EF})
+    return image
@@ -0,0 +1,156 @@
+#----------------------------------------------------------------------------------------#
+#---------------------------------------//GEESEBAL//-------------------------------------#
+#GEESEBAL - GOOGLE EARTH ENGINE APP FOR SURFACE ENERGY BALANCE ALGORITHM FOR LAND (SEBAL)
+#CREATE BY: LEONARDO LAIPELT, RAFAEL KAYSER, ANDERSON RUHOFF AND AYAN FLEISCHMANN
+#PROJECT - ET BRASIL https://etbrasil.org/
+#LAB - HIDROLOGIA DE GRANDE ESCALA [HGE] website: https://www.ufrgs.br/hge/author/hge/
+#UNIVERSITY - UNIVERSIDADE FEDERAL DO RIO GRANDE DO SUL - UFRGS
+#RIO GRANDE DO SUL, BRAZIL
+
+#DOI
+#VERSION 0.1.1
+#CONTACT US: leonardo.laipelt@ufrgs.br
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+
+#PYTHON PACKAGES
+import datetime
+import numpy as np
+
+#FOLDERS
+from .masks import (f_cloudMaskL457_SR, f_cloudMaskL8_SR,
+ f_albedoL5L7, f_albedoL8)
+from .tools import (fexp_spec_ind, fexp_radlong_up, LST_DEM_correction,
+fexp_radshort_down, fexp_radlong_down, fexp_radbalance, fexp_soil_heat, fexp_sensible_heat_flux,
+fexp_solar_context, fexp_atmosphere_context, fexp_check_iterations)
+from .endmembers import fexp_cold_pixel, fexp_hot_pixel
+from .evapotranspiration import fexp_et
+from .meteorology import fexp_rn24h
+
+#IN-MEMORY IMAGE
+#BANDS ARE ARRAYS ON THE SAME GRID (B, GR, R, NIR, SWIR_1, SWIR_2, BRT, pixel_qa, longitude, latitude)
+#PROPERTIES FOLLOW EARTH ENGINE NAMES (LANDSAT_ID, SATELLITE, system:time_start, SOLAR_ZENITH_ANGLE)
+class LocalImage(dict):
+
+    def __init__(self, bands=None, properties=None):
+        super().__init__(bands or {})
+        self.properties = dict(properties or {})
+
+    def get_property(self, name, default=None):
+        return self.properties.get(name, default)
+
+    def date(self):
+        return datetime.datetime.fromtimestamp(self.properties['system:time_start'] / 1000, datetime.timezone.utc)
+
+    def select(self, names):
+        if isinstance(names, str):
+            names = [names]
+        return LocalImage({name: self[name] for name in names}, self.properties)
+
+#IMAGE FUNCTION
+class Image():
+
+    #ENDMEMBERS DEFAULT
+    #ALLEN ET AL. (2013)
+    #METEOROLOGY IS A MAPPING WITH AirT_G [C], ux_G [M S-1], RH_G [%] AND Rn24h_G [W M-2]
+    #(SCALARS OR ARRAYS ON THE IMAGE GRID)
+    #Rn24h_G CAN BE REPLACED BY SW_Down AND Ra_24h [W M-2] (meteorology.fexp_scene_meteorology)
+    def __init__(self,
+                 image,
+                 z_alt,
+                 meteorology,
+                 NDVI_cold=5,
+                 Ts_cold=20,
+                 NDVI_hot=10,
+                 Ts_hot=20,
+                 refpoly=None,
+                 seed=0,
+                 n_iter_max=15,
+                 n_dif_min=0.1):
+
+        #GET INFORMATIONS FROM IMAGE
+        fexp_check_iterations(n_iter_max)
+        self.image = LocalImage(image, image.properties)
+        self.LANDSAT_ID = self.image.get_property('LANDSAT_ID')
+        self.landsat_version = self.image.get_property('SATELLITE')
+        self.zenith_angle = self.image.get_property('SOLAR_ZENITH_ANGLE')
+        self._date = self.image.date()
+        self._hour = self._date.hour
+        self._minuts = self._date.minute
+        self.date_string = self._date.strftime('%Y-%m-%d')
+
+        #ENDMEMBERS
+        self.p_top_NDVI = NDVI_cold
+        self.p_coldest_Ts = Ts_cold
+        self.p_lowest_NDVI = NDVI_hot
+        self.p_hottest_Ts = Ts_hot
+        self.refpoly = refpoly
+
+        #CLOUD REMOVAL AND ALBEDO TASUMI ET AL. (2008)
+        if self.landsat_version in ('LANDSAT_5', 'LANDSAT_7'):
+            self.image = f_albedoL5L7(f_cloudMaskL457_SR(self.image))
+        else:
+            self.image = f_albedoL8(f_cloudMaskL8_SR(self.image))
+
+        self.sun_elevation = 90 - self.zenith_angle
+
+        #METEOROLOGY PARAMETERS
+        self.T_air = meteorology['AirT_G']
+        self.ux = meteorology['ux_G']
+        self.UR = meteorology['RH_G']
+        if 'Rn24h_G' in meteorology:
+            self.Rn24hobs = meteorology['Rn24h_G']
+        else:
+            self.Rn24hobs = fexp_rn24h(self.image['ALFA'], meteorology['SW_Down'], meteorology['Ra_24h'])
+
+        #ELEVATION
+        self.z_alt = np.asarray(z_alt, dtype=np.float64)
+
+        #SOLAR AND ATMOSPHERIC CONTEXT (doy, dr, solar_dec, cos_theta, pres, es, ea, W, tao_sw)
+        self.context = fexp_atmosphere_context(fexp_solar_context(self.image.date(), self.sun_elevation),
+                                               self.z_alt, self.T_air, self.UR)
+
+        #SPECTRAL IMAGES (NDVI, EVI, SAVI, LAI, T_LST, e_0, e_NB, long, lat)
+        self.image = fexp_spec_ind(self.image)
+
+        #LAND SURFACE TEMPERATURE
+        self.image = LST_DEM_correction(self.image, self.z_alt, self.T_air, self.UR, self.sun_elevation, self._hour, self._minuts, self.context)
+
+        #COLD PIXEL
+        self.d_cold_pixel = fexp_cold_pixel(self.image, self.refpoly, self.p_top_NDVI, self.p_coldest_Ts, seed)
+
+        #COLD PIXEL NUMBER
+        self.n_Ts_cold = self.d_cold_pixel['temp']
+
+        #INSTANTANEOUS OUTGOING LONG-WAVE RADIATION [W M-2]
+        self.image = fexp_radlong_up(self.image)
+
+        #INSTANTANEOUS INCOMING SHORT-WAVE RADIATION [W M-2]
+        self.image = fexp_radshort_down(self.image, self.z_alt, self.T_air, self.UR, self.sun_elevation, self.context)
+
+        #INSTANTANEOUS INCOMING LONGWAVE RADIATION [W M-2]
+        self.image = fexp_radlong_down(self.image, self.n_Ts_cold)
+
+        #INSTANTANEOUS NET RADIATON BALANCE [W M-2]
+        self.image = fexp_radbalance(self.image)
+
+        #SOIL HEAT FLUX (G) [W M-2]
+        self.image = fexp_soil_heat(self.image)
+
+        #HOT PIXEL
+        self.d_hot_pixel = fexp_hot_pixel(self.image, self.refpoly, self.p_lowest_NDVI, self.p_hottest_Ts, seed)
+
+        #SENSIBLE HEAT FLUX (H) [W M-2]
+        self.image = fexp_sensible_heat_flux(self.image, self.ux, self.UR, self.Rn24hobs, self.n_Ts_cold,
+                                             self.d_hot_pixel, self.date_string, self.refpoly,
+                                             n_iter_max, n_dif_min)
+        self.n_iterations = self.image.properties['n_iterations']
+
+        #DAILY EVAPOTRANSPIRATION (ET_24H) [MM DAY-1]
+        self.image = fexp_et(self.image, self.Rn24hobs)
+
+        if self.LANDSAT_ID:
+            self.NAME_FINAL = self.LANDSAT_ID[:5]+self.LANDSAT_ID[10:17]+self.LANDSAT_ID[17:25]
+            self.image[self.NAME_FINAL] = self.image['ET_24h']
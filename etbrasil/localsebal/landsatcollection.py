@@ -0,0 +1,219 @@
+#----------------------------------------------------------------------------------------#
+#---------------------------------------//GEESEBAL//-------------------------------------#
+#GEESEBAL - GOOGLE EARTH ENGINE APP FOR SURFACE ENERGY BALANCE ALGORITHM FOR LAND (SEBAL)
+#CREATE BY: LEONARDO LAIPELT, RAFAEL KAYSER, ANDERSON RUHOFF AND AYAN FLEISCHMANN
+#PROJECT - ET BRASIL https://etbrasil.org/
+#LAB - HIDROLOGIA DE GRANDE ESCALA [HGE] website: https://www.ufrgs.br/hge/author/hge/
+#UNIVERSITY - UNIVERSIDADE FEDERAL DO RIO GRANDE DO SUL - UFRGS
+#RIO GRANDE DO SUL, BRAZIL
+
+#DOI
+#VERSION 0.1.1
+#CONTACT US: leonardo.laipelt@ufrgs.br
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+
+#PYTHON PACKAGES
+#LOCAL LANDSAT SURFACE REFLECTANCE SCENES
+#BANDS ARE MEMORY-MAPPED (OR READ BY WINDOW) WITH THE SAME NAMES AS etbrasil.geesebal.landsatcollection
+import os
+import re
+import glob
+import datetime
+import numpy as np
+
+from .image import LocalImage
+
+#SENSOR OF EACH PRODUCT PREFIX
+SENSORS = {'LT05': 'LANDSAT_5', 'LE07': 'LANDSAT_7', 'LC08': 'LANDSAT_8'}
+
+#FILE SUFFIX (USGS COLLECTION 1 SR) AND EARTH ENGINE BAND NAME OF EACH BAND
+LANDSAT_BANDS = {
+    'LANDSAT_5': {'B': ('sr_band1', 'B1'), 'GR': ('sr_band2', 'B2'), 'R': ('sr_band3', 'B3'),
+                  'NIR': ('sr_band4', 'B4'), 'SWIR_1': ('sr_band5', 'B5'), 'BRT': ('bt_band6', 'B6'),
+                  'SWIR_2': ('sr_band7', 'B7'), 'pixel_qa': ('pixel_qa', 'pixel_qa')},
+    'LANDSAT_8': {'UB': ('sr_band1', 'B1'), 'B': ('sr_band2', 'B2'), 'GR': ('sr_band3', 'B3'),
+                  'R': ('sr_band4', 'B4'), 'NIR': ('sr_band5', 'B5'), 'SWIR_1': ('sr_band6', 'B6'),
+                  'SWIR_2': ('sr_band7', 'B7'), 'BRT': ('bt_band10', 'B10'), 'pixel_qa': ('pixel_qa', 'pixel_qa')}}
+LANDSAT_BANDS['LANDSAT_7'] = LANDSAT_BANDS['LANDSAT_5']
+
+#ENVI DATA TYPES
+ENVI_TYPES = {1: np.uint8, 2: np.int16, 3: np.int32, 4: np.float32, 5: np.float64, 12: np.uint16, 13: np.uint32}
+
+#BAND READ BY WINDOW (GEOTIFF WITHOUT MEMORY MAP, NEEDS rasterio)
+#image[name][rows, cols] ONLY READS THE WINDOW
+class RasterBand():
+
+    def __init__(self, path):
+        try:
+            import rasterio
+        except ImportError:
+            raise ImportError('Compressed GeoTIFF bands need rasterio (pip install rasterio)')
+        self.path = path
+        with rasterio.open(path) as dataset:
+            self.shape = (dataset.height, dataset.width)
+            self.dtype = np.dtype(dataset.dtypes[0])
+        self.ndim = 2
+
+    def __getitem__(self, key):
+        import rasterio
+        from rasterio.windows import Window
+        rows, cols = key if isinstance(key, tuple) else (key, slice(None))
+        rows = range(self.shape[0])[rows]
+        cols = range(self.shape[1])[cols]
+        with rasterio.open(self.path) as dataset:
+            array = dataset.read(1, window=Window(cols.start, rows.start, len(cols) * cols.step, len(rows) * rows.step))
+        return array[::rows.step, ::cols.step]
+
+    def __array__(self, dtype=None, copy=None):
+        array = self[:, :]
+        return array.astype(dtype) if dtype is not None else array
+
+#LONGITUDE/LATITUDE OF THE PIXEL CENTERS COMPUTED BY WINDOW
+#FROM THE AFFINE TRANSFORM AND THE CRS OF THE SCENE (NEEDS pyproj)
+class CoordinateGrid():
+
+    def __init__(self, transform, crs, shape, axis):
+        try:
+            from pyproj import Transformer
+        except ImportError:
+            raise ImportError('Coordinates from the GeoTIFF georeference need pyproj (pip install pyproj)')
+        self.transform = transform
+        self.transformer = Transformer.from_crs(crs, 'EPSG:4326', always_xy=True)
+        self.shape = shape
+        self.dtype = np.dtype(np.float64)
+        self.ndim = 2
+        self.axis = axis
+
+    def __getitem__(self, key):
+        rows, cols = key if isinstance(key, tuple) else (key, slice(None))
+        rows = np.arange(self.shape[0])[rows]
+        cols = np.arange(self.shape[1])[cols]
+        col, row = np.meshgrid(cols + 0.5, rows + 0.5)
+        a, b, c, d, e, f = self.transform
+        x = a * col + b * row + c
+        y = d * col + e * row + f
+        return self.transformer.transform(x, y)[self.axis]
+
+    def __array__(self, dtype=None, copy=None):
+        array = self[:, :]
+        return array.astype(dtype) if dtype is not None else array
+
+#OPEN ONE BAND FILE
+#.npy: np.load(mmap_mode='r'); ENVI (.hdr): np.memmap; .tif: tifffile.memmap (OR RasterBand)
+def fexp_open_band(path):
+    if path.endswith('.npy'):
+        return np.load(path, mmap_mode='r')
+    if path.lower().endswith(('.tif', '.tiff')):
+        try:
+            import tifffile
+            return tifffile.memmap(path, mode='r')
+        except (ImportError, ValueError):
+            return RasterBand(path)
+    header = fexp_envi_header(os.path.splitext(path)[0] + '.hdr')
+    return np.memmap(path, dtype=np.dtype(ENVI_TYPES[int(header['data type'])]).newbyteorder(
+                         '>' if header.get('byte order', '0') == '1' else '<'),
+                     mode='r', offset=int(header.get('header offset', 0)),
+                     shape=(int(header['lines']), int(header['samples'])))
+
+#ENVI HEADER (KEY = VALUE)
+def fexp_envi_header(path):
+    header = {}
+    with open(path) as file:
+        for line in file:
+            if '=' in line:
+                key, value = line.split('=', 1)
+                header[key.strip().lower()] = value.strip()
+    return header
+
+#LANDSAT METADATA FILE (*_MTL.txt)
+def fexp_mtl(path):
+    mtl = {}
+    with open(path) as file:
+        for line in file:
+            if '=' in line:
+                key, value = line.split('=', 1)
+                mtl[key.strip()] = value.strip().strip('"')
+    return mtl
+
+#FIND THE FILE OF A BAND IN THE SCENE DIRECTORY
+#NAMES: USGS SUFFIX (..._sr_band4.tif), EARTH ENGINE BAND (B4.npy) OR GEESEBAL BAND (NIR.npy)
+def fexp_band_file(files, names):
+    for name in names:
+        pattern = re.compile(r'(^|_)' + re.escape(name) + r'\.(npy|tif|tiff|img|bsq|dat|bin)$', re.IGNORECASE)
+        for path in files:
+            if pattern.search(os.path.basename(path)):
+                return path
+    return None
+
+#OPEN A LOCAL LANDSAT SCENE (DIRECTORY WITH ONE FILE PER BAND)
+#SENSOR, LANDSAT_ID AND ACQUISITION TIME FROM THE MTL FILE (OR THE FILE NAMES)
+#RETURNS A LocalImage WITH MEMORY-MAPPED BANDS
+#(B, GR, R, NIR, SWIR_1, SWIR_2, BRT, pixel_qa [, UB], longitude, latitude)
+def fexp_landsat_local(path, properties=None):
+    files = sorted(glob.glob(os.path.join(path, '*')))
+    mtl_files = [file for file in files if file.endswith('_MTL.txt')]
+    mtl = fexp_mtl(mtl_files[0]) if mtl_files else {}
+
+    #PRODUCT ID AND SENSOR
+    LANDSAT_ID = mtl.get('LANDSAT_PRODUCT_ID')
+    if LANDSAT_ID is None:
+        names = [os.path.basename(file) for file in files if os.path.basename(file)[:4] in SENSORS]
+        if not names:
+            raise ValueError('Landsat product ID not found in {}'.format(path))
+        LANDSAT_ID = re.match(r'^(L[CET]0[578]_\w+?_T[12R]T?)', names[0]).group(1)
+    landsat_version = SENSORS[LANDSAT_ID[:4]]
+
+    #BANDS
+    bands = {}
+    for name, (suffix, ee_name) in LANDSAT_BANDS[landsat_version].items():
+        band_file = fexp_band_file(files, [suffix, ee_name, name])
+        if band_file is None:
+            raise ValueError('Band {} ({}) not found in {}'.format(name, suffix, path))
+        bands[name] = fexp_open_band(band_file)
+    shape = bands['pixel_qa'].shape
+
+    #COORDINATES: FILES (longitude/latitude) OR GEOREFERENCE OF THE GEOTIFF BANDS
+    pixel_size = 30
+    coordinate_files = [fexp_band_file(files, [name]) for name in ('longitude', 'latitude')]
+    if None not in coordinate_files:
+        bands['longitude'], bands['latitude'] = [fexp_open_band(file) for file in coordinate_files]
+    else:
+        try:
+            import rasterio
+        except ImportError:
+            raise ImportError('Coordinates from the GeoTIFF georeference need rasterio (pip install rasterio pyproj)'
+                              ' or longitude/latitude files in {}'.format(path))
+        with rasterio.open(fexp_band_file(files, [LANDSAT_BANDS[landsat_version]['pixel_qa'][0]])) as dataset:
+            transform = tuple(dataset.transform)[:6]
+            crs = dataset.crs.to_string()
+        pixel_size = abs(transform[0])
+        bands['longitude'] = CoordinateGrid(transform, crs, shape, 0)
+        bands['latitude'] = CoordinateGrid(transform, crs, shape, 1)
+
+    #PROPERTIES (EARTH ENGINE NAMES)
+    scene_properties = {'LANDSAT_ID': LANDSAT_ID,
+                        'SATELLITE': landsat_version,
+                        'pixel_size': pixel_size}
+    if 'SCENE_CENTER_TIME' in mtl:
+        date_string = mtl.get('DATE_ACQUIRED') or datetime.datetime.strptime(LANDSAT_ID.split('_')[3], '%Y%m%d').strftime('%Y-%m-%d')
+        scene_time = mtl['SCENE_CENTER_TIME'].rstrip('Z')[:15]
+        time_start = datetime.datetime.strptime(date_string + ' ' + scene_time.split('.')[0], '%Y-%m-%d %H:%M:%S')
+        time_start = time_start.replace(tzinfo=datetime.timezone.utc)
+        scene_properties['system:time_start'] = time_start.timestamp() * 1000
+    if 'SUN_ELEVATION' in mtl:
+        scene_properties['SOLAR_ZENITH_ANGLE'] = 90 - float(mtl['SUN_ELEVATION'])
+    for key in ('WRS_PATH', 'WRS_ROW', 'CLOUD_COVER'):
+        if key in mtl:
+            scene_properties[key] = float(mtl[key])
+    scene_properties.update(properties or {})
+
+    #WITHOUT AN MTL FILE THE ACQUISITION TIME AND THE SOLAR ZENITH ANGLE MUST BE GIVEN IN properties
+    #(THE SCENE TIME IS NOT GUESSED: IT DRIVES THE METEOROLOGY AND THE SOLAR GEOMETRY)
+    for key, mtl_key in (('system:time_start', 'SCENE_CENTER_TIME'), ('SOLAR_ZENITH_ANGLE', 'SUN_ELEVATION')):
+        if scene_properties.get(key) is None:
+            raise ValueError('{} not found in {} (no {} in an MTL file): pass it in properties'.format(key, path, mtl_key))
+
+    return LocalImage(bands, scene_properties)
@@ -0,0 +1,63 @@
+#----------------------------------------------------------------------------------------#
+#---------------------------------------//GEESEBAL//-------------------------------------#
+#GEESEBAL - GOOGLE EARTH ENGINE APP FOR SURFACE ENERGY BALANCE ALGORITHM FOR LAND (SEBAL)
+#CREATE BY: LEONARDO LAIPELT, RAFAEL KAYSER, ANDERSON RUHOFF AND AYAN FLEISCHMANN
+#PROJECT - ET BRASIL https://etbrasil.org/
+#LAB - HIDROLOGIA DE GRANDE ESCALA [HGE] website: https://www.ufrgs.br/hge/author/hge/
+#UNIVERSITY - UNIVERSIDADE FEDERAL DO RIO GRANDE DO SUL - UFRGS
+#RIO GRANDE DO SUL, BRAZIL
+
+#DOI
+#VERSION 0.1.1
+#CONTACT US: leonardo.laipelt@ufrgs.br
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+
+#PYTHON PACKAGES
+import numpy as np
+
+#CLOUD REMOVAL
+#MASKED PIXELS ARE SET TO NaN IN EVERY BAND (EXCEPT LONGITUDE/LATITUDE)
+
+def _update_mask(image, mask):
+    for name in list(image):
+        if name in ('longitude', 'latitude'):
+            continue
+        image[name] = np.where(mask, np.asarray(image[name], dtype=np.float64), np.nan)
+    return image
+
+#FUNCTION TO MASK CLOUDS IN LANDSAT 5 AND 7 FOR SURFACE REFLECTANCE
+def f_cloudMaskL457_SR(image):
+    quality = np.asarray(image['pixel_qa'])
+    c01 = quality == 66 #CLEAR, LOW CONFIDENCE CLOUD
+    c02 = quality == 68 #WATER, LOW CONFIDENCE CLOUD
+    mask = c01 | c02
+    return _update_mask(image, mask)
+
+#FUNCTION FO MASK CLOUD IN LANDSAT 8 FOR SURFACE REFELCTANCE
+def f_cloudMaskL8_SR(image):
+    quality = np.asarray(image['pixel_qa'])
+    c01 = quality == 322 #CLEAR, LOW CONFIDENCE CLOUD
+    c02 = quality == 324 #WATER, LOW CONFIDENCE CLOUD
+    c03 = quality == 1346 #CLEAR TERRAIN
+    mask = c01 | c02 | c03
+    return _update_mask(image, mask)
+
+#ALBEDO
+#TASUMI ET AL(2008) FOR LANDSAT 5 AND 7
+def f_albedoL5L7(image):
+    B1, B2, B3, B4, B5, B7 = (np.asarray(image[b], dtype=np.float64) / 10000
+                              for b in ['B', 'GR', 'R', 'NIR', 'SWIR_1', 'SWIR_2'])
+    image['ALFA'] = (0.254*B1) + (0.149*B2) + (0.147*B3) + (0.311*B4) + (0.103*B5) + (0.036*B7)
+    return image
+
+#ALBEDO
+#USING TASUMI ET AL. (2008) METHOD FOR LANDSAT 8
+#COEFFICIENTS FROM KE ET AL. (2016)
+def f_albedoL8(image):
+    B1, B2, B3, B4, B5, B6, B7 = (np.asarray(image[b], dtype=np.float64) / 10000
+                                  for b in ['UB', 'B', 'GR', 'R', 'NIR', 'SWIR_1', 'SWIR_2'])
+    image['ALFA'] = (0.130*B1) + (0.115*B2) + (0.143*B3) + (0.180*B4) + (0.281*B5) + (0.108*B6) + (0.042*B7)
+    return image
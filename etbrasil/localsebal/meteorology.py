@@ -0,0 +1,203 @@
+#----------------------------------------------------------------------------------------#
+#---------------------------------------//GEESEBAL//-------------------------------------#
+#GEESEBAL - GOOGLE EARTH ENGINE APP FOR SURFACE ENERGY BALANCE ALGORITHM FOR LAND (SEBAL)
+#CREATE BY: LEONARDO LAIPELT, RAFAEL KAYSER, ANDERSON RUHOFF AND AYAN FLEISCHMANN
+#PROJECT - ET BRASIL https://etbrasil.org/
+#LAB - HIDROLOGIA DE GRANDE ESCALA [HGE] website: https://www.ufrgs.br/hge/author/hge/
+#UNIVERSITY - UNIVERSIDADE FEDERAL DO RIO GRANDE DO SUL - UFRGS
+#RIO GRANDE DO SUL, BRAZIL
+
+#DOI
+#VERSION 0.1.1
+#CONTACT US: leonardo.laipelt@ufrgs.br
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+
+#PYTHON PACKAGES
+#NUMPY VERSION OF GEESEBAL METEOROLOGY (ERA5-LAND HOURLY)
+#SAME EQUATIONS AS etbrasil.geesebal.meteorology
+#ALL SCENES ARE INTERPOLATED IN ONE VECTORIZED PASS OVER THE HOURLY CUBES
+import numpy as np
+
+#ERA5-LAND TIME STEP [MS]
+ERA5_STEP = 60*60*1000
+
+#NETCDF SHORT NAMES (CDS) TO EARTH ENGINE BAND NAMES
+ERA5_NAMES = {'t2m': 'temperature_2m',
+              'd2m': 'dewpoint_temperature_2m',
+              'u10': 'u_component_of_wind_10m',
+              'v10': 'v_component_of_wind_10m',
+              'ssrd': 'surface_solar_radiation_downwards_hourly'}
+
+#HOURLY ERA5-LAND CUBES
+#times: [MS] (T,), longitude: (X,), latitude: (Y,)
+#variables: EARTH ENGINE BAND NAMES -> ARRAYS (T, Y, X) (ANY ARRAY-LIKE, E.G. np.memmap)
+class ERA5Land():
+
+    def __init__(self, times, longitude, latitude, variables):
+        self.times = np.asarray(times, dtype=np.int64)
+        self.longitude = np.asarray(longitude, dtype=np.float64)
+        self.latitude = np.asarray(latitude, dtype=np.float64)
+        self.variables = dict(variables)
+
+        #HOURS MUST BE SORTED (UNSORTED CUBES ARE LOADED IN MEMORY)
+        if np.any(np.diff(self.times) <= 0):
+            order = np.argsort(self.times)
+            self.times = self.times[order]
+            self.variables = {name: np.asarray(value)[order] for name, value in self.variables.items()}
+
+    #NETCDF FILE DOWNLOADED FROM THE CDS (NEEDS xarray)
+    #ssrd IS ACCUMULATED SINCE 00 UTC: accumulated=True CONVERTS IT TO HOURLY VALUES
+    @classmethod
+    def from_netcdf(cls, path, accumulated=True):
+        try:
+            import xarray
+        except ImportError:
+            raise ImportError('ERA5Land.from_netcdf needs xarray (pip install xarray netcdf4)')
+        dataset = xarray.open_dataset(path)
+        time_name = 'valid_time' if 'valid_time' in dataset.coords else 'time'
+        times = dataset[time_name].values.astype('datetime64[ms]').astype(np.int64)
+        variables = {}
+        for short_name, name in ERA5_NAMES.items():
+            if short_name in dataset:
+                variables[name] = dataset[short_name].values
+        ssrd = 'surface_solar_radiation_downwards_hourly'
+        if accumulated and ssrd in variables:
+            variables[ssrd] = fexp_deaccumulate(variables[ssrd], times)
+        return cls(times, dataset['longitude'].values, dataset['latitude'].values, variables)
+
+#HOURLY VALUES FROM ACCUMULATIONS SINCE 00 UTC (ERA5-LAND)
+#THE 01 UTC VALUE IS ALREADY HOURLY
+def fexp_deaccumulate(values, times):
+    values = np.asarray(values, dtype=np.float64)
+    hourly = np.empty_like(values)
+    hourly[0] = values[0]
+    hourly[1:] = values[1:] - values[:-1]
+    first_hour = ((np.asarray(times) // ERA5_STEP) % 24) == 1
+    hourly[first_hour] = values[first_hour]
+    return hourly
+
+#INDEX OF THE LATEST HOUR BEFORE t (t EXCLUDED)
+def _previous(times, t):
+    return np.searchsorted(times, t, side='left') - 1
+
+#METEOROLOGY FOR A BATCH OF SCENES
+#time_starts: [MS] (S,)
+#doys: DAY OF THE YEAR OF EACH SCENE (0-BASED, AS ee.Date.getRelative)
+#RETURNS ARRAYS (S, Y, X) ON THE ERA5 GRID:
+#AirT_G [C], RH_G [%], ux_G [M S-1], SW_Down [W M-2] AND Ra_24h [W M-2]
+def get_meteorology(era5, time_starts, doys=None):
+
+    times = era5.times
+    t = np.asarray(time_starts, dtype=np.int64)
+
+    #LINEAR INTERPOLATION
+    #PREVIOUS: LATEST HOUR IN [t-3H, t); NEXT: LATEST HOUR IN [t, t+3H)
+    #(SAME SELECTION AS THE EARTH ENGINE VERSION)
+    i_previous = _previous(times, t)
+    i_next = _previous(times, t + 3*ERA5_STEP)
+    valid = ((i_previous >= 0) & (times[np.maximum(i_previous, 0)] >= t - 3*ERA5_STEP)
+             & (times[np.maximum(i_next, 0)] >= t))
+    if not np.all(valid):
+        raise ValueError('No ERA5-Land hours around the scenes: {}'.format(t[~valid].tolist()))
+
+    PREVIOUS_TIME = times[i_previous]
+    NEXT_TIME = times[i_next]
+    DELTA_TIME = ((t - PREVIOUS_TIME) / (NEXT_TIME - PREVIOUS_TIME))[:, None, None]
+
+    #EACH HOURLY FIELD IS READ ONCE FOR ALL SCENES
+    def interpolate(name):
+        cube = era5.variables[name]
+        previous = np.asarray(cube[i_previous], dtype=np.float64)
+        return (np.asarray(cube[i_next], dtype=np.float64) - previous) * DELTA_TIME + previous
+
+    # AIR TEMPERATURE [K]
+    tair_c = interpolate('temperature_2m')
+
+    # WIND SPEED [M S-1]
+    wind_u = interpolate('u_component_of_wind_10m')
+    wind_v = interpolate('v_component_of_wind_10m')
+    wind_med = np.sqrt(wind_u ** 2 + wind_v ** 2)
+    wind_med = wind_med * (4.87) / np.log(67.8 * 10.0 - 5.42)
+
+    # DEWPOINT TEMPERATURE [K]
+    tdp = interpolate('dewpoint_temperature_2m')
+
+    # ACTUAL VAPOR PRESSURE [KPA]
+    ea = 0.6108 * (np.exp((17.27 * (tdp - 273.15)) / ((tdp - 273.15) + 237.3)))
+
+    # SATURATED VAPOR PRESSURE [KPA]
+    esat = 0.6108 * (np.exp((17.27 * (tair_c - 273.15)) / ((tair_c - 273.15) + 237.3)))
+
+    # RELATIVE HUMIDITY (%)
+    rh = ea / esat * 100
+
+    #INCOMING SHORT-WAVE RADIATION DAILY MEAN [W M-2]
+    #SUM OF THE HOURS IN [t-11H, t+13H) FROM THE CUMULATIVE SUM (ONE PASS FOR ALL SCENES)
+    ssrd = era5.variables['surface_solar_radiation_downwards_hourly']
+    i_first = np.searchsorted(times, t - 11*ERA5_STEP, side='left')
+    i_last = np.searchsorted(times, t + 13*ERA5_STEP, side='left')
+    hours = np.unique(np.concatenate([np.arange(i, j) for i, j in zip(i_first, i_last)]).astype(np.int64))
+    cumulative = np.zeros((len(hours) + 1,) + np.shape(ssrd)[1:])
+    np.cumsum(np.asarray(ssrd[hours], dtype=np.float64), axis=0, out=cumulative[1:])
+    swdown24h = (cumulative[np.searchsorted(hours, i_last)] - cumulative[np.searchsorted(hours, i_first)]) / 86400
+
+    #DAY OF THE YEAR
+    if doys is None:
+        doys = (t.astype('datetime64[ms]') - t.astype('datetime64[ms]').astype('datetime64[Y]')).astype('timedelta64[D]').astype(np.int64)
+
+    return {'AirT_G': tair_c - 273.15,
+            'RH_G': rh,
+            'ux_G': wind_med,
+            'SW_Down': swdown24h,
+            'Ra_24h': fexp_ra_24h(np.asarray(doys), era5.latitude)}
+
+#EXTRATERRESTRIAL RADIATION 24H [W M-2] (S, Y, 1)
+#ASCE REPORT (2005)
+def fexp_ra_24h(doys, latitude):
+    Pi = 3.14
+    doy = np.asarray(doys, dtype=np.float64)[:, None, None]
+
+    #INVERSE RELATIVE DISTANCE EARTH-SUN
+    dr = 1 + 0.033 * np.cos(2 * Pi / 365 * doy)
+
+    #SOLAR DECLINATION [RADIANS]
+    solar_dec = 0.409 * np.sin((2 * Pi * doy / 365) - 1.39)
+
+    #SUNSET HOUR ANGLE [RADIANS]
+    lat_rad = (np.asarray(latitude, dtype=np.float64) * Pi / 180)[None, :, None]
+    omega = np.arccos(-np.tan(lat_rad) * np.tan(solar_dec))
+
+    #SOLAR CONSTANT [MJ M-2 H-1]
+    gsc = 4.92
+    return (24 / Pi) * gsc * dr * ((omega * np.sin(lat_rad) * np.sin(solar_dec))
+                                   + (np.cos(lat_rad) * np.cos(solar_dec) * np.sin(omega))) * 11.5740
+
+#NET RADIATION 24H [W M-2]
+#BRUIN (1982)
+def fexp_rn24h(albedo, SW_Down, Ra_24h):
+    return ((1 - albedo) * SW_Down) - (110 * (SW_Down / Ra_24h))
+
+#BILINEAR INTERPOLATION OF AN ERA5 GRID (Y, X) AT THE PIXEL COORDINATES
+def fexp_resample(grid, era5, longitude, latitude):
+    grid = np.broadcast_to(np.asarray(grid, dtype=np.float64), (len(era5.latitude), len(era5.longitude)))
+    lon_axis, lat_axis = era5.longitude, era5.latitude
+    if lat_axis[0] > lat_axis[-1]:
+        lat_axis, grid = lat_axis[::-1], grid[::-1]
+    x = np.interp(longitude, lon_axis, np.arange(len(lon_axis)))
+    y = np.interp(latitude, lat_axis, np.arange(len(lat_axis)))
+    x0 = np.clip(np.floor(x).astype(np.int64), 0, max(len(lon_axis) - 2, 0))
+    y0 = np.clip(np.floor(y).astype(np.int64), 0, max(len(lat_axis) - 2, 0))
+    x1 = np.minimum(x0 + 1, len(lon_axis) - 1)
+    y1 = np.minimum(y0 + 1, len(lat_axis) - 1)
+    wx = x - x0
+    wy = y - y0
+    return ((grid[y0, x0] * (1 - wx) + grid[y0, x1] * wx) * (1 - wy)
+            + (grid[y1, x0] * (1 - wx) + grid[y1, x1] * wx) * wy)
+
+#METEOROLOGY OF ONE SCENE OF THE BATCH ON THE SCENE GRID (INPUT OF localsebal.Image)
+#Rn24h_G IS COMPUTED BY Image WITH THE SCENE ALBEDO (SW_Down AND Ra_24h)
+def fexp_scene_meteorology(era5, meteorology, n, longitude, latitude):
+    return {name: fexp_resample(values[n], era5, longitude, latitude) for name, values in meteorology.items()}
@@ -0,0 +1,110 @@
+#----------------------------------------------------------------------------------------#
+#---------------------------------------//GEESEBAL//-------------------------------------#
+#GEESEBAL - GOOGLE EARTH ENGINE APP FOR SURFACE ENERGY BALANCE ALGORITHM FOR LAND (SEBAL)
+#CREATE BY: LEONARDO LAIPELT, RAFAEL KAYSER, ANDERSON RUHOFF AND AYAN FLEISCHMANN
+#PROJECT - ET BRASIL https://etbrasil.org/
+#LAB - HIDROLOGIA DE GRANDE ESCALA [HGE] website: https://www.ufrgs.br/hge/author/hge/
+#UNIVERSITY - UNIVERSIDADE FEDERAL DO RIO GRANDE DO SUL - UFRGS
+#RIO GRANDE DO SUL, BRAZIL
+
+#DOI
+#VERSION 0.1.1
+#CONTACT US: leonardo.laipelt@ufrgs.br
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+
+#PYTHON PACKAGES
+#MERGEABLE QUANTILE SKETCH FOR THE ENDMEMBER PERCENTILES
+import numpy as np
+
+#BIN WIDTHS (SAME AS THE EARTH ENGINE OPTION, etbrasil.geesebal.endmembers)
+#NDVI: 0.001, LST: 0.1 K
+NDVI_RANGE = (0, 1, 0.001)
+LST_RANGE = (250, 350, 0.1)
+
+#FIXED-BIN HISTOGRAM OF ONE BAND (OPTIONALLY SPLIT BY THE BINS OF A SECOND BAND, by)
+#SKETCHES OF TILES OR SAMPLES ARE MERGED WITH + (THE COUNTS ADD UP), SO THE RESULT
+#DOES NOT DEPEND ON HOW THE SCENE WAS SPLIT
+#QUANTILE ERROR: AT MOST ONE BIN WIDTH (self.error) FOR QUANTILES INSIDE [lo, hi]
+#(VALUES OUTSIDE ARE COUNTED IN THE FIRST/LAST BIN)
+class QuantileSketch():
+
+    def __init__(self, lo, hi, width, by=None):
+        self.edges = np.linspace(lo, hi, int(round((hi - lo) / width)) + 1)
+        self.error = width
+        self.by = by
+        if by is None:
+            self.by_edges = None
+            self.counts = np.zeros(self.edges.size - 1, dtype=np.int64)
+        else:
+            self.by_edges = QuantileSketch(*by).edges
+            self.counts = np.zeros((self.by_edges.size - 1, self.edges.size - 1), dtype=np.int64)
+
+    #BIN OF EACH VALUE
+    @staticmethod
+    def fexp_bins(values, edges):
+        index = np.floor((np.asarray(values, dtype=np.float64) - edges[0]) / (edges[1] - edges[0]))
+        return np.clip(index, 0, edges.size - 2).astype(np.int64)
+
+    #ADD VALUES (NaN ARE SKIPPED)
+    def update(self, values, by=None):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if self.by_edges is None:
+            values = values[np.isfinite(values)]
+            self.counts += np.bincount(self.fexp_bins(values, self.edges), minlength=self.counts.size)
+            return self
+        by = np.asarray(by, dtype=np.float64).ravel()
+        valid = np.isfinite(values) & np.isfinite(by)
+        index = (self.fexp_bins(by[valid], self.by_edges) * self.counts.shape[1]
+                 + self.fexp_bins(values[valid], self.edges))
+        self.counts += np.bincount(index, minlength=self.counts.size).reshape(self.counts.shape)
+        return self
+
+    #MERGE
+    def __add__(self, other):
+        sketch = QuantileSketch(self.edges[0], self.edges[-1], self.error, self.by)
+        sketch.counts = self.counts + other.counts
+        return sketch
+
+    def __iadd__(self, other):
+        self.counts += other.counts
+        return self
+
+    #NEAREST EDGE OF THE by BINS (THRESHOLDS ON by ARE EXACT ONLY AT THE EDGES)
+    def fexp_by_edge(self, value):
+        width = self.by_edges[1] - self.by_edges[0]
+        k = int(round((value - self.by_edges[0]) / width))
+        return self.by_edges[min(max(k, 1), self.by_edges.size - 2)]
+
+    #HISTOGRAM OF THE VALUES WITH by_min <= by < by_max
+    def fexp_marginal(self, by_min=None, by_max=None):
+        if self.by_edges is None:
+            return self.counts
+        start = 0 if by_min is None else int(round((by_min - self.by_edges[0]) / (self.by_edges[1] - self.by_edges[0])))
+        end = None if by_max is None else int(round((by_max - self.by_edges[0]) / (self.by_edges[1] - self.by_edges[0])))
+        return self.counts[start:end].sum(0)
+
+    #NUMBER OF VALUES
+    def count(self, by_min=None, by_max=None):
+        return int(self.fexp_marginal(by_min, by_max).sum())
+
+    #NUMBER OF VALUES <= value (LINEAR INSIDE THE BIN)
+    def rank(self, value, by_min=None, by_max=None):
+        counts = self.fexp_marginal(by_min, by_max)
+        b = int(self.fexp_bins(value, self.edges))
+        frac = np.clip((value - self.edges[b]) / self.error, 0, 1)
+        return float(counts[:b].sum() + frac * counts[b])
+
+    #PERCENTILE p (SAME RANK AS np.nanpercentile, LINEAR INSIDE THE BIN)
+    def quantile(self, p, by_min=None, by_max=None):
+        counts = self.fexp_marginal(by_min, by_max)
+        n = counts.sum()
+        if n == 0:
+            raise ValueError('No candidate pixels found.')
+        rank = p / 100 * (n - 1)
+        cum = np.cumsum(counts)
+        b = int(np.searchsorted(cum, rank, side='right'))
+        prev = cum[b - 1] if b > 0 else 0
+        return float(self.edges[b] + (rank - prev + 0.5) / counts[b] * (self.edges[b + 1] - self.edges[b]))
@@ -0,0 +1,362 @@
+#----------------------------------------------------------------------------------------#
+#---------------------------------------//GEESEBAL//-------------------------------------#
+#GEESEBAL - GOOGLE EARTH ENGINE APP FOR SURFACE ENERGY BALANCE ALGORITHM FOR LAND (SEBAL)
+#CREATE BY: LEONARDO LAIPELT, RAFAEL KAYSER, ANDERSON RUHOFF AND AYAN FLEISCHMANN
+#PROJECT - ET BRASIL https://etbrasil.org/
+#LAB - HIDROLOGIA DE GRANDE ESCALA [HGE] website: https://www.ufrgs.br/hge/author/hge/
+#UNIVERSITY - UNIVERSIDADE FEDERAL DO RIO GRANDE DO SUL - UFRGS
+#RIO GRANDE DO SUL, BRAZIL
+
+#DOI
+#VERSION 0.1.1
+#CONTACT US: leonardo.laipelt@ufrgs.br
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+
+#PYTHON PACKAGES
+#OUT-OF-CORE (TILED) EXECUTION OF THE LOCAL SEBAL CHAIN
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+#FOLDERS
+from .masks import (f_cloudMaskL457_SR, f_cloudMaskL8_SR,
+ f_albedoL5L7, f_albedoL8)
+from .tools import (fexp_spec_ind, fexp_radlong_up, LST_DEM_correction,
+fexp_radshort_down, fexp_radlong_down, fexp_radbalance, fexp_soil_heat, fexp_sensible_heat_flux,
+fexp_solar_context, fexp_atmosphere_context, fexp_check_iterations)
+from .evapotranspiration import fexp_et
+from .meteorology import fexp_rn24h
+from .image import LocalImage
+from .sketch import QuantileSketch, NDVI_RANGE, LST_RANGE
+from .endmembers import fexp_pixel_key
+
+#DEFAULT TILE SIZE [PIXELS]
+TILE_SIZE = 512
+
+#NUMBER OF CANDIDATE PIXELS KEPT FOR THE ENDMEMBER SELECTION
+RESERVOIR_SIZE = 4096
+
+#WINDOWS OF size x size PIXELS (row_start, row_end, col_start, col_end)
+def fexp_tiles(shape, size=TILE_SIZE):
+    return [(row, min(row + size, shape[0]), col, min(col + size, shape[1]))
+            for row in range(0, shape[0], size) for col in range(0, shape[1], size)]
+
+#RUN function FOR ALL TILES ON A THREAD POOL (NUMPY RELEASES THE GIL)
+#AT MOST 2 * max_workers TILES ARE IN MEMORY AT THE SAME TIME
+#reduce IS CALLED IN THE MAIN THREAD WITH EACH RESULT, AS SOON AS IT IS READY
+def fexp_run_tiles(function, tiles, reduce, max_workers=None):
+    max_workers = max_workers or os.cpu_count() or 1
+    tiles = iter(tiles)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = set()
+        for tile in tiles:
+            running.add(executor.submit(function, tile))
+            if len(running) >= 2 * max_workers:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    reduce(future.result())
+        for future in running:
+            reduce(future.result())
+
+#BAND ON THE TILE (ARRAYS ON THE SCENE GRID ARE SLICED, SCALARS ARE KEPT)
+def _fexp_slice(value, window, shape):
+    if np.ndim(value) == 2 and np.shape(value) == shape:
+        return value[window]
+    return value
+
+def _fexp_crop(value, crop):
+    if np.ndim(value) == 2:
+        return value[crop]
+    return value
+
+#TILED IMAGE FUNCTION
+#SAME INPUTS AND ENDMEMBERS AS image.Image, BUT THE SCENE IS NEVER PROCESSED AT ONCE:
+#PASS ONE: SPECTRAL INDICES AND LST BY TILE -> NDVI/LST SKETCHES AND CANDIDATE PIXELS
+#ENDMEMBERS: PERCENTILES FROM THE SKETCHES, dT COEFFICIENTS SOLVED AT THE HOT PIXEL
+#PASS TWO: Rn, G, H AND ET BY TILE WITH THE FIXED CALIBRATION
+#THE OUTPUT bands ARE WRITTEN TO path (.npy MEMORY MAPS) OR TO ARRAYS IN MEMORY (path=None)
+class TiledImage():
+
+    #ENDMEMBERS DEFAULT
+    #ALLEN ET AL. (2013)
+    def __init__(self,
+                 image,
+                 z_alt,
+                 meteorology,
+                 NDVI_cold=5,
+                 Ts_cold=20,
+                 NDVI_hot=10,
+                 Ts_hot=20,
+                 refpoly=None,
+                 seed=0,
+                 n_iter_max=15,
+                 n_dif_min=0.1,
+                 tile_size=TILE_SIZE,
+                 max_workers=None,
+                 bands=('Rn', 'G', 'H', 'ET_24h'),
+                 path=None,
+                 compute=True):
+
+        #GET INFORMATIONS FROM IMAGE
+        fexp_check_iterations(n_iter_max)
+        self._image = image
+        self.z_alt = z_alt
+        self.meteorology = meteorology
+        self.refpoly = refpoly
+        self.LANDSAT_ID = image.get_property('LANDSAT_ID')
+        self.landsat_version = image.get_property('SATELLITE')
+        self.zenith_angle = image.get_property('SOLAR_ZENITH_ANGLE')
+        self.sun_elevation = 90 - self.zenith_angle
+        self._date = image.date()
+        self._hour = self._date.hour
+        self._minuts = self._date.minute
+        self.date_string = self._date.strftime('%Y-%m-%d')
+        self.shape = tuple(image['pixel_qa'].shape)
+
+        #ENDMEMBERS
+        self.p_top_NDVI = NDVI_cold
+        self.p_coldest_Ts = Ts_cold
+        self.p_lowest_NDVI = NDVI_hot
+        self.p_hottest_Ts = Ts_hot
+        self.seed = seed
+        self.n_iter_max = n_iter_max
+        self.n_dif_min = n_dif_min
+
+        #TILES
+        self.tiles = fexp_tiles(self.shape, tile_size)
+        self.max_workers = max_workers
+        self.bands = list(bands)
+        self.path = path
+
+        #IMAGE CENTROID FROM THE BORDERS OF THE SCENE (NO FULL READ OF THE LONGITUDE BAND)
+        self.properties = dict(image.properties)
+        if 'longitude_center' not in self.properties:
+            longitude = image['longitude']
+            border = np.concatenate([np.asarray(longitude[0, :]), np.asarray(longitude[-1, :]),
+                                     np.asarray(longitude[:, 0]), np.asarray(longitude[:, -1])]).astype(np.float64)
+            self.properties['longitude_center'] = (np.nanmin(border) + np.nanmax(border)) / 2
+
+        if self.LANDSAT_ID:
+            self.NAME_FINAL = self.LANDSAT_ID[:5]+self.LANDSAT_ID[10:17]+self.LANDSAT_ID[17:25]
+
+        #compute=False ONLY PREPARES THE TILES
+        if compute:
+            self.process()
+
+    #BOTH PASSES
+    def process(self):
+        self.fexp_statistics()
+        self.fexp_endmembers()
+        self.fexp_fluxes()
+        return self
+
+    #SPECTRAL INDICES AND LST OF ONE WINDOW
+    #THE WINDOW IS READ WITH A 1 PIXEL HALO (SLOPE/ASPECT) AND CROPPED AFTER THE LST
+    def _fexp_tile_lst(self, tile):
+        row_0, row_1, col_0, col_1 = tile
+        halo_row, halo_col = max(row_0 - 1, 0), max(col_0 - 1, 0)
+        window = (slice(halo_row, min(row_1 + 1, self.shape[0])), slice(halo_col, min(col_1 + 1, self.shape[1])))
+        crop = (slice(row_0 - halo_row, row_1 - halo_row), slice(col_0 - halo_col, col_1 - halo_col))
+
+        image = LocalImage({name: band[window] for name, band in self._image.items()}, self.properties)
+        z_alt = _fexp_slice(self.z_alt, window, self.shape)
+        if np.ndim(z_alt) < 2:
+            z_alt = np.full(image['pixel_qa'].shape, z_alt, dtype=np.float64)
+        z_alt = np.asarray(z_alt, dtype=np.float64)
+        meteorology = {name: _fexp_slice(value, window, self.shape) for name, value in self.meteorology.items()}
+        T_air, UR = meteorology['AirT_G'], meteorology['RH_G']
+
+        #CLOUD REMOVAL AND ALBEDO TASUMI ET AL. (2008)
+        if self.landsat_version in ('LANDSAT_5', 'LANDSAT_7'):
+            image = f_albedoL5L7(f_cloudMaskL457_SR(image))
+        else:
+            image = f_albedoL8(f_cloudMaskL8_SR(image))
+
+        #SOLAR AND ATMOSPHERIC CONTEXT, SPECTRAL IMAGES AND LAND SURFACE TEMPERATURE
+        context = fexp_atmosphere_context(fexp_solar_context(self._date, self.sun_elevation), z_alt, T_air, UR)
+        image = fexp_spec_ind(image)
+        image = LST_DEM_correction(image, z_alt, T_air, UR, self.sun_elevation, self._hour, self._minuts, context)
+
+        image = LocalImage({name: _fexp_crop(band, crop) for name, band in image.items()}, self.properties)
+        meteorology = {name: _fexp_crop(value, crop) for name, value in meteorology.items()}
+        context = {name: _fexp_crop(value, crop) for name, value in context.items()}
+        return image, z_alt[crop], meteorology, context
+
+    #Rn AND G OF ONE WINDOW (AFTER _fexp_tile_lst)
+    def _fexp_tile_radiation(self, image, z_alt, meteorology, context):
+        T_air, UR = meteorology['AirT_G'], meteorology['RH_G']
+        image = fexp_radlong_up(image)
+        image = fexp_radshort_down(image, z_alt, T_air, UR, self.sun_elevation, context)
+        image = fexp_radlong_down(image, self.n_Ts_cold)
+        image = fexp_radbalance(image)
+        image = fexp_soil_heat(image)
+        return image
+
+    #DAILY NET RADIATION OF ONE WINDOW
+    def _fexp_rn24h(self, image, meteorology):
+        if 'Rn24h_G' in meteorology:
+            return meteorology['Rn24h_G']
+        return fexp_rn24h(image['ALFA'], meteorology['SW_Down'], meteorology['Ra_24h'])
+
+    #VALID PIXELS OF ONE WINDOW (pos_NDVI AND LST_NW) WITH THEIR KEYS
+    def _fexp_tile_candidates(self, image, tile):
+        row_0, row_1, col_0, col_1 = tile
+        valid = np.isfinite(image['pos_NDVI']) & np.isfinite(image['LST_NW'])
+        if self.refpoly is not None:
+            valid &= np.asarray(self.refpoly[row_0:row_1, col_0:col_1], dtype=bool)
+        rows, cols = np.nonzero(valid)
+        candidates = {'row': rows + row_0, 'col': cols + col_0,
+                      'x': np.asarray(image['longitude'], dtype=np.float64)[valid],
+                      'y': np.asarray(image['latitude'], dtype=np.float64)[valid]}
+        candidates.update({name: image[name][valid] for name in ('pos_NDVI', 'NDVI', 'LST_NW', 'T_LST_DEM')})
+        candidates['key'] = fexp_pixel_key(candidates['row'], candidates['col'], self.shape[1], self.seed)
+        return candidates
+
+    #====== PASS ONE ======#
+    #SKETCHES (sketch.QuantileSketch, INDEPENDENT OF THE TILE SIZE):
+    #pos_NDVI, LST_NW BY pos_NDVI AND T_LST_DEM BY pos_NDVI
+    #CANDIDATES: THE RESERVOIR_SIZE PIXELS WITH THE LOWEST KEYS (pos_NDVI AND LST_NW VALID)
+    def _fexp_tile_statistics(self, tile):
+        image, z_alt, meteorology, context = self._fexp_tile_lst(tile)
+        row_0, row_1, col_0, col_1 = tile
+
+        pos_ndvi = image['pos_NDVI']
+        if self.refpoly is not None:
+            pos_ndvi = np.where(np.asarray(self.refpoly[row_0:row_1, col_0:col_1], dtype=bool), pos_ndvi, np.nan)
+
+        #CANDIDATE PIXELS
+        reservoir = self._fexp_tile_candidates(image, tile)
+        if reservoir['key'].size > RESERVOIR_SIZE:
+            keep = np.argpartition(reservoir['key'], RESERVOIR_SIZE)[:RESERVOIR_SIZE]
+            reservoir = {name: values[keep] for name, values in reservoir.items()}
+
+        return {'ndvi': QuantileSketch(*NDVI_RANGE).update(pos_ndvi),
+                'cold': QuantileSketch(*LST_RANGE, by=NDVI_RANGE).update(image['LST_NW'], pos_ndvi),
+                'hot': QuantileSketch(*LST_RANGE, by=NDVI_RANGE).update(image['T_LST_DEM'], pos_ndvi),
+                'reservoir': reservoir}
+
+    #MERGE THE STATISTICS OF ONE TILE
+    def _fexp_merge_statistics(self, statistics):
+        if self.statistics is None:
+            self.statistics = statistics
+            return
+        for name in ('ndvi', 'cold', 'hot'):
+            self.statistics[name] += statistics[name]
+        reservoir = {name: np.concatenate([self.statistics['reservoir'][name], values])
+                     for name, values in statistics['reservoir'].items()}
+        if reservoir['key'].size > RESERVOIR_SIZE:
+            keep = np.argpartition(reservoir['key'], RESERVOIR_SIZE)[:RESERVOIR_SIZE]
+            reservoir = {name: values[keep] for name, values in reservoir.items()}
+        self.statistics['reservoir'] = reservoir
+
+    def fexp_statistics(self):
+        self.statistics = None
+        fexp_run_tiles(self._fexp_tile_statistics, self.tiles, self._fexp_merge_statistics, self.max_workers)
+
+    #====== ENDMEMBERS ======#
+    #SAME PERCENTILES AS endmembers.fexp_cold_pixel/fexp_hot_pixel, FROM THE SKETCHES
+    #(NDVI THRESHOLDS ROUNDED TO THE BIN EDGES, LST THRESHOLDS WITHIN ONE BIN)
+    def fexp_endmembers(self):
+        statistics = self.statistics
+
+        #COLD PIXEL: TOP % NDVI, THEN THE COLDEST TS
+        n_top_NDVI = statistics['cold'].fexp_by_edge(statistics['ndvi'].quantile(100 - self.p_top_NDVI))
+        n_perc_low_LST = statistics['cold'].quantile(self.p_coldest_Ts, by_min=n_top_NDVI)
+        self.d_cold_pixel = self._fexp_select_pixel(
+            lambda r: (r['pos_NDVI'] >= n_top_NDVI) & (r['LST_NW'] <= n_perc_low_LST) & (r['LST_NW'] >= 200),
+            statistics['cold'].rank(n_perc_low_LST, by_min=n_top_NDVI),
+            {'temp': 'LST_NW', 'ndvi': 'NDVI', 'x': 'x', 'y': 'y'})
+        self.n_Ts_cold = self.d_cold_pixel['temp']
+
+        #HOT PIXEL: LOWEST % NDVI, THEN THE HOTTEST TS
+        n_low_NDVI = statistics['hot'].fexp_by_edge(statistics['ndvi'].quantile(self.p_lowest_NDVI))
+        n_perc_top_lst = statistics['hot'].quantile(100 - self.p_hottest_Ts, by_max=n_low_NDVI)
+        self.d_hot_pixel = self._fexp_select_pixel(
+            lambda r: (r['pos_NDVI'] < n_low_NDVI) & (r['T_LST_DEM'] >= n_perc_top_lst),
+            statistics['hot'].count(by_max=n_low_NDVI) - statistics['hot'].rank(n_perc_top_lst, by_max=n_low_NDVI),
+            {'temp': 'LST_NW', 'x': 'x', 'y': 'y', 'ndvi': 'NDVI'})
+        self.fexp_hot_pixel_coefficients()
+
+    #Rn, G AND dT COEFFICIENTS AT THE HOT PIXEL (ONE PIXEL WINDOW)
+    def fexp_hot_pixel_coefficients(self):
+        row, col = self.d_hot_pixel['row'], self.d_hot_pixel['col']
+        image, z_alt, meteorology, context = self._fexp_tile_lst((row, row + 1, col, col + 1))
+        image = self._fexp_tile_radiation(image, z_alt, meteorology, context)
+        self.d_hot_pixel.update({'Rn': float(image['Rn'][0, 0]), 'G': float(image['G'][0, 0])})
+        image = fexp_sensible_heat_flux(image, meteorology['ux_G'], meteorology['RH_G'],
+                                        self._fexp_rn24h(image, meteorology), self.n_Ts_cold,
+                                        dict(self.d_hot_pixel, row=0, col=0), self.date_string, None,
+                                        self.n_iter_max, self.n_dif_min)
+        self.d_iteration = image.properties['d_iteration']
+        self.n_iterations = image.properties['n_iterations']
+
+    #CANDIDATE WITH THE LOWEST KEY
+    #WHEN NO CANDIDATE IS IN THE RESERVOIR, THE TILES ARE SCANNED AGAIN
+    def _fexp_select_pixel(self, condition, n_sum, bands):
+        reservoir = self.statistics['reservoir']
+        candidates = np.nonzero(condition(reservoir))[0]
+        if candidates.size == 0:
+            self._selection = None
+            fexp_run_tiles(lambda tile: self._fexp_tile_select(tile, condition),
+                           self.tiles, self._fexp_merge_selection, self.max_workers)
+            if self._selection is None:
+                raise ValueError('No candidate pixels found.')
+            reservoir, candidates = self._selection, np.array([0])
+        k = candidates[np.argmin(reservoir['key'][candidates])]
+        d_pixel = {name: float(reservoir[band][k]) for name, band in bands.items()}
+        d_pixel.update({'row': int(reservoir['row'][k]), 'col': int(reservoir['col'][k]), 'sum': int(n_sum)})
+        return d_pixel
+
+    def _fexp_tile_select(self, tile, condition):
+        image, z_alt, meteorology, context = self._fexp_tile_lst(tile)
+        pixels = self._fexp_tile_candidates(image, tile)
+        candidates = np.nonzero(condition(pixels))[0]
+        if candidates.size == 0:
+            return None
+        k = candidates[np.argmin(pixels['key'][candidates])]
+        return {name: values[k:k + 1] for name, values in pixels.items()}
+
+    def _fexp_merge_selection(self, selection):
+        if selection is not None and (self._selection is None or selection['key'][0] < self._selection['key'][0]):
+            self._selection = selection
+
+    #====== PASS TWO ======#
+    def _fexp_tile_fluxes(self, tile):
+        image, z_alt, meteorology, context = self._fexp_tile_lst(tile)
+        image = self._fexp_tile_radiation(image, z_alt, meteorology, context)
+
+        #SENSIBLE HEAT FLUX (H) [W M-2] WITH THE COEFFICIENTS OF THE HOT PIXEL
+        Rn24hobs = self._fexp_rn24h(image, meteorology)
+        image = fexp_sensible_heat_flux(image, meteorology['ux_G'], meteorology['RH_G'], Rn24hobs,
+                                        self.n_Ts_cold, self.d_hot_pixel, self.date_string, None,
+                                        d_iteration=self.d_iteration)
+
+        #DAILY EVAPOTRANSPIRATION (ET_24H) [MM DAY-1]
+        image = fexp_et(image, Rn24hobs)
+        return tile, {name: image[name] for name in self.bands}
+
+    def _fexp_write_fluxes(self, result):
+        (row_0, row_1, col_0, col_1), bands = result
+        for name, band in bands.items():
+            self.image[name][row_0:row_1, col_0:col_1] = band
+
+    def fexp_fluxes(self):
+        bands = {}
+        for name in self.bands:
+            if self.path is not None:
+                os.makedirs(self.path, exist_ok=True)
+                bands[name] = np.lib.format.open_memmap(os.path.join(self.path, name + '.npy'), mode='w+',
+                                                        dtype=np.float32, shape=self.shape)
+            else:
+                bands[name] = np.empty(self.shape, dtype=np.float32)
+        self.image = LocalImage(bands, dict(self.properties, n_iterations=self.n_iterations))
+        fexp_run_tiles(self._fexp_tile_fluxes, self.tiles, self._fexp_write_fluxes, self.max_workers)
+        if self.path is not None:
+            for band in bands.values():
+                band.flush()
+
+        if self.LANDSAT_ID and 'ET_24h' in self.image:
+            self.image[self.NAME_FINAL] = self.image['ET_24h']
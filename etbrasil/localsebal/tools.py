@@ -0,0 +1,484 @@
+#----------------------------------------------------------------------------------------#
+#---------------------------------------//GEESEBAL//-------------------------------------#
+#GEESEBAL - GOOGLE EARTH ENGINE APP FOR SURFACE ENERGY BALANCE ALGORITHM FOR LAND (SEBAL)
+#CREATE BY: LEONARDO LAIPELT, RAFAEL KAYSER, ANDERSON RUHOFF AND AYAN FLEISCHMANN
+#PROJECT - ET BRASIL https://etbrasil.org/
+#LAB - HIDROLOGIA DE GRANDE ESCALA [HGE] website: https://www.ufrgs.br/hge/author/hge/
+#UNIVERSITY - UNIVERSIDADE FEDERAL DO RIO GRANDE DO SUL - UFRGS
+#RIO GRANDE DO SUL, BRAZIL
+
+#DOI
+#VERSION 0.1.1
+#CONTACT US: leonardo.laipelt@ufrgs.br
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------#
+
+#PYTHON PACKAGES
+#NUMPY VERSION OF GEESEBAL TOOLS
+#SAME EQUATIONS AS etbrasil.geesebal.tools
+#MASKED PIXELS ARE REPRESENTED AS NaN
+import math
+import numpy as np
+
+#GET BAND AS FLOAT ARRAY
+def _band(image, name):
+    return np.asarray(image[name], dtype=np.float64)
+
+#SLOPE AND ASPECT [DEGREES] (SAME CONVENTION AS ee.Terrain.products)
+#ASPECT: 0 NORTH, 90 EAST
+def fexp_terrain(z_alt, pixel_size=30):
+    z = np.asarray(z_alt, dtype=np.float64)
+    dz_dy, dz_dx = np.gradient(z, pixel_size)
+    slope = np.degrees(np.arctan(np.hypot(dz_dx, dz_dy)))
+    aspect = np.degrees(np.arctan2(-dz_dx, dz_dy)) % 360
+    return slope, aspect
+
+#SPECTRAL INDICES MODULE
+def fexp_spec_ind(image):
+
+    nir = _band(image, 'NIR')
+    red = _band(image, 'R')
+    blue = _band(image, 'B')
+    green = _band(image, 'GR')
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        #NORMALIZED DIFFERENCE VEGETATION INDEX (NDVI)
+        ndvi = (nir - red) / (nir + red)
+
+        #ENHANCED VEGETATION INDEX (EVI)
+        N = nir / 10000
+        R = red / 10000
+        B = blue / 10000
+        evi = 2.5 * ((N - R) / (N + (6 * R) - (7.5 * B) + 1))
+
+        #SOIL ADHUSTED VEGETATION INDEX (SAVI)
+        savi = ((1 + 0.5) * (N - R)) / (0.5 + (N + R))
+
+        #NORMALIZED DIFFERENCE WATER INDEX (NDWI)
+        ndwi = (green - nir) / (green + nir)
+        savi1 = np.where(savi > 0.689, 0.689, savi)
+
+        #LEAF AREA INDEX (LAI)
+        lai = -(np.log((0.69 - savi1) / 0.59) / 0.91)
+
+        #BROAD-BAND SURFACE EMISSIVITY (e_0)
+        e_0 = np.where(lai > 3, 0.98, 0.95 + 0.01 * lai)
+
+        #NARROW BAND TRANSMISSIVITY (e_NB)
+        e_NB = np.where(lai > 3, 0.98, 0.97 + (0.0033 * lai))
+        log_eNB = np.log(e_NB)
+
+        #LAND SURFACE TEMPERATURE (LST) [K]
+        comp_onda = 1.115e-05
+        Tb = _band(image, 'BRT') / 10
+        lst = Tb / (1 + ((comp_onda * Tb / 1.438e-02) * log_eNB))
+
+    #RESCALED BRIGHTNESS TEMPERATURE
+    brt_r = _band(image, 'BRT') / 10
+
+    #FOR FUTHER USE
+    pos_ndvi = np.where(ndvi > 0, ndvi, np.nan)
+    ndvi_neg = pos_ndvi * -1
+
+    #ADD BANDS
+    #LONGITUDE AND LATITUDE BANDS ARE EXPECTED IN THE INPUT IMAGE
+    image.update({
+        'NDVI': ndvi, 'EVI': evi, 'SAVI': savi, 'T_LST': lst, 'LAI': lai,
+        'e_0': e_0, 'e_NB': e_NB, 'NDVI_neg': ndvi_neg, 'pos_NDVI': pos_ndvi,
+        'int': np.ones_like(ndvi), 'sd_ndvi': np.ones_like(ndvi),
+        'NDWI': ndwi, 'BRT_R': brt_r})
+    return image
+
+#SOLAR CONTEXT OF THE SCENE
+#COMPUTED ONCE AND SHARED BY LST_DEM_correction AND fexp_radshort_down
+def fexp_solar_context(date, SUN_ELEVATION):
+
+    #DAY OF YEAR
+    doy = date.timetuple().tm_yday - 1
+    Pi = 3.14
+
+    #INVERSE RELATIVE  DISTANCE EARTH-SUN
+    dr = 1 + 0.033 * math.cos(2 * Pi / 365 * doy)
+
+    #SOLAR DECLINATION [RADIANS]
+    #ASCE REPORT (2005)
+    solar_dec = 0.409 * math.sin((2 * Pi * doy / 365) - 1.39)
+
+    #SOLAR ZENITH ANGLE OVER A HORZONTAL SURFACE
+    solar_zenith = 90 - SUN_ELEVATION
+    degree2radian = 0.01745
+    cos_theta = math.cos(solar_zenith * degree2radian)
+
+    return {'doy': doy, 'dr': dr, 'solar_dec': solar_dec, 'cos_theta': cos_theta}
+
+#ATMOSPHERIC CONTEXT OF THE SCENE (ADDED TO THE SOLAR CONTEXT)
+def fexp_atmosphere_context(context, z_alt, T_air, UR):
+
+    z_alt = np.asarray(z_alt, dtype=np.float64)
+    T_air = np.asarray(T_air, dtype=np.float64)
+    UR = np.asarray(UR, dtype=np.float64)
+    cos_theta = context['cos_theta']
+
+    #ATMOSPHERIC PRESSURE [KPA]
+    #SHUTTLEWORTH (2012)
+    pres = 101.3 * ((293 - (0.0065 * z_alt)) / 293) ** 5.26
+
+    #SATURATION VAPOR PRESSURE (es) [KPA]
+    es = 0.6108 * (np.exp((17.27 * T_air) / (T_air + 237.3)))
+
+    #ACTUAL VAPOR PRESSURE (ea) [KPA]
+    ea = es * UR / 100
+
+    #WATER IN THE ATMOSPHERE [mm]
+    #Garrison and Adler (1990)
+    W = (0.14 * ea * pres) + 2.1
+
+    #BROAD-BAND ATMOSPHERIC TRANSMISSIVITY (tao_sw)
+    #ASCE-EWRI (2005)
+    tao_sw = 0.35 + 0.627 * np.exp(((-0.00146 * pres) / (1 * cos_theta)) - (0.075 * (W / cos_theta) ** 0.4))
+
+    context = dict(context)
+    context.update({'pres': pres, 'es': es, 'ea': ea, 'W': W, 'tao_sw': tao_sw})
+    return context
+
+#SOLAR AND ATMOSPHERIC CONTEXT OF THE SCENE
+def fexp_context(image, z_alt, T_air, UR, SUN_ELEVATION):
+    return fexp_atmosphere_context(fexp_solar_context(image.date(), SUN_ELEVATION), z_alt, T_air, UR)
+
+#LAND SURFACE TEMPERATURE WITH DEM CORRECTION AND ASPECT/SLOPE
+#JAAFAR AND AHMAD (2020)
+def LST_DEM_correction(image, z_alt, T_air, UR, SUN_ELEVATION, hour, minuts, context=None):
+
+    #SOLAR CONSTANT [W M-2]
+    gsc = 1367
+
+    #SOLAR AND ATMOSPHERIC CONTEXT (doy, dr, pres, tao_sw, cos_theta)
+    if context is None:
+        context = fexp_context(image, z_alt, T_air, UR, SUN_ELEVATION)
+    doy = context['doy']
+    dr = context['dr']
+    pres = context['pres']
+    cos_theta = context['cos_theta']
+    tao_sw = context['tao_sw']
+    degree2radian = 0.01745
+    z_alt = np.asarray(z_alt, dtype=np.float64)
+
+    #AIR DENSITY [KG M-3]
+    lst = _band(image, 'T_LST')
+    air_dens = (1000 * pres) / (1.01 * lst * 287)
+
+    #LAND SURFACE TEMPERATURE CORRECTION DEM [K]
+    Temp_corr = lst + z_alt * 0.0065
+
+    #COS ZENITH ANGLE SUN ELEVATION #ALLEN ET AL. (2006)
+    slope, aspect = fexp_terrain(z_alt, image.properties.get('pixel_size', 30))
+
+    B = (360 / 365) * (doy - 81)
+    delta = math.asin(math.sin(23.45 * degree2radian)) * math.sin(B * degree2radian)
+    s = slope * degree2radian
+    gamma = (aspect - 180) * degree2radian
+    phi = _band(image, 'latitude') * degree2radian
+
+    #CONSTANTS ALLEN ET AL. (2006)
+    a = (math.sin(delta) * np.cos(phi) * np.sin(s) * np.cos(gamma)) - math.sin(delta) * (np.sin(phi) * np.cos(s))
+    b = (math.cos(delta) * np.cos(phi) * np.cos(s)) + math.cos(delta) * (np.sin(phi) * np.sin(s) * np.cos(gamma))
+    c = math.cos(delta) * np.sin(s) * np.sin(gamma)
+
+    #GET IMAGE CENTROID
+    longitude_center = image.properties.get('longitude_center')
+    if longitude_center is None:
+        longitude = _band(image, 'longitude')
+        longitude_center = (np.nanmin(longitude) + np.nanmax(longitude)) / 2
+
+    #DELTA GTM
+    DELTA_GTM = int(longitude_center / 15)
+
+    #LOCAL HOUR TIME
+    Local_hour_time = hour + DELTA_GTM + minuts / 60
+    HOUR_A = (Local_hour_time - 12) * 15
+    w = HOUR_A * degree2radian
+
+    cos_zn = -a + b * math.cos(w) + c * math.sin(w)
+
+    #LAND SURFACE TEMPERATURE WITH ASPECT/SLOPE CORRECTION [K]
+    TS_DEM = (Temp_corr + (gsc * dr * tao_sw * cos_zn - gsc * dr * tao_sw * cos_theta) / (air_dens * 1004 * 0.050))
+
+    #MASKS FOR SELECT PRE-CANDIDATES PIXELS
+    lst_neg = TS_DEM * -1
+    lst_nw = np.where(_band(image, 'NDWI') <= 0, TS_DEM, np.nan)
+
+    #ADD BANDS
+    image.update({'T_LST_DEM': TS_DEM, 'LST_neg': lst_neg, 'LST_NW': lst_nw})
+    return image
+
+#INSTANTANEOUS OUTGOING LONG-WAVE RADIATION (Rl_up) [W M-2]
+def fexp_radlong_up(image):
+    #BROAD-BAND SURFACE THERMAL EMISSIVITY
+    #TASUMI ET AL. (2003)
+    #ALLEN ET AL. (2007)
+    lai = _band(image, 'LAI')
+    emi = np.where(lai > 3, 0.98, 0.95 + (0.01 * lai))
+    stefBol = 5.67e-8
+
+    Rl_up = emi * stefBol * (_band(image, 'T_LST') ** 4)
+
+    #ADD BANDS
+    image['Rl_up'] = Rl_up
+    return image
+
+#INSTANTANEOUS INCOMING SHORT-WAVE RADIATION (Rs_down) [W M-2]
+def fexp_radshort_down(image, z_alt, T_air, UR, SUN_ELEVATION, context=None):
+
+    #SOLAR CONSTANT
+    gsc = 1367 #[W M-2]
+
+    #SOLAR AND ATMOSPHERIC CONTEXT (dr, es, ea, tao_sw, cos_theta)
+    if context is None:
+        context = fexp_context(image, z_alt, T_air, UR, SUN_ELEVATION)
+    dr = context['dr']
+    es = context['es']
+    ea = context['ea']
+    cos_theta = context['cos_theta']
+    tao_sw = context['tao_sw']
+
+    #INSTANTANEOUS SHORT-WAVE RADIATION (Rs_down) [W M-2]
+    Rs_down = gsc * cos_theta * tao_sw * dr
+
+    #ADD BANDS
+    image.update({'Rs_down': Rs_down, 'Tao_sw': tao_sw, 'ES': es, 'EA': ea})
+    return image
+
+    #INSTANTANEOUS INCOMING LONGWAVE RADIATION (Rl_down) [W M-2]
+    #ALLEN ET AL (2007)
+def fexp_radlong_down(image, n_Ts_cold):
+
+    log_taosw = np.log(_band(image, 'Tao_sw'))
+    Rl_down = (0.85 * (- log_taosw) ** 0.09) * 5.67e-8 * (n_Ts_cold ** 4)
+
+    #ADD BANDS
+    image['Rl_down'] = Rl_down
+    return image
+
+    #INSTANTANEOUS NET RADIATON BALANCE (Rn) [W M-2]
+def fexp_radbalance(image):
+
+    Rl_down = _band(image, 'Rl_down')
+    Rn = ((1 - _band(image, 'ALFA')) * _band(image, 'Rs_down')) + Rl_down - _band(image, 'Rl_up') - ((1 - _band(image, 'e_0')) * Rl_down)
+
+    #ADD BANDS
+    image['Rn'] = Rn
+    return image
+
+    #SOIL HEAT FLUX (G) [W M-2]
+    #BASTIAANSSEN (2000)
+def fexp_soil_heat(image):
+
+    G = (_band(image, 'Rn') * (_band(image, 'T_LST_DEM') - 273.15) * (0.0038 + (0.0074 * _band(image, 'ALFA')))
+         * (1 - 0.98 * (_band(image, 'NDVI') ** 4)))
+
+    #ADD BANDS
+    image['G'] = G
+    return image
+
+#ROW AND COLUMN OF AN ENDMEMBER
+#USES THE NEAREST LONGITUDE/LATITUDE WHEN ROW/COL ARE NOT AVAILABLE
+def fexp_pixel_position(image, d_pixel):
+    if 'row' in d_pixel and 'col' in d_pixel:
+        return int(d_pixel['row']), int(d_pixel['col'])
+    dist = (_band(image, 'longitude') - d_pixel['x']) ** 2 + (_band(image, 'latitude') - d_pixel['y']) ** 2
+    return np.unravel_index(np.nanargmin(dist), dist.shape)
+
+#NUMBER OF STEPS OF THE HOT PIXEL ITERATION (AT LEAST ONE)
+def fexp_check_iterations(n_iter_max):
+    if n_iter_max is None or n_iter_max < 1:
+        raise ValueError('n_iter_max must be at least 1 (got {})'.format(n_iter_max))
+
+    #SENSIBLE HEAT FLUX (H) [W M-2]
+    #THE ITERATION STOPS WHEN THE dT/rah CHANGE AT THE HOT PIXEL IS BELOW n_dif_min
+    #OR AFTER n_iter_max STEPS (REPORTED IN THE 'n_iterations' PROPERTY)
+    #THE dT COEFFICIENTS OF EACH STEP ARE REPORTED IN THE 'd_iteration' PROPERTY
+    #d_iteration: dT COEFFICIENTS ALREADY SOLVED AT THE HOT PIXEL (E.G. BY ANOTHER TILE OF THE SCENE)
+def fexp_sensible_heat_flux(image, ux, UR, Rn24hobs, n_Ts_cold, d_hot_pixel, date_string, refpoly=None,
+                            n_iter_max=15, n_dif_min=0.1, d_iteration=None):
+    fexp_check_iterations(n_iter_max if d_iteration is None else len(d_iteration['coef_a']))
+
+    #VEGETATION HEIGHTS  [M]
+    n_veg_hight = 3
+
+    #WIND SPEED AT HEIGHT Zx [M]
+    n_zx = 2
+
+    #BLENDING HEIGHT [M]
+    n_hight = 200
+
+    #AIR SPECIFIC HEAT [J kg-1/K-1]
+    n_Cp = 1004
+
+    #VON KARMAN'S CONSTANT
+    n_K = 0.41
+
+    #TS HOT PIXEL
+    n_Ts_hot = d_hot_pixel['temp']
+    #G HOT PIXEL
+    n_G_hot = d_hot_pixel['G']
+    #RN HOT PIXEL
+    n_Rn_hot = d_hot_pixel['Rn']
+    #HOT PIXEL POSITION
+    if d_iteration is None:
+        p_hot_pix = fexp_pixel_position(image, d_hot_pixel)
+
+    #SAVI
+    i_savi = _band(image, 'SAVI')
+    ux = np.asarray(ux, dtype=np.float64)
+
+    #MOMENTUM ROUGHNESS LENGHT (ZOM) AT THE WEATHER STATION [M]
+    #BRUTSAERT (1982)
+    n_zom = n_veg_hight * 0.12
+
+    #FRICTION VELOCITY AT WEATHER STATION [M S-1]
+    i_ufric_ws = (n_K * ux) / math.log(n_zx / n_zom)
+
+    #WIND SPEED AT BLENDING HEIGHT AT THE WEATHER STATION [M S-1]
+    i_u200 = i_ufric_ws * (math.log(n_hight / n_zom) / n_K)
+
+    #MOMENTUM ROUGHNESS LENGHT (ZOM) FOR EACH PIXEL [M]
+    i_zom = np.exp((5.62 * (i_savi)) - 5.809)
+
+    #FRICTION VELOCITY FOR EACH PIXEL  [M S-1]
+    i_ufric = np.broadcast_to((n_K * i_u200) / (math.log(n_hight / n_zom)), i_savi.shape)
+    i_u_fr = i_ufric
+
+    #AERODYNAMIC RESISTANCE TO HEAT TRANSPORT (rah) [S M-1]
+    #Z1 AND Z2 ARE HEIGHTS [M] ABOVE THE ZERO PLANE DISPLACEMENT
+    #OF THE VEGETATION
+    z1 = 0.1
+    z2 = 2
+    i_rah = (math.log(z2 / z1)) / (i_ufric * 0.41)
+    i_rah_first = i_rah
+
+    #AIR DENSITY HOT PIXEL
+    n_ro_hot = (-0.0046 * n_Ts_hot) + 2.5538
+
+    #========ITERATIVE PROCESS=========#
+
+    #SENSIBLE HEAT FLUX AT THE HOT PIXEL (H_hot)
+    n_H_hot = n_Rn_hot - n_G_hot
+
+    i_lst_med = _band(image, 'T_LST_DEM')
+
+    #NUMBER OF ITERATIVE STEPS: 15 (n_iter_max)
+    b_solved = d_iteration is not None
+    if b_solved:
+        n_iter_max = len(d_iteration['coef_a'])
+    else:
+        d_iteration = {'coef_a': [], 'coef_b': []}
+
+    #========INIT ITERATION========#
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for n in range(n_iter_max):
+
+        #COEFFICIENTS ALREADY SOLVED
+            if b_solved:
+                n_coef_a = d_iteration['coef_a'][n]
+                n_coef_b = d_iteration['coef_b'][n]
+
+            else:
+        #AERODYNAMIC RESISTANCE TO HEAT TRANSPORT
+        #IN HOT PIXEL
+                n_rah_hot = i_rah[p_hot_pix]
+
+        #NEAR SURFACE TEMPERATURE DIFFERENCE IN HOT PIXEL (dT= Tz1-Tz2)  [K]
+                n_dT_hot = (n_H_hot * n_rah_hot) / (n_ro_hot * n_Cp)
+
+        #NEAR SURFACE TEMPERATURE DIFFERENCE IN COLD PIXEL (dT= tZ1-tZ2)
+                n_dT_cold = 0
+        #ANGULAR COEFFICIENT
+                n_coef_a = (n_dT_cold - n_dT_hot) / (n_Ts_cold - n_Ts_hot)
+
+        #LINEAR COEFFICIENT
+                n_coef_b = n_dT_hot - (n_coef_a * n_Ts_hot)
+                d_iteration['coef_a'].append(float(n_coef_a))
+                d_iteration['coef_b'].append(float(n_coef_b))
+
+        #dT FOR EACH PIXEL [K]
+            i_dT_int = (n_coef_a * i_lst_med) + n_coef_b
+
+        #AIR TEMPERATURE (TA) FOR EACH PIXEL (TA=TS-dT) [K]
+            i_Ta = i_lst_med - i_dT_int
+
+        #AIR DENSITY (ro) [KM M-3]
+            i_ro = (-0.0046 * i_Ta) + 2.5538
+
+        #SENSIBLE HEAT FLUX (H) FOR EACH PIXEL  [W M-2]
+            i_H_int = (i_ro * n_Cp * i_dT_int) / i_rah
+
+        #MONIN-OBUKHOV LENGTH (L)
+            i_L_int = -(i_ro * n_Cp * (i_ufric ** 3) * i_lst_med) / (0.41 * 9.81 * i_H_int)
+
+        #STABILITY CORRECTIONS FOR MOMENTUM AND HEAT TRANSPORT
+        #PAULSON (1970)
+        #WEBB (1970)
+            i_psim_200, i_psih_2, i_psih_01 = fexp_stability_corrections(i_L_int)
+
+        #CORRECTED VALUE FOR THE FRICTION VELOCITY (i_ufric) [M S-1]
+            i_ufric = (i_u200 * 0.41) / (np.log(n_hight / i_zom) - i_psim_200)
+
+        #CORRECTED VALUE FOR THE AERODYNAMIC RESISTANCE TO THE HEAT TRANSPORT (rah) [S M-1]
+            i_rah = (math.log(z2 / z1) - i_psih_2 + i_psih_01) / (i_ufric * 0.41)
+
+        #CONVERGENCE
+            if b_solved:
+                continue
+            if n == 1:
+                n_dT_hot_old = n_dT_hot
+                n_rah_hot_old = n_rah_hot
+            if n > 1:
+                n_dif = abs(abs(n_dT_hot) - abs(n_dT_hot_old) + abs(n_rah_hot) - abs(n_rah_hot_old))
+                n_dT_hot_old = n_dT_hot
+                n_rah_hot_old = n_rah_hot
+                if n_dif_min is not None and n_dif < n_dif_min:
+                    break
+
+        #=========END ITERATION =========#
+
+        #GET FINAL rah, dT AND H
+        i_H_final = (i_ro * n_Cp * i_dT_int) / i_rah #[W M-2]
+
+    image.properties['n_iterations'] = n + 1
+    image.properties['d_iteration'] = d_iteration
+
+    #ADD BANDS
+    image.update({'H': i_H_final, 'rah': i_rah, 'dT': i_dT_int, 'rah_first': i_rah_first,
+                  'zom': i_zom, 'u_fr': i_u_fr, 'ufric_star': i_ufric})
+    return image
+
+#STABILITY CORRECTIONS FOR STABLE AND UNSTABLE CONDITIONS
+#RETURNS psim_200, psih_2 AND psih_01
+def fexp_stability_corrections(i_L_int):
+
+    #STABILITY CORRECTIONS FOR STABLE CONDITIONS
+    i_psim_200 = -5 * (200 / i_L_int)
+    i_psih_2 = -5 * (2 / i_L_int)
+    i_psih_01 = -5 * (0.1 / i_L_int)
+
+    #FOR DIFFERENT HEIGHT
+    i_x200 = (1 - (16 * (200 / i_L_int))) ** 0.25
+    i_x2 = (1 - (16 * (2 / i_L_int))) ** 0.25
+    i_x01 = (1 - (16 * (0.1 / i_L_int))) ** 0.25
+
+    #STABILITY CORRECTIONS FOR UNSTABLE CONDITIONS
+    i_psimu_200 = 2 * np.log((1 + i_x200) / 2) + np.log((1 + i_x200 ** 2) / 2) - 2 * np.arctan(i_x200) + 0.5 * 3.14159265
+    i_psihu_2 = 2 * np.log((1 + i_x2 ** 2) / 2)
+    i_psihu_01 = 2 * np.log((1 + i_x01 ** 2) / 2)
+
+    #FOR EACH PIXEL
+    i_psim_200 = np.where(i_L_int < 0, i_psimu_200, i_psim_200)
+    i_psih_2 = np.where(i_L_int < 0, i_psihu_2, i_psih_2)
+    i_psih_01 = np.where(i_L_int < 0, i_psihu_01, i_psih_01)
+    i_psim_200 = np.where(i_L_int == 0, 0, i_psim_200)
+    i_psih_2 = np.where(i_L_int == 0, 0, i_psih_2)
+    i_psih_01 = np.where(i_L_int == 0, 0, i_psih_01)
+
+    return i_psim_200, i_psih_2, i_psih_01